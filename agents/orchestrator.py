@@ -1,6 +1,8 @@
 """Pipeline Orchestrator — state machine coordinating all agents."""
 from __future__ import annotations
 
+import hashlib
+import json
 from typing import Callable
 
 from data import database
@@ -63,14 +65,24 @@ class Orchestrator:
 
     # ── Main entry points ──────────────────────────────────────────────────────
 
-    def run_query_formulation(self) -> dict:
-        """Run Agent 1: formulate search queries. Returns query dict."""
+    def run_query_formulation(self, use_cache: bool = True) -> dict:
+        """
+        Run Agent 1: formulate search queries. Returns query dict.
+        Queries generated earlier for the same configuration are reused unless
+        `use_cache` is False (e.g. "Regenerate queries"); fresh ones are still saved.
+        """
         self.set_stage("QUERY_FORMULATION")
-        agent = QueryAgent(self._api_key, self.log)
-        queries = agent.formulate_queries(
-            self.cfg().get("research_question", ""),
-            self.cfg(),
-        )
+        cache_key = self._query_cache_key(self.cfg())
+        queries = database.get_cached_response(self.conn, cache_key) if use_cache else None
+        if queries is not None:
+            self.log("Query Agent: reusing queries generated earlier for this configuration.")
+        else:
+            agent = QueryAgent(self._api_key, self.log)
+            queries = agent.formulate_queries(
+                self.cfg().get("research_question", ""),
+                self.cfg(),
+            )
+            database.save_cached_response(self.conn, cache_key, queries)
         self.state["generated_queries"] = queries
 
         # Flatten for DB storage
@@ -84,6 +96,23 @@ class Orchestrator:
         self.set_stage("QUERY_APPROVAL")
         return queries
 
+    # Config fields that feed the query-formulation prompt.
+    _QUERY_CFG_FIELDS = (
+        "research_question", "review_type", "year_min", "year_max", "keywords",
+        "exclude_keywords", "disciplines", "document_types",
+        "inclusion_criteria", "exclusion_criteria",
+    )
+
+    @classmethod
+    def _query_cache_key(cls, cfg: dict) -> str:
+        """Fingerprint of everything the Query Agent sees, namespaced within llm_cache."""
+        payload = {
+            "model": config.QUERY_MODEL,
+            "cfg": {f: cfg.get(f) for f in cls._QUERY_CFG_FIELDS},
+        }
+        blob = json.dumps(payload, sort_keys=True, default=str)
+        return "queries:" + hashlib.sha256(blob.encode()).hexdigest()
+
     def run_search(self) -> int:
         """Run Agent 2: execute approved queries."""
         self.set_stage("SEARCHING")
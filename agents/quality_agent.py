@@ -1,13 +1,13 @@
 """Quality Assessment Agent — parallel methodological quality scoring."""
 from __future__ import annotations
 
-import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Callable
 
 from data import database
+from data.db_pool import CursorPool
 from utils.llm import chat_completion_json
-from utils.prompts import QUALITY_SYSTEM, QUALITY_USER
+from utils.prompts import QUALITY_SYSTEM, QUALITY_USER, bind
 import config
 
 
@@ -24,26 +24,32 @@ class QualityAgent:
 
     def run(self, cfg: dict) -> None:
         """Assess quality of all INCLUDED papers in parallel."""
-        papers = database.get_papers(self.conn, final_status="INCLUDED")
-        unassessed = [p for p in papers if p.get("quality_score") is None]
+        unassessed = database.get_papers(
+            self.conn, final_status="INCLUDED", quality_score_is_null=True,
+            columns=("id", "title", "abstract", "year", "journal", "citation_count", "document_type"),
+        )
 
         if not unassessed:
             self.log("Quality Agent: all included papers already assessed.")
             return
 
+        workers = int(cfg.get("quality_max_workers") or config.QUALITY_MAX_WORKERS)
         self.log(
             f"Quality Agent: assessing {len(unassessed)} papers "
-            f"({config.QUALITY_MAX_WORKERS} workers)…"
+            f"({workers} workers)…"
         )
 
-        completed_count = 0
-        lock = threading.Lock()
+        cache_pool = CursorPool(self.conn, workers)  # one cache cursor per worker thread
+
+        render_prompt = bind(
+            QUALITY_USER,
+            research_question=cfg.get("research_question", ""),
+            review_type=cfg.get("review_type", "systematic review"),
+        )
 
         def assess_paper(p: dict) -> tuple[str, dict]:
             """Returns (paper_id, result_dict)."""
-            prompt = QUALITY_USER.format(
-                research_question=cfg.get("research_question", ""),
-                review_type=cfg.get("review_type", "systematic review"),
+            prompt = render_prompt(
                 title=p.get("title", ""),
                 abstract=(p.get("abstract") or "")[:800],
                 year=p.get("year", "unknown"),
@@ -60,6 +66,7 @@ class QualityAgent:
                     model=config.QUALITY_MODEL,
                     api_key=self.api_key,
                     temperature=0.2,
+                    cache=cache_pool,
                 )
                 return p["id"], {
                     "quality_score": result.get("quality_score", 50),
@@ -73,18 +80,27 @@ class QualityAgent:
         # ── Run concurrently ───────────────────────────────────────────────────
         all_results: list[tuple[str, dict]] = []
 
-        with ThreadPoolExecutor(max_workers=config.QUALITY_MAX_WORKERS) as executor:
-            futures = {executor.submit(assess_paper, p): p for p in unassessed}
-            for future in as_completed(futures):
-                paper_id, result = future.result()
-                with lock:
-                    completed_count += 1
-                    all_results.append((paper_id, result))
-                    self.log(f"Quality Agent: {completed_count}/{len(unassessed)} papers assessed…")
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(assess_paper, p): p for p in unassessed}
+                # Log roughly every 1% of papers rather than after each one.
+                log_every = max(1, len(unassessed) // 100)
+                for done, future in enumerate(as_completed(futures), start=1):
+                    all_results.append(future.result())
+                    if done % log_every == 0 or done == len(unassessed):
+                        self.log(f"Quality Agent: {done}/{len(unassessed)} papers assessed…")
+        finally:
+            cache_pool.close()
 
         # ── Write to DB (single-threaded) ──────────────────────────────────────
-        for paper_id, result in all_results:
-            database.update_paper(self.conn, paper_id, **result)
+        database.update_papers_bulk(
+            self.conn,
+            [
+                (r["quality_score"], r["quality_notes"], r["quality_flag"], paper_id)
+                for paper_id, r in all_results
+            ],
+            ["quality_score", "quality_notes", "quality_flag"],
+        )
 
         database.log_event(self.conn, "QUALITY_ASSESSMENT", f"Assessed {len(unassessed)} papers")
         self.log(f"Quality Agent: complete. {len(unassessed)} papers assessed.")
@@ -1,6 +1,8 @@
 """Relevance Agent — scores included papers by semantic closeness to the research question."""
 from __future__ import annotations
 
+import functools
+import hashlib
 import re
 from typing import Callable
 
@@ -10,6 +12,25 @@ from data import database
 from utils import llm as llm_utils
 import config
 
+_PUNCT_RE = re.compile(r"[^\w\s]")
+
+_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "of", "in", "to", "for",
+    "is", "are", "was", "were", "be", "been", "being",
+    "that", "this", "which", "with", "by", "from", "as",
+})
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenise(text: str) -> frozenset[str]:
+    words = _PUNCT_RE.sub("", text.lower()).split()
+    return frozenset(w for w in words if w not in _STOPWORDS and len(w) > 2)
+
+
+def embedding_text(p: dict) -> str:
+    """Text embedded for a paper — shared with the Synthesis Agent so vectors are comparable."""
+    return f"{p.get('title', '')} {(p.get('abstract') or '')[:400]}"
+
 
 class RelevanceAgent:
     def __init__(
@@ -27,42 +48,62 @@ class RelevanceAgent:
         Compute relevance_score (0–100) for every included paper.
 
         Method:
-        1. Embed the research question (1 API call).
+        1. Embed the research question plus any included papers that have no
+           stored embedding yet — all in one batched API call.
         2. Retrieve stored paper embeddings from DB.
         3. Cosine similarity → scale to 0–100.
-        4. Fall back to keyword overlap if no embeddings exist yet.
+        4. Fall back to keyword overlap if embedding fails.
         """
-        papers = database.get_papers(self.conn, final_status="INCLUDED")
+        papers = database.get_papers(
+            self.conn, final_status="INCLUDED", columns=("id", "title", "abstract")
+        )
         if not papers:
             return
 
-        stored = database.get_embeddings(self.conn)
-        embedding_map: dict[str, list[float]] = {pid: vec for pid, vec in stored}
-
-        if not embedding_map:
-            self.log("Relevance Agent: no embeddings found — using keyword scoring fallback.")
-            self._keyword_score(papers, research_question)
-            return
-
-        self.log("Relevance Agent: embedding research question…")
-        rq_vec = llm_utils.get_embeddings([research_question], self.api_key)[0]
-        rq = np.array(rq_vec, dtype=np.float32)
+        emb_ids, emb_matrix = database.get_embeddings(self.conn)
+        known = set(emb_ids)
+        missing = [p for p in papers if p["id"] not in known]
+
+        rq_key = self._question_key(research_question)
+        cached_rq = database.get_question_embedding(self.conn, rq_key)
+        texts = ([] if cached_rq is not None else [research_question]) + [
+            embedding_text(p) for p in missing
+        ]
+        if texts:
+            self.log(f"Relevance Agent: embedding {len(texts)} texts in one batch…")
+            try:
+                vectors = llm_utils.get_embeddings(texts, self.api_key, config.EMBEDDING_MODEL)
+            except Exception as e:
+                self.log(f"Relevance Agent: embedding failed — {e}. Using keyword scoring fallback.")
+                self._keyword_score(papers, research_question)
+                return
+            if cached_rq is None:
+                cached_rq = vectors[0].tobytes()
+                database.save_question_embedding(self.conn, rq_key, cached_rq)
+                vectors = vectors[1:]
+            if missing:
+                database.save_embeddings_bulk(self.conn, [p["id"] for p in missing], vectors)
+                emb_ids, emb_matrix = database.get_embeddings(self.conn)
+
+        rq = np.frombuffer(cached_rq, dtype=np.float32).copy()
         rq /= np.linalg.norm(rq) + 1e-9
 
-        scored = 0
-        for p in papers:
-            vec = embedding_map.get(p["id"])
-            if vec is None:
-                continue
-            v = np.array(vec, dtype=np.float32)
-            v /= np.linalg.norm(v) + 1e-9
+        # Select the included papers' rows from the stored (N, D) matrix so the
+        # cosine similarity is a single matrix-vector product.
+        row_of = {pid: i for i, pid in enumerate(emb_ids)}
+        ids = [p["id"] for p in papers if p["id"] in row_of]
+        if ids:
+            M = emb_matrix[[row_of[pid] for pid in ids]]
+            M /= np.linalg.norm(M, axis=1, keepdims=True) + 1e-9
             # Dot product of unit vectors = cosine similarity ∈ [-1, 1]
-            sim = float(np.dot(rq, v))
+            sims = (M @ rq).astype(np.float64)
             # Map to 0–100: OpenAI embeddings cluster in [0.5, 1.0] for related text,
             # so we stretch that range rather than mapping the full [-1,1].
-            score = round(max(0.0, min(100.0, (sim - 0.3) / 0.7 * 100)), 1)
-            database.update_paper(self.conn, p["id"], relevance_score=score)
-            scored += 1
+            scores = np.clip((sims - 0.3) / 0.7 * 100, 0.0, 100.0).round(1)
+            database.update_papers_bulk(
+                self.conn, list(zip(scores.tolist(), ids)), ["relevance_score"]
+            )
+        scored = len(ids)
 
         database.log_event(
             self.conn, "RELEVANCE_SCORING",
@@ -70,23 +111,40 @@ class RelevanceAgent:
         )
         self.log(f"Relevance Agent: scored {scored} papers.")
 
-    # ── Keyword fallback ───────────────────────────────────────────────────────
+    @staticmethod
+    def _question_key(research_question: str) -> str:
+        """Cache key for the research-question embedding: the exact text that gets embedded."""
+        return hashlib.sha256(
+            f"{config.EMBEDDING_MODEL}:{config.EMBEDDING_DIM}:{research_question}".encode()
+        ).hexdigest()
 
-    _STOPWORDS = {
-        "the", "a", "an", "and", "or", "of", "in", "to", "for",
-        "is", "are", "was", "were", "be", "been", "being",
-        "that", "this", "which", "with", "by", "from", "as",
-    }
+    # ── Keyword fallback ───────────────────────────────────────────────────────
 
     def _keyword_score(self, papers: list[dict], research_question: str) -> None:
-        rq_words = self._tokenise(research_question)
-        for p in papers:
-            text = f"{p.get('title', '')} {p.get('abstract', '')}"
-            paper_words = self._tokenise(text)
-            overlap = len(rq_words & paper_words) / max(len(rq_words), 1)
-            score = round(min(100.0, overlap * 150), 1)
-            database.update_paper(self.conn, p["id"], relevance_score=score)
-
-    def _tokenise(self, text: str) -> set[str]:
-        words = re.sub(r"[^\w\s]", "", text.lower()).split()
-        return {w for w in words if w not in self._STOPWORDS and len(w) > 2}
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        rq_words = _tokenise(research_question)
+        # Same tokens as _tokenise: punctuation stripped, stopwords and words of
+        # ≤2 characters dropped. binary=True makes X @ q.T the overlap size.
+        vectorizer = CountVectorizer(
+            binary=True,
+            preprocessor=lambda t: _PUNCT_RE.sub("", t.lower()),
+            token_pattern=r"(?u)\b\w{3,}\b",
+            stop_words=list(_STOPWORDS),
+        )
+        try:
+            X = vectorizer.fit_transform(
+                f"{p.get('title', '')} {p.get('abstract') or ''}" for p in papers
+            )
+        except ValueError:  # empty vocabulary — nothing can overlap
+            scores = np.zeros(len(papers))
+        else:
+            q = vectorizer.transform([research_question])
+            overlap = (X @ q.T).toarray().ravel() / max(len(rq_words), 1)
+            scores = np.minimum(100.0, overlap * 150).round(1)
+
+        database.update_papers_bulk(
+            self.conn,
+            list(zip(scores.tolist(), (p["id"] for p in papers))),
+            ["relevance_score"],
+        )
@@ -1,14 +1,14 @@
 """Screening Agent — parallel title/abstract screening."""
 from __future__ import annotations
 
-import json
-import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Callable
 
 from data import database
-from utils.llm import chat_completion_json
-from utils.prompts import SCREENING_SYSTEM, SCREENING_USER
+from data.db_pool import CursorPool
+from utils import fastjson, llm_batch
+from utils.llm import chat_completion_json, count_tokens
+from utils.prompts import SCREENING_SYSTEM, SCREENING_USER, bind
 import config
 
 
@@ -26,81 +26,123 @@ class ScreeningAgent:
     def run_pass1(self, cfg: dict) -> dict[str, int]:
         """
         Screen all unscreened papers in parallel batches.
-        LLM calls run concurrently; DB writes happen after all futures complete.
+        LLM calls run concurrently (or as one Batch API job when cfg["use_batch_api"]);
+        DB writes happen after all results are in.
         Returns counts: {"include": N, "exclude": N, "borderline": N}
         """
-        papers = database.get_papers(self.conn)
+        papers = database.get_papers(
+            self.conn,
+            columns=("id", "title", "abstract", "year", "document_type", "screening_pass1"),
+        )
         unscreened = [p for p in papers if not p.get("screening_pass1")]
 
         if not unscreened:
             self.log("Screening Agent: no unscreened papers.")
             return {"include": 0, "exclude": 0, "borderline": 0}
 
+        rule_decisions, unscreened = self._rule_filter(unscreened, cfg)
+        if rule_decisions:
+            self.log(
+                f"Screening Agent: {len(rule_decisions)} papers excluded by rules "
+                f"(year range, document type, excluded keywords)."
+            )
+
         batch_size = config.DEFAULT_SCREENING_BATCH_SIZE
-        batches = [unscreened[i : i + batch_size] for i in range(0, len(unscreened), batch_size)]
+        workers = int(cfg.get("screening_max_workers") or config.SCREENING_MAX_WORKERS)
+
+        # Compact, non-ASCII-escaped JSON: every byte here is billed as input tokens.
+        # Each paper is serialised once and its token count drives batch packing.
+        paper_json = {
+            p["id"]: fastjson.dumps({
+                k: v for k, v in (
+                    ("id", p["id"]),
+                    ("title", p.get("title", "")),
+                    ("abstract", (p.get("abstract") or "")[:600]),
+                ) if v
+            })
+            for p in unscreened
+        }
+        batches = self._pack_batches(
+            unscreened,
+            {pid: count_tokens(j, config.SCREENING_MODEL) for pid, j in paper_json.items()},
+            config.SCREENING_BATCH_TOKEN_BUDGET,
+            batch_size,
+        )
         total = len(batches)
         self.log(
             f"Screening Agent: {len(unscreened)} papers → {total} batches "
-            f"(batch size {batch_size}, {config.SCREENING_MAX_WORKERS} workers)…"
+            f"(≤{batch_size} papers / ≤{config.SCREENING_BATCH_TOKEN_BUDGET} tokens each, "
+            f"{workers} workers)…"
         )
 
-        completed_count = 0
-        lock = threading.Lock()
+        # Worker threads read/write the LLM response cache through their own cursors.
+        cache_pool = CursorPool(self.conn, workers)
+
+        render_prompt = bind(
+            SCREENING_USER,
+            research_question=cfg.get("research_question", ""),
+            review_type=cfg.get("review_type", "systematic review"),
+            strictness=cfg.get("strictness", 3),
+            inclusion_criteria=cfg.get("inclusion_criteria") or "not specified",
+            exclusion_criteria=cfg.get("exclusion_criteria") or "not specified",
+        )
+
+        def build_messages(batch: list[dict]) -> list[dict]:
+            papers_json = "[" + ",".join(paper_json[p["id"]] for p in batch) + "]"
+            prompt = render_prompt(papers_json=papers_json, n_papers=len(batch))
+            return [
+                {"role": "system", "content": SCREENING_SYSTEM},
+                {"role": "user", "content": prompt},
+            ]
 
         def screen_batch(batch: list[dict]) -> list[dict]:
-            papers_json = json.dumps([
-                {
-                    "id": p["id"],
-                    "title": p.get("title", ""),
-                    "abstract": (p.get("abstract") or "")[:600],
-                }
-                for p in batch
-            ])
-            prompt = SCREENING_USER.format(
-                research_question=cfg.get("research_question", ""),
-                review_type=cfg.get("review_type", "systematic review"),
-                strictness=cfg.get("strictness", 3),
-                inclusion_criteria=cfg.get("inclusion_criteria") or "not specified",
-                exclusion_criteria=cfg.get("exclusion_criteria") or "not specified",
-                papers_json=papers_json,
-                n_papers=len(batch),
-            )
             try:
                 result = chat_completion_json(
-                    messages=[
-                        {"role": "system", "content": SCREENING_SYSTEM},
-                        {"role": "user", "content": prompt},
-                    ],
+                    messages=build_messages(batch),
                     model=config.SCREENING_MODEL,
                     api_key=self.api_key,
                     temperature=0.1,
+                    cache=cache_pool,
                 )
                 return result.get("decisions", [])
             except Exception as e:
                 self.log(f"Screening Agent: batch failed — {e}. Marking as BORDERLINE.")
-                return [
-                    {"id": p["id"], "decision": "BORDERLINE", "confidence": 50, "reason": "API error"}
-                    for p in batch
-                ]
+                return self._borderline_fallback(batch, "API error")
+
+        # ── Batch API (optional, for large corpora) ────────────────────────────
+        all_decisions: list[dict] | None = None
+        if cfg.get("use_batch_api") and total >= config.BATCH_API_MIN_BATCHES:
+            try:
+                all_decisions = self._screen_with_batch_api(batches, build_messages)
+            except Exception as e:
+                self.log(f"Screening Agent: Batch API failed — {e}. Falling back to live calls.")
 
         # ── Run batches concurrently ───────────────────────────────────────────
-        all_decisions: list[dict] = []
-
-        with ThreadPoolExecutor(max_workers=config.SCREENING_MAX_WORKERS) as executor:
-            futures = {executor.submit(screen_batch, batch): batch for batch in batches}
-            for future in as_completed(futures):
-                decisions = future.result()
-                with lock:
-                    completed_count += 1
-                    all_decisions.extend(decisions)
-                    self.log(
-                        f"Screening Agent: {completed_count}/{total} batches done "
-                        f"({completed_count * batch_size}/{len(unscreened)} papers)…"
-                    )
+        if all_decisions is None:
+            all_decisions = []
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {executor.submit(screen_batch, batch): batch for batch in batches}
+                    # Results are collected on this thread, so no lock is needed;
+                    # progress is logged ~100 times per run at most.
+                    log_every = max(1, total // 100)
+                    papers_done = 0
+                    for done, future in enumerate(as_completed(futures), start=1):
+                        all_decisions.extend(future.result())
+                        papers_done += len(futures[future])
+                        if done % log_every == 0 or done == total:
+                            self.log(
+                                f"Screening Agent: {done}/{total} batches done "
+                                f"({papers_done}/{len(unscreened)} papers)…"
+                            )
+            finally:
+                cache_pool.close()
 
         # ── Write all results to DB (single-threaded) ─────────────────────────
         counts = {"include": 0, "exclude": 0, "borderline": 0}
-        for d in all_decisions:
+        pass1_rows: list[tuple] = []
+        excluded_rows: list[tuple] = []
+        for d in rule_decisions + all_decisions:
             pid = d.get("id")
             if not pid:
                 continue
@@ -108,20 +150,21 @@ class ScreeningAgent:
             if decision not in ("INCLUDE", "EXCLUDE", "BORDERLINE"):
                 decision = "BORDERLINE"
 
-            database.update_paper(
-                self.conn, pid,
-                screening_pass1=decision,
-                screening_pass1_reason=d.get("reason", ""),
-                screening_pass1_confidence=d.get("confidence", 50),
-            )
+            pass1_rows.append((decision, d.get("reason", ""), d.get("confidence", 50), pid))
             if decision == "INCLUDE":
                 counts["include"] += 1
             elif decision == "EXCLUDE":
                 counts["exclude"] += 1
-                database.update_paper(self.conn, pid, final_status="EXCLUDED")
+                excluded_rows.append(("EXCLUDED", pid))
             else:
                 counts["borderline"] += 1
 
+        database.update_papers_bulk(
+            self.conn, pass1_rows,
+            ["screening_pass1", "screening_pass1_reason", "screening_pass1_confidence"],
+        )
+        database.update_papers_bulk(self.conn, excluded_rows, ["final_status"])
+
         database.log_event(self.conn, "SCREENING_PASS_1", "Pass 1 complete", counts)
         self.log(
             f"Screening Agent Pass 1 complete — "
@@ -129,19 +172,114 @@ class ScreeningAgent:
         )
         return counts
 
+    @staticmethod
+    def _pack_batches(
+        papers: list[dict], tokens: dict[str, int], token_budget: int, max_papers: int
+    ) -> list[list[dict]]:
+        """
+        Greedily group papers in order until adding the next one would exceed
+        `token_budget` or `max_papers`. A paper larger than the budget gets a batch of its own.
+        """
+        batches: list[list[dict]] = []
+        current: list[dict] = []
+        used = 0
+        for p in papers:
+            n = tokens[p["id"]]
+            if current and (used + n > token_budget or len(current) >= max_papers):
+                batches.append(current)
+                current, used = [], 0
+            current.append(p)
+            used += n
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _rule_filter(papers: list[dict], cfg: dict) -> tuple[list[dict], list[dict]]:
+        """
+        Split papers into (rule-based EXCLUDE decisions, remainder for the LLM).
+        Only deterministic checks the user configured are applied: year range,
+        document types, and excluded keywords appearing in the title.
+        """
+        year_min = cfg.get("year_min")
+        year_max = cfg.get("year_max")
+        doc_types = set(cfg.get("document_types") or [])
+        exclude_keywords = [
+            k.strip().lower() for k in (cfg.get("exclude_keywords") or "").split(",") if k.strip()
+        ]
+
+        decisions: list[dict] = []
+        remainder: list[dict] = []
+        for p in papers:
+            year = p.get("year")
+            doc_type = p.get("document_type")
+            title = (p.get("title") or "").lower()
+            reason = None
+            if year and year_min and year < year_min:
+                reason = f"published {year}, before {year_min}"
+            elif year and year_max and year > year_max:
+                reason = f"published {year}, after {year_max}"
+            elif doc_types and doc_type and doc_type not in doc_types:
+                reason = f"document type '{doc_type}' not selected"
+            else:
+                hit = next((k for k in exclude_keywords if k in title), None)
+                if hit:
+                    reason = f"title contains excluded keyword '{hit}'"
+
+            if reason:
+                decisions.append({
+                    "id": p["id"], "decision": "EXCLUDE", "confidence": 100,
+                    "reason": f"Rule-based: {reason}",
+                })
+            else:
+                remainder.append(p)
+        return decisions, remainder
+
+    def _screen_with_batch_api(self, batches: list[list[dict]], build_messages) -> list[dict]:
+        """Submit all batches as one OpenAI Batch API job and wait for its decisions."""
+        requests = [
+            {
+                "custom_id": f"batch-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": config.SCREENING_MODEL,
+                    "messages": build_messages(batch),
+                    "temperature": 0.1,
+                    "response_format": {"type": "json_object"},
+                },
+            }
+            for i, batch in enumerate(batches)
+        ]
+        batch_id = llm_batch.submit_batch(requests, self.api_key)
+        self.log(f"Screening Agent: submitted {len(requests)} batches to the Batch API ({batch_id})…")
+
+        status = llm_batch.wait_for_batch(
+            batch_id, self.api_key, config.BATCH_API_POLL_SECONDS, self.log
+        )
+        if status != "completed":
+            raise RuntimeError(f"batch {batch_id} ended with status '{status}'")
+
+        results = llm_batch.download_results(batch_id, self.api_key)
+        decisions: list[dict] = []
+        for i, batch in enumerate(batches):
+            try:
+                decisions.extend(fastjson.loads(results[f"batch-{i}"]).get("decisions", []))
+            except Exception:
+                decisions.extend(self._borderline_fallback(batch, "Batch API error"))
+        return decisions
+
+    @staticmethod
+    def _borderline_fallback(batch: list[dict], reason: str) -> list[dict]:
+        return [
+            {"id": p["id"], "decision": "BORDERLINE", "confidence": 50, "reason": reason}
+            for p in batch
+        ]
+
     def apply_human_decisions(self) -> None:
         """Move HITL decisions from human_decision field into final_status."""
-        papers = database.get_papers(self.conn, pass1="BORDERLINE")
-        for p in papers:
-            decision = p.get("human_decision")
-            if decision == "INCLUDE":
-                database.update_paper(self.conn, p["id"], screening_pass1="INCLUDE", final_status=None)
-            elif decision == "EXCLUDE":
-                database.update_paper(self.conn, p["id"], final_status="EXCLUDED")
+        database.apply_human_decisions(self.conn)
 
     def finalize_included(self) -> None:
         """Mark all INCLUDE papers without a final_status as INCLUDED."""
-        papers = database.get_papers(self.conn)
-        for p in papers:
-            if p.get("screening_pass1") == "INCLUDE" and not p.get("final_status"):
-                database.update_paper(self.conn, p["id"], final_status="INCLUDED")
+        database.finalize_included(self.conn)
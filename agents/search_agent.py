@@ -1,11 +1,20 @@
 """Search Agent — executes queries against OpenAlex and Semantic Scholar, deduplicates results."""
 from __future__ import annotations
 
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Callable
 
 from data import openalex_client, semantic_scholar, database
+from utils.dedup import SimHashIndex, same_title, shingles, simhash, tokenize
 import config
 
+_TITLE_KEY_RE = re.compile(r"[^a-z0-9]")
+# Titles shorter than this are matched on the exact key only — too few
+# shingles for a meaningful SimHash.
+_SIMHASH_MIN_TOKENS = 4
+
 
 class SearchAgent:
     def __init__(
@@ -22,21 +31,26 @@ class SearchAgent:
 
     def run(self, queries: dict, cfg: dict) -> int:
         """Execute all search queries and store results. Returns total papers stored."""
-        total_inserted = 0
         seen_dois: set[str] = set()
         seen_titles: set[str] = set()
+        seen_hashes = SimHashIndex(max_distance=3)
+        seen = (seen_dois, seen_titles, seen_hashes)
 
         year_min = cfg.get("year_min")
         year_max = cfg.get("year_max")
         doc_types = cfg.get("document_types") or []
-        max_per_query = max(50, cfg.get("target_corpus_size", 50) * 4)
-
-        # ── OpenAlex ──────────────────────────────────────────────────────────
-        oa_queries = queries.get("openalex_queries", [])
-        for i, q in enumerate(oa_queries):
-            self.log(f"Search Agent: OpenAlex query {i+1}/{len(oa_queries)}: '{q['query'][:60]}…'")
-            try:
-                papers = openalex_client.search_works(
+        target = cfg.get("target_corpus_size", 50)
+        max_per_query = max(50, target * 4)
+
+        # ── Build one task per query ───────────────────────────────────────────
+        # (label, log_name, callable) — callables run on worker threads, so they
+        # get no progress_callback; all logging and DB writes stay on this thread.
+        openalex_tasks: list[tuple[str, str, Callable[[], list[dict]]]] = []
+        for i, q in enumerate(queries.get("openalex_queries", [])):
+            openalex_tasks.append((
+                f"OpenAlex query {i+1}", q["query"],
+                functools.partial(
+                    openalex_client.search_works,
                     query=q["query"],
                     email=self.openalex_email,
                     year_min=year_min,
@@ -44,68 +58,131 @@ class SearchAgent:
                     doc_types=doc_types if doc_types else None,
                     max_results=max_per_query,
                     query_source=f"openalex:{i+1}",
-                    progress_callback=self.log,
-                )
-                unique = self._deduplicate(papers, seen_dois, seen_titles)
-                n = database.upsert_papers(self.conn, unique)
-                total_inserted += n
-                database.log_event(
-                    self.conn, "SEARCHING",
-                    f"OpenAlex query {i+1}: found {len(papers)}, {n} new after dedup",
-                )
-                self.log(f"Search Agent: OpenAlex query {i+1} → {len(papers)} results, {n} new.")
-            except Exception as e:
-                self.log(f"Search Agent: OpenAlex query {i+1} failed — {e}")
-
-        # ── Semantic Scholar ───────────────────────────────────────────────────
-        ss_queries = queries.get("semantic_scholar_queries", [])
-        for i, q in enumerate(ss_queries):
-            self.log(f"Search Agent: Semantic Scholar query {i+1}/{len(ss_queries)}: '{q['query'][:60]}…'")
-            try:
-                papers = semantic_scholar.search_papers(
-                    query=q["query"],
-                    api_key=self.ss_api_key,
-                    year_min=year_min,
-                    year_max=year_max,
-                    max_results=max_per_query // 2,
-                    query_source=f"ss:{i+1}",
-                    progress_callback=self.log,
+                ),
+            ))
+
+        def ss_tasks(max_results: int) -> list[tuple[str, str, Callable[[], list[dict]]]]:
+            return [
+                (
+                    f"Semantic Scholar query {i+1}", q["query"],
+                    functools.partial(
+                        semantic_scholar.search_papers,
+                        query=q["query"],
+                        api_key=self.ss_api_key,
+                        year_min=year_min,
+                        year_max=year_max,
+                        max_results=max_results,
+                        query_source=f"ss:{i+1}",
+                    ),
                 )
-                unique = self._deduplicate(papers, seen_dois, seen_titles)
-                n = database.upsert_papers(self.conn, unique)
-                total_inserted += n
-                database.log_event(
-                    self.conn, "SEARCHING",
-                    f"Semantic Scholar query {i+1}: found {len(papers)}, {n} new after dedup",
+                for i, q in enumerate(queries.get("semantic_scholar_queries", []))
+            ]
+
+        # Large reviews go to OpenAlex first: Semantic Scholar's rate limit
+        # (1 req/s without a key) makes it the bottleneck, so it only tops up
+        # whatever OpenAlex leaves short of the candidate goal.
+        if target < config.OPENALEX_FIRST_MIN_TARGET:
+            total_inserted = self._run_tasks(openalex_tasks + ss_tasks(max_per_query // 2), seen)
+        else:
+            total_inserted = self._run_tasks(openalex_tasks, seen)
+            n_ss = len(queries.get("semantic_scholar_queries", []))
+            shortfall = target * config.SEARCH_CANDIDATES_PER_TARGET - total_inserted
+            if n_ss and shortfall > 0:
+                per_query = min(max_per_query // 2, -(-shortfall // n_ss))
+                total_inserted += self._run_tasks(ss_tasks(per_query), seen)
+            elif n_ss:
+                self.log(
+                    f"Search Agent: OpenAlex met the candidate goal — "
+                    f"skipping {n_ss} Semantic Scholar queries."
                 )
-                self.log(f"Search Agent: Semantic Scholar query {i+1} → {len(papers)} results, {n} new.")
-            except Exception as e:
-                self.log(f"Search Agent: Semantic Scholar query {i+1} failed — {e}")
 
         self.log(f"Search Agent: complete. {total_inserted} unique papers stored.")
         database.log_event(self.conn, "SEARCHING", f"Total unique papers: {total_inserted}")
         return total_inserted
 
+    def _run_tasks(self, tasks: list[tuple[str, str, Callable[[], list[dict]]]], seen: tuple) -> int:
+        """Run `tasks` concurrently, then dedup and store their results in task order."""
+        if not tasks:
+            return 0
+        # ── Run all queries concurrently ───────────────────────────────────────
+        self.log(
+            f"Search Agent: running {len(tasks)} queries "
+            f"({config.SEARCH_MAX_WORKERS} workers)…"
+        )
+        results: dict[int, list[dict] | Exception] = {}
+        with ThreadPoolExecutor(max_workers=config.SEARCH_MAX_WORKERS) as executor:
+            futures = {executor.submit(fn): idx for idx, (_, _, fn) in enumerate(tasks)}
+            for future in as_completed(futures):
+                idx = futures[future]
+                label, query_text, _ = tasks[idx]
+                try:
+                    results[idx] = future.result()
+                    self.log(f"Search Agent: {label} ('{query_text[:60]}…') → {len(results[idx])} results.")
+                except Exception as e:
+                    results[idx] = e
+                    self.log(f"Search Agent: {label} failed — {e}")
+
+        # ── Deduplicate in query order so the first-seen copy wins ─────────────
+        inserted = 0
+        for idx, (label, _, _) in enumerate(tasks):
+            papers = results.get(idx)
+            if not isinstance(papers, list):
+                continue
+            unique, near_dups = self._deduplicate(papers, *seen)
+            n = database.upsert_papers(self.conn, unique)
+            inserted += n
+            near_note = f" ({near_dups} near-duplicate titles dropped)" if near_dups else ""
+            database.log_event(
+                self.conn, "SEARCHING",
+                f"{label}: found {len(papers)}, {n} new after dedup{near_note}",
+                {"found": len(papers), "new": n, "near_duplicates": near_dups},
+            )
+            self.log(f"Search Agent: {label} → {n} new after dedup{near_note}.")
+        return inserted
+
     def _deduplicate(
-        self, papers: list[dict], seen_dois: set[str], seen_titles: set[str]
-    ) -> list[dict]:
+        self,
+        papers: list[dict],
+        seen_dois: set[str],
+        seen_titles: set[str],
+        seen_hashes: SimHashIndex,
+    ) -> tuple[list[dict], int]:
+        """
+        Drop papers matching an earlier one by DOI, exact title key, or a
+        near-identical title: a SimHash candidate within Hamming distance 3
+        that same_title() confirms. Returns (unique papers, near-duplicates dropped).
+        """
         unique: list[dict] = []
+        near_dups = 0
         for p in papers:
             doi = (p.get("doi") or "").lower().strip()
-            title_key = self._title_key(p.get("title", ""))
+            title = p.get("title", "")
+            title_key = self._title_key(title)
 
             if doi and doi in seen_dois:
                 continue
             if title_key in seen_titles:
                 continue
 
+            tokens = tokenize(title)
+            h = simhash(shingles(tokens)) if len(tokens) >= _SIMHASH_MIN_TOKENS else None
+            year = p.get("year")
+            if h is not None and any(
+                same_title(tokens, other, year, other_year)
+                for other, other_year in seen_hashes.near(h)
+            ):
+                near_dups += 1
+                continue
+
             if doi:
                 seen_dois.add(doi)
             seen_titles.add(title_key)
+            if h is not None:
+                seen_hashes.add(h, (tokens, year))
             unique.append(p)
-        return unique
+        return unique, near_dups
 
     @staticmethod
+    @functools.lru_cache(maxsize=16384)
     def _title_key(title: str) -> str:
-        import re
-        return re.sub(r"[^a-z0-9]", "", title.lower())[:60]
+        return _TITLE_KEY_RE.sub("", title.lower())[:60]
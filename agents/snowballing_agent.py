@@ -1,7 +1,9 @@
 """Snowballing Agent — iterative citation network expansion."""
 from __future__ import annotations
 
-from typing import Callable
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
 
 from data import database, openalex_client
 from agents.screening_agent import ScreeningAgent
@@ -31,53 +33,73 @@ class SnowballingAgent:
         target_size = cfg.get("target_corpus_size", config.DEFAULT_TARGET_CORPUS_SIZE)
 
         total_new_included = 0
+        # Ids only, loaded once and kept current as candidates are inserted.
+        known_ids = set(database.iter_all_ids(self.conn))
+        # Seeds whose neighbourhood was already fetched: each round only expands
+        # the frontier of papers included since the previous one.
+        visited_seeds: set[str] = set()
 
         for round_num in range(1, max_rounds + 1):
             self.log(f"Snowballing Agent: Round {round_num}/{max_rounds}…")
 
             # Get currently included papers
-            included = database.get_papers(self.conn, final_status="INCLUDED")
+            included = database.get_papers(
+                self.conn, final_status="INCLUDED", columns=("id", "openalex_id")
+            )
             if not included:
                 self.log("Snowballing Agent: no included papers to snowball from.")
                 break
 
-            # Collect candidate IDs from citation network
-            known_ids = self._get_all_known_ids()
-            candidates: list[dict] = []
-
-            for p in included:
-                if len(candidates) >= max_candidates:
-                    break
-                oa_id = p.get("openalex_id")
-                if not oa_id:
-                    continue
-
-                if direction in ("both", "backward"):
-                    try:
-                        refs = openalex_client.get_references(
-                            oa_id, self.openalex_email, max_results=100
-                        )
-                        candidates.extend([r for r in refs if r["id"] not in known_ids])
-                    except Exception as e:
-                        self.log(f"Snowballing: backward lookup failed for {oa_id} — {e}")
-
-                if direction in ("both", "forward"):
-                    try:
-                        citers = openalex_client.get_citing_papers(
-                            oa_id, self.openalex_email, max_results=100
-                        )
-                        candidates.extend([r for r in citers if r["id"] not in known_ids])
-                    except Exception as e:
-                        self.log(f"Snowballing: forward lookup failed for {oa_id} — {e}")
-
-            # Deduplicate candidates
-            seen: set[str] = set()
-            unique_candidates: list[dict] = []
-            for c in candidates:
-                if c["id"] not in seen and c["id"] not in known_ids:
-                    seen.add(c["id"])
-                    c["found_via"] = f"snowball_round_{round_num}"
-                    unique_candidates.append(c)
+            # Collect new candidates from the citation network, de-duplicated as they arrive
+            unique: dict[str, dict] = {}
+            found_via = f"snowball_round_{round_num}"
+
+            def collect(works: Iterable[dict]) -> None:
+                for r in works:
+                    if len(unique) >= max_candidates:
+                        return
+                    rid = r["id"]
+                    if rid not in known_ids and rid not in unique:
+                        r["found_via"] = found_via
+                        unique[rid] = r
+
+            seed_ids = [
+                p["openalex_id"] for p in included
+                if p.get("openalex_id") and p["openalex_id"] not in visited_seeds
+            ]
+            visited_seeds.update(seed_ids)
+
+            # Backward and forward lookups are independent, so both run at once
+            # (they share the client's OpenAlex rate limiter). Worker threads
+            # must not touch the UI, so their messages are logged from here.
+            # Seeds' reference lists are already stored, so backward lookups
+            # only fetch the referenced works themselves.
+            backward = functools.partial(
+                openalex_client.get_references_bulk,
+                known_refs=database.get_reference_lists(self.conn, seed_ids),
+            )
+            lookups = [
+                fetch for d, fetch in (
+                    ("backward", backward),
+                    ("forward", openalex_client.get_citing_papers_bulk),
+                ) if direction in ("both", d)
+            ]
+            messages: list[str] = []
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(
+                        fetch, seed_ids, self.openalex_email,
+                        max_results=max_candidates, progress_callback=messages.append,
+                    )
+                    for fetch in lookups
+                ]
+                results = [f.result() for f in futures]
+            for msg in messages:
+                self.log(msg)
+            for works in results:  # backward first, as before
+                collect(works)
+
+            unique_candidates = list(unique.values())
 
             if not unique_candidates:
                 self.log(f"Snowballing Agent: Round {round_num} — no new candidates. Stopping.")
@@ -89,6 +111,7 @@ class SnowballingAgent:
 
             # Insert candidates into DB
             database.upsert_papers(self.conn, unique_candidates)
+            known_ids.update(c["id"] for c in unique_candidates)
 
             # Screen them
             pre_counts = database.count_papers(self.conn)
@@ -124,7 +147,3 @@ class SnowballingAgent:
 
         self.log(f"Snowballing Agent: complete. {total_new_included} total new papers included.")
         return total_new_included
-
-    def _get_all_known_ids(self) -> set[str]:
-        all_papers = database.get_papers(self.conn)
-        return {p["id"] for p in all_papers}
@@ -1,19 +1,22 @@
 """Synthesis Agent — embeddings, clustering, narrative synthesis, gap analysis."""
 from __future__ import annotations
 
-import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 
 import numpy as np
 
 from data import database
+from agents.relevance_agent import RelevanceAgent, embedding_text
 from utils import llm as llm_utils
 from utils.prompts import (
     CLUSTER_LABEL_SYSTEM, CLUSTER_LABEL_USER,
-    SYNTHESIS_SYSTEM, SYNTHESIS_USER,
+    SYNTHESIS_SYSTEM, SYNTHESIS_USER, bind,
 )
 import config
 
+_render_cluster_label = bind(CLUSTER_LABEL_USER)
+
 
 class SynthesisAgent:
     def __init__(
@@ -36,38 +39,46 @@ class SynthesisAgent:
         5. Generate overall synthesis
         Returns the full synthesis dict.
         """
-        papers = database.get_papers(self.conn, final_status="INCLUDED")
+        papers = database.get_papers(
+            self.conn, final_status="INCLUDED", columns=("id", "title", "abstract")
+        )
         if not papers:
             self.log("Synthesis Agent: no included papers.")
             return {}
 
         self.log(f"Synthesis Agent: starting synthesis for {len(papers)} papers…")
 
-        # ── Step 1: Embeddings ─────────────────────────────────────────────────
-        self.log("Synthesis Agent: computing embeddings…")
-        texts = [
-            f"{p.get('title', '')} {(p.get('abstract') or '')[:400]}"
+        # Per-paper prompt text, formatted once: for embeddings and for cluster labels.
+        texts = [embedding_text(p) for p in papers]
+        label_texts = [
+            f"Title: {p.get('title','')}\nAbstract: {(p.get('abstract') or '')[:300]}"
             for p in papers
         ]
+
+        # ── Step 1: Embeddings ─────────────────────────────────────────────────
+        self.log("Synthesis Agent: computing embeddings…")
         try:
-            vectors = llm_utils.get_embeddings(texts, self.api_key, config.EMBEDDING_MODEL)
-            for p, vec in zip(papers, vectors):
-                database.save_embeddings(self.conn, p["id"], vec)
+            vectors = llm_utils.get_embeddings_cached(
+                texts, self.api_key, config.EMBEDDING_MODEL, self.conn
+            )
+            database.save_embeddings_bulk(self.conn, [p["id"] for p in papers], vectors)
         except Exception as e:
             self.log(f"Synthesis Agent: embedding failed — {e}. Skipping clustering.")
-            vectors = []
+            vectors = None
 
         # ── Step 2: Clustering ─────────────────────────────────────────────────
         cluster_ids = self._cluster(papers, vectors)
-        for p, cid in zip(papers, cluster_ids):
-            database.update_paper(self.conn, p["id"], cluster_id=int(cid))
+        database.update_papers_bulk(
+            self.conn,
+            [(int(cid), p["id"]) for p, cid in zip(papers, cluster_ids)],
+            ["cluster_id"],
+        )
 
         n_clusters = len(set(c for c in cluster_ids if c >= 0))
         self.log(f"Synthesis Agent: identified {n_clusters} clusters.")
 
         # ── Step 3: Relevance scoring ──────────────────────────────────────────
-        if vectors:
-            from agents.relevance_agent import RelevanceAgent
+        if vectors is not None:
             RelevanceAgent(self.api_key, self.conn, self.log).run(
                 cfg.get("research_question", "")
             )
@@ -77,20 +88,32 @@ class SynthesisAgent:
 
         # ── Step 6: Label clusters and summarise ───────────────────────────────
         cluster_summaries: list[dict] = []
+        label_rows: list[tuple] = []
         unique_clusters = sorted(set(c for c in cluster_ids if c >= 0))
 
-        for cid in unique_clusters:
-            cluster_papers = [
-                p for p, c in zip(papers, cluster_ids) if c == cid
-            ]
-            self.log(f"Synthesis Agent: labelling cluster {cid+1}/{n_clusters} ({len(cluster_papers)} papers)…")
-            label_info = self._label_cluster(cluster_papers)
+        papers_by_cluster = {
+            cid: [p for p, c in zip(papers, cluster_ids) if c == cid]
+            for cid in unique_clusters
+        }
+        self.log(f"Synthesis Agent: labelling {n_clusters} clusters…")
+        # Label calls run concurrently; results are consumed here in cluster order.
+        with ThreadPoolExecutor(max_workers=config.SYNTHESIS_MAX_WORKERS) as executor:
+            jobs = {
+                cid: executor.submit(
+                    self._label_cluster,
+                    [t for t, c in zip(label_texts, cluster_ids) if c == cid],
+                )
+                for cid in unique_clusters
+            }
+
+        for cid, fut in jobs.items():
+            cluster_papers = papers_by_cluster[cid]
+            label_info = fut.result()
 
             label = label_info.get("label", f"Cluster {cid+1}")
             summary = label_info.get("summary", "")
 
-            for p in cluster_papers:
-                database.update_paper(self.conn, p["id"], cluster_label=label)
+            label_rows.extend((label, p["id"]) for p in cluster_papers)
 
             cluster_summaries.append({
                 "cluster_id": cid,
@@ -100,10 +123,10 @@ class SynthesisAgent:
             })
 
         # Papers with noise cluster (-1)
-        noise_papers = [p for p, c in zip(papers, cluster_ids) if c == -1]
-        if noise_papers:
-            for p in noise_papers:
-                database.update_paper(self.conn, p["id"], cluster_label="Uncategorised")
+        label_rows.extend(
+            ("Uncategorised", p["id"]) for p, c in zip(papers, cluster_ids) if c == -1
+        )
+        database.update_papers_bulk(self.conn, label_rows, ["cluster_label"])
 
         # ── Step 5: Overall synthesis ──────────────────────────────────────────
         self.log("Synthesis Agent: generating overall narrative synthesis…")
@@ -122,19 +145,25 @@ class SynthesisAgent:
 
     # ── Private helpers ────────────────────────────────────────────────────────
 
-    def _cluster(self, papers: list[dict], vectors: list[list[float]]) -> list[int]:
+    def _cluster(self, papers: list[dict], X: np.ndarray | None) -> list[int]:
         """Cluster using HDBSCAN. Falls back to a single cluster if not enough data."""
         n = len(papers)
-        if n < 4 or not vectors:
+        if n < 4 or X is None:
             return [0] * n
 
+        # On unit vectors ‖a−b‖² = 2 − 2·a·b, so euclidean distance ranks pairs
+        # exactly like cosine — and unlike cosine it can use hdbscan's tree-based
+        # MST construction and plain k-means.
+        X = X / np.linalg.norm(X, axis=1, keepdims=True).clip(min=1e-12)
+
         try:
             import hdbscan
-            X = np.array(vectors)
             min_cluster_size = max(2, n // 8)
             clusterer = hdbscan.HDBSCAN(
                 min_cluster_size=min_cluster_size,
-                metric="cosine",
+                metric="euclidean",
+                algorithm="boruvka_kdtree",
+                core_dist_n_jobs=-1,
                 prediction_data=True,
             )
             labels = clusterer.fit_predict(X)
@@ -148,43 +177,47 @@ class SynthesisAgent:
         # Fallback: k-means with k=min(5, n//3)
         try:
             from sklearn.cluster import KMeans
-            X = np.array(vectors)
             k = min(5, max(2, n // 3))
             km = KMeans(n_clusters=k, random_state=42, n_init=10)
             return km.fit_predict(X).tolist()
         except Exception:
             return [0] * n
 
-    def _project_2d(self, vectors: list[list[float]]) -> list[tuple[float, float]] | None:
-        if len(vectors) < 4:
+    def _project_2d(self, X: np.ndarray | None) -> list[tuple[float, float]] | None:
+        if X is None or len(X) < 4:
             return None
-        try:
-            import umap
-            X = np.array(vectors)
-            reducer = umap.UMAP(n_components=2, random_state=42, n_neighbors=min(15, len(vectors)-1))
-            coords = reducer.fit_transform(X)
-            return [(float(r[0]), float(r[1])) for r in coords]
-        except Exception:
-            pass
+        # UMAP adds nothing visible on a few dozen points, so small corpora
+        # go straight to PCA and skip UMAP's numba warm-up.
+        if len(X) >= config.UMAP_MIN_PAPERS:
+            try:
+                import umap
+                from sklearn.decomposition import PCA
+                X_reduced = PCA(
+                    n_components=min(config.UMAP_PCA_COMPONENTS, *X.shape)
+                ).fit_transform(X)
+                reducer = umap.UMAP(
+                    n_components=2, random_state=42, init="pca", low_memory=True,
+                    n_neighbors=min(15, len(X)-1),
+                )
+                coords = reducer.fit_transform(X_reduced)
+                return [(float(r[0]), float(r[1])) for r in coords]
+            except Exception:
+                pass
         try:
             from sklearn.decomposition import PCA
-            X = np.array(vectors)
             pca = PCA(n_components=2)
             coords = pca.fit_transform(X)
             return [(float(r[0]), float(r[1])) for r in coords]
         except Exception:
             return None
 
-    def _label_cluster(self, papers: list[dict]) -> dict:
-        papers_text = "\n\n".join([
-            f"Title: {p.get('title','')}\nAbstract: {(p.get('abstract') or '')[:300]}"
-            for p in papers[:15]
-        ])
+    def _label_cluster(self, label_texts: list[str]) -> dict:
+        papers_text = "\n\n".join(label_texts[:15])
         try:
             return llm_utils.chat_completion_json(
                 messages=[
                     {"role": "system", "content": CLUSTER_LABEL_SYSTEM},
-                    {"role": "user", "content": CLUSTER_LABEL_USER.format(papers_text=papers_text)},
+                    {"role": "user", "content": _render_cluster_label(papers_text=papers_text)},
                 ],
                 model=config.SYNTHESIS_MODEL,
                 api_key=self.api_key,
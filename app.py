@@ -74,8 +74,8 @@ with st.sidebar:
 
     if st.session_state.db_conn:
         try:
-            from data.database import count_papers
-            counts = count_papers(st.session_state.db_conn)
+            from data.database import get_counts_cached
+            counts = get_counts_cached(st.session_state.db_conn)
             col1, col2 = st.columns(2)
             col1.metric("Total", counts["total"])
             col2.metric("Included", counts["included"])
@@ -89,8 +89,10 @@ with st.sidebar:
         # Reset session
         import os, tempfile
         old_path = get_db_path(st.session_state.session_id)
-        for k in list(st.session_state.keys()):
-            del st.session_state[k]
+        old_conn = st.session_state.get("db_conn")
+        st.session_state.clear()
+        if old_conn is not None:
+            old_conn.close()
         _init_state()
         db_path = get_db_path(st.session_state.session_id)
         st.session_state.db_conn = get_connection(db_path)
@@ -6,6 +6,7 @@ SCREENING_MODEL = "gpt-4o-mini"
 QUALITY_MODEL = "gpt-4o"
 SYNTHESIS_MODEL = "gpt-4o"
 EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIM = 256  # Truncated text-embedding-3 vectors (native 1536): 6× smaller
 
 # ── API Endpoints ──────────────────────────────────────────────────────────────
 OPENALEX_BASE = "https://api.openalex.org"
@@ -17,12 +18,44 @@ DEFAULT_MAX_SNOWBALL_ROUNDS = 3
 DEFAULT_MIN_YIELD_RATE = 0.02
 DEFAULT_MAX_CANDIDATES_PER_ROUND = 2000
 DEFAULT_SCREENING_STRICTNESS = 3
-DEFAULT_SCREENING_BATCH_SIZE = 20  # Papers per LLM call in screening
-SCREENING_MAX_WORKERS = 12         # Concurrent LLM calls during screening
-QUALITY_MAX_WORKERS = 8            # Concurrent LLM calls during quality assessment
-# Tune these down if you hit 429 rate-limit errors (depends on your OpenAI tier).
+DEFAULT_SCREENING_BATCH_SIZE = 20  # Max papers per LLM call in screening
+SCREENING_BATCH_TOKEN_BUDGET = 8000  # Max paper tokens per screening call
+# LLM calls are network-bound, so worker counts scale with cores × 5 rather than
+# cores. Override via env var or the Define Review page; tune these down if you
+# hit 429 rate-limit errors (depends on your OpenAI tier).
+_DEFAULT_LLM_WORKERS = min(64, (os.cpu_count() or 4) * 5)
+SCREENING_MAX_WORKERS = int(os.environ.get("SCREENING_MAX_WORKERS", _DEFAULT_LLM_WORKERS))
+QUALITY_MAX_WORKERS = int(os.environ.get("QUALITY_MAX_WORKERS", _DEFAULT_LLM_WORKERS))
+SEARCH_MAX_WORKERS = 4             # Concurrent search queries (bounded by API rate limits)
+OPENALEX_FIRST_MIN_TARGET = 100    # From this target corpus size, Semantic Scholar only tops up OpenAlex
+SEARCH_CANDIDATES_PER_TARGET = 10  # Candidate goal per targeted included paper (OpenAlex-first mode)
+SYNTHESIS_MAX_WORKERS = 8          # Concurrent cluster-labelling calls
+EMBEDDING_MAX_WORKERS = 4          # Concurrent embeddings requests (2048 texts each)
+DB_POOL_MAX_SIZE = 8               # Max DuckDB cursors handed to worker threads
+
+# ── Synthesis ──────────────────────────────────────────────────────────────────
+UMAP_MIN_PAPERS = 50               # Smaller corpora are projected with PCA alone
+UMAP_PCA_COMPONENTS = 50           # PCA pre-reduction before UMAP
+
+# ── OpenAI Batch API (screening) ───────────────────────────────────────────────
+BATCH_API_MIN_BATCHES = 10         # Smaller screening runs always use live calls
+BATCH_API_POLL_SECONDS = 30
+
+# ── LLM Response Cache ─────────────────────────────────────────────────────────
+LLM_CACHE_MAX_TEMPERATURE = 0.2    # Only near-deterministic calls are cached
+
+# ── OpenAlex Snowballing Cache ─────────────────────────────────────────────────
+OPENALEX_CACHE_TTL_SECONDS = 7 * 24 * 3600  # Shared across sessions; expires only via the TTL
+
+# ── Semantic Scholar Paper Cache ───────────────────────────────────────────────
+SEMANTIC_SCHOLAR_CACHE_TTL_SECONDS = 30 * 24 * 3600  # Paper metadata; kept across reviews
+# Local corpus snapshot store (see data/semantic_scholar_local.py); unset = API only
+SEMANTIC_SCHOLAR_SNAPSHOT_DB = os.environ.get("SEMANTIC_SCHOLAR_SNAPSHOT_DB", "")
 
 # ── Rate Limits ────────────────────────────────────────────────────────────────
+OPENAI_RPM = int(os.environ.get("OPENAI_RPM", 500))        # requests/min, match your OpenAI tier
+OPENAI_TPM = int(os.environ.get("OPENAI_TPM", 200_000))    # tokens/min, match your OpenAI tier
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 128))  # shared OpenAI client pool
 OPENALEX_RATE_LIMIT = 10           # req/sec polite pool
 SS_RATE_LIMIT_UNAUTH = 1           # req/sec
 SS_RATE_LIMIT_AUTH = 10            # req/sec
@@ -1,13 +1,17 @@
 """DuckDB schema, connection management, and CRUD operations."""
 from __future__ import annotations
 
-import json
 import tempfile
 import os
+import weakref
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterator
 
 import duckdb
+import numpy as np
+import pandas as pd
+
+from utils import fastjson, text
 
 
 # ── Connection ─────────────────────────────────────────────────────────────────
@@ -44,6 +48,13 @@ def _init_schema(conn: duckdb.DuckDBPyConnection) -> None:
             semantic_scholar_id VARCHAR,
             referenced_works JSON,
 
+            -- Export fields, normalised once at insert (see upsert_papers)
+            title_clean VARCHAR,
+            abstract_clean TEXT,
+            journal_clean VARCHAR,
+            bibkey VARCHAR,
+            authors_display VARCHAR,
+
             -- Pipeline fields
             query_source VARCHAR,
             screening_pass1 VARCHAR,
@@ -65,16 +76,31 @@ def _init_schema(conn: duckdb.DuckDBPyConnection) -> None:
         )
     """)
 
+    # One row per (paper, OpenAlex work it references); papers.referenced_works as a relation.
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS paper_references (
+            paper_id VARCHAR,
+            ref_openalex_id VARCHAR,
+            PRIMARY KEY (paper_id, ref_openalex_id)
+        )
+    """)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_paper_references_target ON paper_references(ref_openalex_id)"
+    )
+
     conn.execute("""
         CREATE TABLE IF NOT EXISTS embeddings (
             paper_id VARCHAR PRIMARY KEY,
-            vector FLOAT[]
+            vector BLOB  -- packed float16, see save_embeddings
         )
     """)
 
+    conn.execute("""
+        CREATE SEQUENCE IF NOT EXISTS search_queries_id_seq
+    """)
     conn.execute("""
         CREATE TABLE IF NOT EXISTS search_queries (
-            id INTEGER PRIMARY KEY,
+            id INTEGER PRIMARY KEY DEFAULT nextval('search_queries_id_seq'),
             query_text VARCHAR,
             target_api VARCHAR,
             results_count INTEGER,
@@ -82,9 +108,12 @@ def _init_schema(conn: duckdb.DuckDBPyConnection) -> None:
         )
     """)
 
+    conn.execute("""
+        CREATE SEQUENCE IF NOT EXISTS pipeline_log_id_seq
+    """)
     conn.execute("""
         CREATE TABLE IF NOT EXISTS pipeline_log (
-            id INTEGER PRIMARY KEY,
+            id INTEGER PRIMARY KEY DEFAULT nextval('pipeline_log_id_seq'),
             stage VARCHAR,
             message TEXT,
             details JSON,
@@ -124,39 +153,128 @@ def _init_schema(conn: duckdb.DuckDBPyConnection) -> None:
         )
     """)
 
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            key VARCHAR PRIMARY KEY,  -- content hash of (model, text)
+            vec BLOB                  -- packed float32
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS llm_cache (
+            key VARCHAR PRIMARY KEY,
+            response JSON,
+            created_at TIMESTAMP
+        )
+    """)
+
 
 # ── Papers ─────────────────────────────────────────────────────────────────────
 
+_PAPER_INSERT_COLUMNS = (
+    "id", "doi", "title", "abstract", "authors", "year", "journal", "source",
+    "document_type", "citation_count", "open_access_url", "concepts",
+    "openalex_id", "semantic_scholar_id", "referenced_works", "query_source", "found_via",
+    "title_clean", "abstract_clean", "journal_clean", "bibkey", "authors_display",
+)
+
+
+def _export_fields(p: dict) -> tuple:
+    """
+    Whitespace-normalised title/abstract/journal, the BibTeX key and the
+    "First, Second, Third" author line the UI shows for one paper.
+    """
+    title = text.clean(p.get("title"))
+    names = [a.get("name") for a in (p.get("authors") or []) if a.get("name")]
+    return (
+        title,
+        text.clean(p.get("abstract")),
+        text.clean(p.get("journal")),
+        text.bibtex_key(p["id"], names, p.get("year"), title),
+        ", ".join(names[:3]),
+    )
+
+
 def upsert_papers(conn: duckdb.DuckDBPyConnection, papers: list[dict]) -> int:
     """Insert papers, skipping duplicates by id. Returns count inserted."""
     if not papers:
         return 0
-    inserted = 0
+    # First occurrence of an id wins, as with row-by-row inserts.
+    unique = {}
     for p in papers:
-        existing = conn.execute(
-            "SELECT id FROM papers WHERE id = ?", [p["id"]]
-        ).fetchone()
-        if existing:
-            continue
+        unique.setdefault(p["id"], p)
+    new_papers = pd.DataFrame(
+        [
+            (
+                p.get("id"), p.get("doi"), p.get("title"), p.get("abstract"),
+                fastjson.dumps(p.get("authors", [])), p.get("year"), p.get("journal"),
+                p.get("source"), p.get("document_type"), p.get("citation_count"),
+                p.get("open_access_url"), fastjson.dumps(p.get("concepts", [])),
+                p.get("openalex_id"), p.get("semantic_scholar_id"),
+                fastjson.dumps(p.get("referenced_works", [])),
+                p.get("query_source"), p.get("found_via", "search"),
+                *_export_fields(p),
+            )
+            for p in unique.values()
+        ],
+        columns=_PAPER_INSERT_COLUMNS,
+        dtype=object,
+    )
+    new_refs = pd.DataFrame(
+        [
+            (p["id"], r)
+            for p in unique.values()
+            for r in dict.fromkeys(p.get("referenced_works") or ())
+            if r
+        ],
+        columns=("paper_id", "ref_openalex_id"),
+        dtype=object,
+    )
+    cols = ", ".join(_PAPER_INSERT_COLUMNS)
+    conn.register("new_papers", new_papers)
+    conn.register("new_refs", new_refs)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        # References first: the same anti-join keeps them to papers being inserted now.
         conn.execute("""
-            INSERT INTO papers (
-                id, doi, title, abstract, authors, year, journal, source,
-                document_type, citation_count, open_access_url, concepts,
-                openalex_id, semantic_scholar_id, referenced_works, query_source, found_via
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, [
-            p.get("id"), p.get("doi"), p.get("title"), p.get("abstract"),
-            json.dumps(p.get("authors", [])), p.get("year"), p.get("journal"),
-            p.get("source"), p.get("document_type"), p.get("citation_count"),
-            p.get("open_access_url"), json.dumps(p.get("concepts", [])),
-            p.get("openalex_id"), p.get("semantic_scholar_id"),
-            json.dumps(p.get("referenced_works", [])),
-            p.get("query_source"), p.get("found_via", "search"),
-        ])
-        inserted += 1
+            INSERT INTO paper_references (paper_id, ref_openalex_id)
+            SELECT paper_id, ref_openalex_id FROM new_refs
+            WHERE paper_id NOT IN (SELECT id FROM papers)
+        """)
+        inserted = conn.execute(f"""
+            INSERT INTO papers ({cols})
+            SELECT {cols} FROM new_papers
+            WHERE id NOT IN (SELECT id FROM papers)
+        """).fetchone()[0]
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.unregister("new_papers")
+        conn.unregister("new_refs")
+    _invalidate_counts(conn)
     return inserted
 
 
+def get_reference_lists(
+    conn: duckdb.DuckDBPyConnection, openalex_ids: list[str]
+) -> dict[str, list[str]]:
+    """
+    Return {openalex_id: [referenced OpenAlex ids]} for stored papers with any
+    recorded references. Papers without rows are omitted, not mapped to [].
+    """
+    if not openalex_ids:
+        return {}
+    rows = conn.execute("""
+        SELECT p.openalex_id, list(r.ref_openalex_id)
+        FROM papers p JOIN paper_references r ON r.paper_id = p.id
+        WHERE p.openalex_id IN (SELECT UNNEST(?::VARCHAR[]))
+        GROUP BY p.openalex_id
+    """, [openalex_ids]).fetchall()
+    return dict(rows)
+
+
 def update_paper(conn: duckdb.DuckDBPyConnection, paper_id: str, **fields) -> None:
     """Update arbitrary fields on a paper row."""
     if not fields:
@@ -164,49 +282,146 @@ def update_paper(conn: duckdb.DuckDBPyConnection, paper_id: str, **fields) -> No
     set_clause = ", ".join(f"{k} = ?" for k in fields)
     values = list(fields.values()) + [paper_id]
     conn.execute(f"UPDATE papers SET {set_clause} WHERE id = ?", values)
+    _invalidate_counts(conn)
+
+
+def update_papers_bulk(
+    conn: duckdb.DuckDBPyConnection,
+    rows: list[tuple],
+    columns: list[str],
+) -> None:
+    """
+    Update the same columns on many papers with one set-based UPDATE … FROM.
+    Each row is (value_for_col1, ..., value_for_colN, paper_id).
+    """
+    if not rows or not columns:
+        return
+    # A join matches each paper once; for a repeated id the last row wins, as before.
+    updates = pd.DataFrame(rows, columns=[*columns, "id"], dtype=object).drop_duplicates(
+        "id", keep="last"
+    )
+    set_clause = ", ".join(f"{c} = u.{c}" for c in columns)
+    conn.register("paper_updates", updates)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute(f"UPDATE papers SET {set_clause} FROM paper_updates u WHERE papers.id = u.id")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.unregister("paper_updates")
+    _invalidate_counts(conn)
+
+
+def apply_human_decisions(conn: duckdb.DuckDBPyConnection) -> None:
+    """Move HITL decisions on BORDERLINE papers into the pipeline columns (set-based)."""
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute("""
+            UPDATE papers SET screening_pass1 = 'INCLUDE', final_status = NULL
+            WHERE screening_pass1 = 'BORDERLINE' AND human_decision = 'INCLUDE'
+        """)
+        conn.execute("""
+            UPDATE papers SET final_status = 'EXCLUDED'
+            WHERE screening_pass1 = 'BORDERLINE' AND human_decision = 'EXCLUDE'
+        """)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    _invalidate_counts(conn)
+
+
+def finalize_included(conn: duckdb.DuckDBPyConnection) -> None:
+    """Mark every INCLUDE paper without a final_status as INCLUDED."""
+    conn.execute("""
+        UPDATE papers SET final_status = 'INCLUDED'
+        WHERE screening_pass1 = 'INCLUDE' AND COALESCE(final_status, '') = ''
+    """)
+    _invalidate_counts(conn)
+
+
+# Columns computed in SQL; requested by name like any stored column.
+_DERIVED_COLUMNS = {
+    # Author display names, extracted by DuckDB's JSON reader instead of per-row json.loads.
+    "author_names": "json_extract_string(authors, '$[*].name') AS author_names",
+    # OpenAlex ids this paper cites, as list[str] rather than a JSON string.
+    "referenced_works": "json_extract_string(referenced_works, '$[*]') AS referenced_works",
+}
+
+# What get_papers returns when no `columns` are given: every field the pages,
+# report and exporters read. Raw JSON blobs nobody renders (authors, concepts)
+# and write-only bookkeeping columns stay in the table.
+_LIST_COLUMNS = (
+    "id", "doi", "title", "abstract", "author_names", "year", "journal", "source",
+    "document_type", "citation_count", "open_access_url", "openalex_id", "referenced_works",
+    "screening_pass1", "screening_pass1_reason", "screening_pass1_confidence",
+    "human_decision", "quality_score", "quality_notes", "quality_flag", "relevance_score",
+    "cluster_id", "cluster_label", "final_status", "found_via",
+    "title_clean", "abstract_clean", "journal_clean", "bibkey", "authors_display",
+)
 
 
 def get_papers(
     conn: duckdb.DuckDBPyConnection,
     *,
-    status: str | None = None,
     final_status: str | None = None,
     pass1: str | None = None,
+    human_decided: bool | None = None,
+    needs_finalization: bool = False,
+    quality_score_is_null: bool = False,
+    columns: tuple[str, ...] | None = None,
 ) -> list[dict]:
-    """Fetch papers with optional status filters."""
+    """
+    Fetch papers with optional status filters.
+    `human_decided` filters on whether a HITL decision has been recorded.
+    Pass `columns` to project only those fields (e.g. ("id",)); the default is
+    _LIST_COLUMNS, where authors come as `author_names` (list[str]) instead of raw JSON.
+    """
     clauses = []
     params = []
-    if status is not None:
-        clauses.append("final_status = ?")
-        params.append(status)
     if final_status is not None:
         clauses.append("final_status = ?")
         params.append(final_status)
     if pass1 is not None:
         clauses.append("screening_pass1 = ?")
         params.append(pass1)
+    if human_decided is not None:
+        clauses.append(f"human_decision IS {'NOT ' if human_decided else ''}NULL")
+    if needs_finalization:
+        clauses.append("screening_pass1 = 'INCLUDE' AND COALESCE(final_status, '') = ''")
+    if quality_score_is_null:
+        clauses.append("quality_score IS NULL")
 
     where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    select = ", ".join(_DERIVED_COLUMNS.get(c, c) for c in columns or _LIST_COLUMNS)
     rows = conn.execute(
-        f"SELECT * FROM papers {where} ORDER BY citation_count DESC NULLS LAST",
+        f"SELECT {select} FROM papers {where} ORDER BY citation_count DESC NULLS LAST",
         params,
     ).fetchall()
     cols = [d[0] for d in conn.description]
     return [dict(zip(cols, r)) for r in rows]
 
 
+def iter_all_ids(conn: duckdb.DuckDBPyConnection) -> Iterator[str]:
+    """Yield every paper id, fetched in chunks, without materialising full rows."""
+    cur = conn.execute("SELECT id FROM papers")
+    while rows := cur.fetchmany(10_000):
+        for (pid,) in rows:
+            yield pid
+
+
 def count_papers(conn: duckdb.DuckDBPyConnection, **filters) -> dict[str, int]:
     """Return counts broken down by pipeline stage."""
-    total = conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
-    included = conn.execute(
-        "SELECT COUNT(*) FROM papers WHERE final_status = 'INCLUDED'"
-    ).fetchone()[0]
-    excluded = conn.execute(
-        "SELECT COUNT(*) FROM papers WHERE final_status = 'EXCLUDED'"
-    ).fetchone()[0]
-    borderline = conn.execute(
-        "SELECT COUNT(*) FROM papers WHERE screening_pass1 = 'BORDERLINE' AND human_decision IS NULL"
-    ).fetchone()[0]
+    total, included, excluded, borderline = conn.execute("""
+        SELECT
+            COUNT(*),
+            COUNT(*) FILTER (WHERE final_status = 'INCLUDED'),
+            COUNT(*) FILTER (WHERE final_status = 'EXCLUDED'),
+            COUNT(*) FILTER (WHERE screening_pass1 = 'BORDERLINE' AND human_decision IS NULL)
+        FROM papers
+    """).fetchone()
     return {
         "total": total,
         "included": included,
@@ -216,38 +431,192 @@ def count_papers(conn: duckdb.DuckDBPyConnection, **filters) -> dict[str, int]:
     }
 
 
+# Per-connection counts for hot read paths (e.g. the sidebar on every rerun).
+# Every write to the papers table above drops the entry, so a read costs at most
+# one recount per write instead of four COUNT(*) scans per render.
+_counts_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+_versions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _bump_version(conn: duckdb.DuckDBPyConnection) -> None:
+    _versions[conn] = _versions.get(conn, 0) + 1
+
+
+def _invalidate_counts(conn: duckdb.DuckDBPyConnection) -> None:
+    _counts_cache.pop(conn, None)
+    _papers_cache.pop(conn, None)
+    _bump_version(conn)
+
+
+def data_version(conn: duckdb.DuckDBPyConnection) -> int:
+    """
+    Counter bumped by every papers, embeddings, synthesis or log write on `conn`;
+    pages use it as a cheap cache key for values derived from those tables.
+    """
+    return _versions.get(conn, 0)
+
+
+def get_counts_cached(conn: duckdb.DuckDBPyConnection) -> dict[str, int]:
+    """count_papers(), served from memory until the next papers-table write."""
+    counts = _counts_cache.get(conn)
+    if counts is None:
+        counts = _counts_cache[conn] = count_papers(conn)
+    return dict(counts)
+
+
+_papers_cache: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_papers_cached(conn: duckdb.DuckDBPyConnection) -> list[dict]:
+    """
+    get_papers(conn) with the default columns, served from memory until the
+    next papers-table write. The list is shared between callers — treat it as read-only.
+    """
+    papers = _papers_cache.get(conn)
+    if papers is None:
+        papers = _papers_cache[conn] = get_papers(conn)
+    return papers
+
+
 # ── Embeddings ─────────────────────────────────────────────────────────────────
 
-def save_embeddings(conn: duckdb.DuckDBPyConnection, paper_id: str, vector: list[float]) -> None:
+# Paper embeddings are stored at half precision: half the bytes on disk and
+# through every read, at ~1e-3 relative error — far below what moves a cosine
+# neighbour or cluster. Reads widen back to float32 for computation.
+_EMBEDDING_DTYPE = np.float16
+
+
+def _pack_vectors(vectors, dtype=np.float32) -> list[bytes]:
+    """
+    Convert an (N, D) matrix (or a list of equal-length vectors) to `dtype`
+    once and slice the contiguous buffer into N packed rows.
+    """
+    M = np.ascontiguousarray(vectors, dtype=dtype)
+    if M.ndim == 1:
+        M = M.reshape(1, -1)
+    buf = M.tobytes()
+    step = M.shape[1] * M.itemsize
+    return [buf[i:i + step] for i in range(0, len(buf), step)]
+
+
+def _insert_vectors(
+    conn: duckdb.DuckDBPyConnection,
+    table: str,
+    columns: tuple[str, str],
+    keys: list[str],
+    vectors,
+    dtype=np.float32,
+) -> None:
+    """INSERT OR REPLACE (key, packed vector) rows from a registered DataFrame."""
+    df = pd.DataFrame({columns[0]: keys, columns[1]: _pack_vectors(vectors, dtype)}, dtype=object)
+    conn.register("new_vectors", df)
+    try:
+        conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({columns[0]}, {columns[1]}) "
+            f"SELECT {columns[0]}, {columns[1]} FROM new_vectors"
+        )
+    finally:
+        conn.unregister("new_vectors")
+
+
+def save_embeddings(conn: duckdb.DuckDBPyConnection, paper_id: str, vector) -> None:
+    """Store a vector as packed float16 bytes."""
     conn.execute(
         "INSERT OR REPLACE INTO embeddings (paper_id, vector) VALUES (?, ?)",
-        [paper_id, vector],
+        [paper_id, np.asarray(vector, dtype=_EMBEDDING_DTYPE).tobytes()],
+    )
+    _bump_version(conn)
+
+
+def save_embeddings_bulk(
+    conn: duckdb.DuckDBPyConnection, paper_ids: list[str], vectors
+) -> None:
+    """Store many vectors (an (N, D) array or list of vectors) in one INSERT."""
+    if not paper_ids:
+        return
+    _insert_vectors(
+        conn, "embeddings", ("paper_id", "vector"), paper_ids, vectors, _EMBEDDING_DTYPE
     )
+    _bump_version(conn)
+
 
+def get_embeddings(conn: duckdb.DuckDBPyConnection) -> tuple[list[str], np.ndarray]:
+    """
+    Return (paper_ids, M) where M is one contiguous (N, D) float32 array whose
+    rows line up with paper_ids. Columns are fetched as arrays, not row tuples.
+    """
+    cols = conn.execute("SELECT paper_id, vector FROM embeddings").fetchnumpy()
+    ids = cols["paper_id"].tolist()
+    if not ids:
+        return [], np.empty((0, 0), dtype=np.float32)
+    M = np.frombuffer(b"".join(cols["vector"]), dtype=_EMBEDDING_DTYPE).reshape(len(ids), -1)
+    return ids, M.astype(np.float32)
 
-def get_embeddings(conn: duckdb.DuckDBPyConnection) -> list[tuple[str, list[float]]]:
-    rows = conn.execute("SELECT paper_id, vector FROM embeddings").fetchall()
-    return [(r[0], r[1]) for r in rows]
+
+def get_question_embedding(conn: duckdb.DuckDBPyConnection, key: str) -> bytes | None:
+    """Return the cached research-question embedding (raw float32 bytes), if any."""
+    row = conn.execute("SELECT vec FROM embedding_cache WHERE key = ?", [key]).fetchone()
+    return bytes(row[0]) if row else None
+
+
+def save_question_embedding(conn: duckdb.DuckDBPyConnection, key: str, vec: bytes) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO embedding_cache (key, vec) VALUES (?, ?)",
+        [key, vec],
+    )
+
+
+def get_cached_embeddings(conn: duckdb.DuckDBPyConnection, keys: list[str]) -> dict[str, bytes]:
+    """Return {key: raw float32 bytes} for the keys present in the embedding cache."""
+    if not keys:
+        return {}
+    rows = conn.execute(
+        "SELECT key, vec FROM embedding_cache WHERE key IN (SELECT UNNEST(?::VARCHAR[]))",
+        [keys],
+    ).fetchall()
+    return {k: bytes(v) for k, v in rows}
+
+
+def save_cached_embeddings(conn: duckdb.DuckDBPyConnection, keys: list[str], vectors) -> None:
+    if not keys:
+        return
+    _insert_vectors(conn, "embedding_cache", ("key", "vec"), keys, vectors)
 
 
 # ── Pipeline Log ───────────────────────────────────────────────────────────────
 
 def log_event(conn: duckdb.DuckDBPyConnection, stage: str, message: str, details: dict | None = None) -> None:
-    next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM pipeline_log").fetchone()[0]
     conn.execute(
-        "INSERT INTO pipeline_log (id, stage, message, details) VALUES (?, ?, ?, ?)",
-        [next_id, stage, message, json.dumps(details or {})],
+        "INSERT INTO pipeline_log (stage, message, details) VALUES (?, ?, ?)",
+        [stage, message, fastjson.dumps(details or {})],
     )
+    _bump_version(conn)
 
 
-def get_log(conn: duckdb.DuckDBPyConnection, limit: int = 200) -> list[dict]:
+def get_log(
+    conn: duckdb.DuckDBPyConnection, limit: int = 200, *, with_details: bool = True
+) -> list[dict]:
+    """
+    Most recent log entries first. With with_details=False the JSON details
+    column is neither fetched nor decoded (the activity feed only shows messages).
+    """
+    if not with_details:
+        rows = conn.execute(
+            "SELECT stage, message, ts FROM pipeline_log ORDER BY id DESC LIMIT ?",
+            [limit],
+        ).fetchall()
+        return [{"stage": stage, "message": message, "ts": ts} for stage, message, ts in rows]
+
     rows = conn.execute(
         "SELECT stage, message, details, ts FROM pipeline_log ORDER BY id DESC LIMIT ?",
         [limit],
     ).fetchall()
+    loads = fastjson.loads
     return [
-        {"stage": r[0], "message": r[1], "details": json.loads(r[2] or "{}"), "ts": r[3]}
-        for r in rows
+        {"stage": stage, "message": message, "details": loads(details or "{}"), "ts": ts}
+        for stage, message, details, ts in rows
     ]
 
 
@@ -264,26 +633,39 @@ def save_config(conn: duckdb.DuckDBPyConnection, cfg: dict) -> None:
         cfg.get("research_question"), cfg.get("review_type"), cfg.get("strictness"),
         cfg.get("inclusion_criteria"), cfg.get("exclusion_criteria"),
         cfg.get("year_min"), cfg.get("year_max"), cfg.get("target_corpus_size"),
-        json.dumps(cfg),
+        fastjson.dumps(cfg),
     ])
 
 
 def get_config(conn: duckdb.DuckDBPyConnection) -> dict:
     row = conn.execute("SELECT config_json FROM review_config WHERE id = 1").fetchone()
     if row:
-        return json.loads(row[0] or "{}")
+        return fastjson.loads(row[0] or "{}")
     return {}
 
 
 # ── Generated Queries ──────────────────────────────────────────────────────────
 
 def save_queries(conn: duckdb.DuckDBPyConnection, queries: list[dict]) -> None:
-    conn.execute("DELETE FROM generated_queries")
-    for i, q in enumerate(queries):
-        conn.execute(
-            "INSERT INTO generated_queries (id, api, query_text, description) VALUES (?, ?, ?, ?)",
-            [i, q["api"], q["query_text"], q.get("description", "")],
-        )
+    new_queries = pd.DataFrame(
+        [(i, q["api"], q["query_text"], q.get("description", "")) for i, q in enumerate(queries)],
+        columns=("id", "api", "query_text", "description"),
+        dtype=object,
+    )
+    conn.register("new_queries", new_queries)
+    conn.execute("BEGIN TRANSACTION")
+    try:
+        conn.execute("DELETE FROM generated_queries")
+        conn.execute("""
+            INSERT INTO generated_queries (id, api, query_text, description)
+            SELECT id, api, query_text, description FROM new_queries
+        """)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.unregister("new_queries")
 
 
 def get_queries(conn: duckdb.DuckDBPyConnection) -> list[dict]:
@@ -297,12 +679,31 @@ def save_synthesis(conn: duckdb.DuckDBPyConnection, result: dict) -> None:
     conn.execute("DELETE FROM synthesis_result")
     conn.execute(
         "INSERT INTO synthesis_result (id, result_json) VALUES (1, ?)",
-        [json.dumps(result)],
+        [fastjson.dumps(result)],
     )
+    _invalidate_counts(conn)
 
 
 def get_synthesis(conn: duckdb.DuckDBPyConnection) -> dict | None:
     row = conn.execute("SELECT result_json FROM synthesis_result WHERE id = 1").fetchone()
     if row:
-        return json.loads(row[0])
+        return fastjson.loads(row[0])
+    return None
+
+
+# ── LLM Response Cache ─────────────────────────────────────────────────────────
+# Lives in the session's database, so entries last exactly as long as the review:
+# re-runs and resumes within a session hit it, a new review starts empty.
+
+def get_cached_response(conn: duckdb.DuckDBPyConnection, key: str) -> dict | None:
+    row = conn.execute("SELECT response FROM llm_cache WHERE key = ?", [key]).fetchone()
+    if row:
+        return fastjson.loads(row[0])
     return None
+
+
+def save_cached_response(conn: duckdb.DuckDBPyConnection, key: str, response: dict) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO llm_cache (key, response, created_at) VALUES (?, ?, ?)",
+        [key, fastjson.dumps(response), datetime.now()],
+    )
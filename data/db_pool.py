@@ -0,0 +1,55 @@
+"""Bounded pool of DuckDB cursors for use from worker threads."""
+from __future__ import annotations
+
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+import duckdb
+
+import config
+
+
+class CursorPool:
+    """
+    A DuckDB connection must not be shared between threads; a cursor created
+    from it is an independent connection to the same database and may be used
+    from one other thread. The pool hands out at most `size` cursors, creating
+    them lazily, so worker threads can read without touching the main `conn`.
+    """
+
+    def __init__(self, conn: duckdb.DuckDBPyConnection, size: int | None = None):
+        self._conn = conn
+        self._size = max(1, min(size or config.DB_POOL_MAX_SIZE, config.DB_POOL_MAX_SIZE))
+        self._idle: queue.Queue[duckdb.DuckDBPyConnection] = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self) -> Iterator[duckdb.DuckDBPyConnection]:
+        cur = self._checkout()
+        try:
+            yield cur
+        finally:
+            self._idle.put(cur)
+
+    def _checkout(self) -> duckdb.DuckDBPyConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self._size:
+                self._created += 1
+                return self._conn.cursor()
+        # Pool exhausted — wait for another worker to release a cursor.
+        return self._idle.get()
+
+    def close(self) -> None:
+        """Close every idle cursor. Call once all workers have finished."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
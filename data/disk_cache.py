@@ -0,0 +1,69 @@
+"""Small persistent key → JSON cache (sqlite) for API responses."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from utils import fastjson
+
+_SQLITE_MAX_PARAMS = 500
+
+
+class DiskCache:
+    """
+    Entries older than `ttl_seconds` are ignored on read. Safe to share
+    between threads; the sqlite file is opened lazily on first use.
+    Cache errors are swallowed — a broken cache only costs a refetch.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self._path = path
+        self._ttl = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts INTEGER, blob BLOB)"
+            )
+        return self._conn
+
+    def get_many(self, keys: list[str]) -> dict[str, Any]:
+        """Return {key: value} for the keys that have a fresh entry."""
+        found: dict[str, Any] = {}
+        if not keys:
+            return found
+        cutoff = int(time.time() - self._ttl)
+        try:
+            with self._lock:
+                db = self._db()
+                for i in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                    chunk = keys[i : i + _SQLITE_MAX_PARAMS]
+                    rows = db.execute(
+                        f"SELECT key, blob FROM cache WHERE ts >= ? "
+                        f"AND key IN ({','.join('?' * len(chunk))})",
+                        [cutoff, *chunk],
+                    ).fetchall()
+                    found.update((k, fastjson.loads(blob)) for k, blob in rows)
+        except sqlite3.Error:
+            pass
+        return found
+
+    def put_many(self, items: dict[str, Any]) -> None:
+        if not items:
+            return
+        now = int(time.time())
+        try:
+            with self._lock:
+                db = self._db()
+                db.executemany(
+                    "INSERT OR REPLACE INTO cache (key, ts, blob) VALUES (?, ?, ?)",
+                    [(k, now, fastjson.dumps(v)) for k, v in items.items()],
+                )
+                db.commit()
+        except sqlite3.Error:
+            pass
@@ -2,106 +2,98 @@
 from __future__ import annotations
 
 import io
-import json
-import re
 from datetime import datetime
 
 import pandas as pd
 
+from utils import fastjson
+from utils.text import bibtex_key, clean as _clean
 
-def _clean(text: str | None) -> str:
-    if not text:
-        return ""
-    return re.sub(r"\s+", " ", str(text)).strip()
 
+def _cleaned(p: dict, field: str) -> str:
+    """The `<field>_clean` column stored at insert, or clean it now for papers without one."""
+    value = p.get(f"{field}_clean")
+    return value if value is not None else _clean(p.get(field))
 
-def _author_list(authors_json) -> list[str]:
+
+def _author_list(p: dict) -> list[str]:
+    if p.get("author_names") is not None:
+        return [a for a in p["author_names"] if a]
+    authors_json = p.get("authors")
     if not authors_json:
         return []
     try:
-        authors = json.loads(authors_json) if isinstance(authors_json, str) else authors_json
+        authors = fastjson.loads(authors_json) if isinstance(authors_json, str) else authors_json
         return [a.get("name", "") for a in authors if a.get("name")]
     except Exception:
         return []
 
 
-def papers_to_bibtex(papers: list[dict]) -> str:
-    """Return a BibTeX string for the given papers."""
-    lines: list[str] = []
-    for p in papers:
-        authors = _author_list(p.get("authors"))
-        key_parts = []
-        if authors:
-            last = authors[0].split()[-1] if authors[0].split() else "Unknown"
-            key_parts.append(last)
-        if p.get("year"):
-            key_parts.append(str(p["year"]))
-        title_words = (_clean(p.get("title")) or "").split()[:2]
-        key_parts.extend(title_words)
-        key = re.sub(r"[^a-zA-Z0-9]", "", "".join(key_parts))[:30] or p["id"][:12]
+_RIS_TYPES = {
+    "article": "JOUR",
+    "review": "JOUR",
+    "conference": "CONF",
+    "book-chapter": "CHAP",
+    "preprint": "JOUR",
+}
+
+
+def _bibtex_record(p: dict) -> str:
+    authors = _author_list(p)
+    title = _cleaned(p, "title")
+    key = p.get("bibkey") or bibtex_key(p["id"], authors, p.get("year"), title)
+
+    doc_type = p.get("document_type") or "article"
+    bib_type = "article" if doc_type in ("article", "review") else "inproceedings" if "conference" in doc_type else "misc"
+
+    fields = [
+        f"@{bib_type}{{{key},",
+        f"  title = {{{title}}},",
+        authors and f'  author = {{{" and ".join(authors)}}},',
+        p.get("year") and f'  year = {{{p["year"]}}},',
+        p.get("journal") and f'  journal = {{{_cleaned(p, "journal")}}},',
+        p.get("doi") and f'  doi = {{{p["doi"]}}},',
+        p.get("abstract") and f'  abstract = {{{_cleaned(p, "abstract")[:400]}}},',
+        "}\n",
+    ]
+    return "\n".join(f for f in fields if f)
+
+
+def _ris_record(p: dict) -> str:
+    fields = [
+        f"TY  - {_RIS_TYPES.get(p.get('document_type', ''), 'JOUR')}",
+        p.get("title") and f"TI  - {_cleaned(p, 'title')}",
+        *(f"AU  - {a}" for a in _author_list(p)),
+        p.get("year") and f"PY  - {p['year']}",
+        p.get("journal") and f"JO  - {_cleaned(p, 'journal')}",
+        p.get("doi") and f"DO  - {p['doi']}",
+        p.get("abstract") and f"AB  - {_cleaned(p, 'abstract')[:500]}",
+        p.get("open_access_url") and f"UR  - {p['open_access_url']}",
+        "ER  - \n",
+    ]
+    return "\n".join(f for f in fields if f)
 
-        doc_type = p.get("document_type", "article")
-        bib_type = "article" if doc_type in ("article", "review") else "inproceedings" if "conference" in doc_type else "misc"
 
-        lines.append(f"@{bib_type}{{{key},")
-        lines.append(f'  title = {{{_clean(p.get("title"))}}},')
-        if authors:
-            lines.append(f'  author = {{{" and ".join(authors)}}},')
-        if p.get("year"):
-            lines.append(f'  year = {{{p["year"]}}},')
-        if p.get("journal"):
-            lines.append(f'  journal = {{{_clean(p.get("journal"))}}},')
-        if p.get("doi"):
-            lines.append(f'  doi = {{{p["doi"]}}},')
-        if p.get("abstract"):
-            lines.append(f'  abstract = {{{_clean(p.get("abstract"))[:400]}}},')
-        lines.append("}")
-        lines.append("")
-    return "\n".join(lines)
+def papers_to_bibtex(papers: list[dict]) -> str:
+    """Return a BibTeX string for the given papers."""
+    return "\n".join([_bibtex_record(p) for p in papers])
 
 
 def papers_to_ris(papers: list[dict]) -> str:
     """Return an RIS-format string."""
-    lines: list[str] = []
-    doc_type_map = {
-        "article": "JOUR",
-        "review": "JOUR",
-        "conference": "CONF",
-        "book-chapter": "CHAP",
-        "preprint": "JOUR",
-    }
-    for p in papers:
-        ty = doc_type_map.get(p.get("document_type", ""), "JOUR")
-        lines.append(f"TY  - {ty}")
-        if p.get("title"):
-            lines.append(f"TI  - {_clean(p['title'])}")
-        for a in _author_list(p.get("authors")):
-            lines.append(f"AU  - {a}")
-        if p.get("year"):
-            lines.append(f"PY  - {p['year']}")
-        if p.get("journal"):
-            lines.append(f"JO  - {_clean(p['journal'])}")
-        if p.get("doi"):
-            lines.append(f"DO  - {p['doi']}")
-        if p.get("abstract"):
-            lines.append(f"AB  - {_clean(p.get('abstract'))[:500]}")
-        if p.get("open_access_url"):
-            lines.append(f"UR  - {p['open_access_url']}")
-        lines.append("ER  - ")
-        lines.append("")
-    return "\n".join(lines)
+    return "\n".join([_ris_record(p) for p in papers])
 
 
 def papers_to_dataframe(papers: list[dict]) -> pd.DataFrame:
     """Return a clean DataFrame of included papers."""
     rows = []
     for p in papers:
-        authors = _author_list(p.get("authors"))
+        authors = _author_list(p)
         rows.append({
-            "Title": _clean(p.get("title")),
+            "Title": _cleaned(p, "title"),
             "Authors": "; ".join(authors[:5]),
             "Year": p.get("year"),
-            "Journal": _clean(p.get("journal")),
+            "Journal": _cleaned(p, "journal"),
             "DOI": p.get("doi"),
             "Citation Count": p.get("citation_count"),
             "Quality Score": p.get("quality_score"),
@@ -110,11 +102,28 @@ def papers_to_dataframe(papers: list[dict]) -> pd.DataFrame:
             "Screening Reason": p.get("screening_pass1_reason"),
             "Quality Notes": p.get("quality_notes"),
             "Open Access URL": p.get("open_access_url"),
-            "Abstract": _clean(p.get("abstract")),
+            "Abstract": _cleaned(p, "abstract"),
         })
     return pd.DataFrame(rows)
 
 
+def dataframe_to_xlsx_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Write `df` as a single-sheet XLSX. openpyxl's write-only workbook streams
+    rows out instead of holding a Cell object per value, as DataFrame.to_excel does.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(list(df.columns))
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
 def papers_to_docx_bytes(papers: list[dict], synthesis: dict | None) -> bytes:
     """Return a DOCX report as bytes."""
     from docx import Document
@@ -153,8 +162,8 @@ def papers_to_docx_bytes(papers: list[dict], synthesis: dict | None) -> bytes:
 
     doc.add_heading("Included Papers", 1)
     for i, p in enumerate(papers, 1):
-        authors = _author_list(p.get("authors"))
-        heading = f"{i}. {_clean(p.get('title'))}"
+        authors = _author_list(p)
+        heading = f"{i}. {_cleaned(p, 'title')}"
         doc.add_heading(heading, 3)
         meta = []
         if authors:
@@ -162,11 +171,11 @@ def papers_to_docx_bytes(papers: list[dict], synthesis: dict | None) -> bytes:
         if p.get("year"):
             meta.append(str(p["year"]))
         if p.get("journal"):
-            meta.append(_clean(p["journal"]))
+            meta.append(_cleaned(p, "journal"))
         if meta:
             doc.add_paragraph(" | ".join(meta))
         if p.get("abstract"):
-            doc.add_paragraph(_clean(p["abstract"])[:600] + "…")
+            doc.add_paragraph(_cleaned(p, "abstract")[:600] + "…")
 
     buf = io.BytesIO()
     doc.save(buf)
@@ -191,4 +200,4 @@ def build_audit_trail(log_entries: list[dict], papers: list[dict]) -> str:
             for p in papers
         ],
     }
-    return json.dumps(trail, indent=2, default=str)
+    return fastjson.dumps_pretty(trail)
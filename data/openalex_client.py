@@ -1,14 +1,49 @@
 """OpenAlex API client with pagination, abstract reconstruction, and snowballing."""
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import os
 import re
-import time
-import hashlib
-from typing import Iterator
+import tempfile
+import threading
+from itertools import islice
+from types import MappingProxyType
+from typing import Iterator, Mapping
 
 import httpx
 
-from config import OPENALEX_BASE
+from config import OPENALEX_BASE, OPENALEX_CACHE_TTL_SECONDS, OPENALEX_RATE_LIMIT
+from data.disk_cache import DiskCache
+from data.pacing import RequestPacer
+from utils import fastjson
+from utils.text import title_id
+
+
+# (pattern, replacement) pairs applied in order by _sanitize_query.
+_QUERY_SUBS = (
+    # For content fields (title/abstract.search, concepts.id): keep the VALUE, drop the prefix.
+    (re.compile(r'\b(?:title|abstract|fulltext)\.search:(\S+)'), r'\1'),
+    (re.compile(r'\b(?:concepts|topics)\.id:(\S+)'), r'\1'),
+    # For structural filter fields: drop both key and value (not useful as search terms).
+    (
+        re.compile(
+            r'\b(?:publication_year|host_venue(?:\.\w+)*|type|language|open_access(?:\.\w+)*):\S+'
+        ),
+        '',
+    ),
+    # Drop any remaining field.field:value patterns (keep value).
+    (re.compile(r'\b\w+(?:\.\w+)+:(\S+)'), r'\1'),
+    # Drop bare word:value patterns.
+    (re.compile(r'\b\w+:\S+'), ''),
+    # Drop year ranges and standalone 4-digit years (already encoded in the filter param).
+    (re.compile(r'\b\d{4}(?:-\d{4})?\b'), ''),
+    # Remove boolean operators and grouping punctuation.
+    (re.compile(r'\b(?:AND|OR|NOT)\b|[()"\[\]]', re.IGNORECASE), ' '),
+)
+# Tokens that are OpenAlex enum values, not meaningful search terms.
+_QUERY_SKIP = frozenset({'journal_article', 'journal', 'article', 'preprint', 'book_chapter', 'review'})
 
 
 def _sanitize_query(query: str) -> str:
@@ -18,41 +53,46 @@ def _sanitize_query(query: str) -> str:
     and collapse boolean operators, leaving plain searchable keywords.
     The OpenAlex ?search= parameter only accepts plain text.
     """
-    # For content fields (title/abstract.search, concepts.id): keep the VALUE, drop the prefix.
-    cleaned = re.sub(r'\b(?:title|abstract|fulltext)\.search:(\S+)', r'\1', query)
-    cleaned = re.sub(r'\b(?:concepts|topics)\.id:(\S+)', r'\1', cleaned)
-    # For structural filter fields: drop both key and value (not useful as search terms).
-    cleaned = re.sub(
-        r'\b(?:publication_year|host_venue(?:\.\w+)*|type|language|open_access(?:\.\w+)*):\S+',
-        '', cleaned,
-    )
-    # Drop any remaining field.field:value patterns (keep value).
-    cleaned = re.sub(r'\b\w+(?:\.\w+)+:(\S+)', r'\1', cleaned)
-    # Drop bare word:value patterns.
-    cleaned = re.sub(r'\b\w+:\S+', '', cleaned)
-    # Drop year ranges and standalone 4-digit years (already encoded in the filter param).
-    cleaned = re.sub(r'\b\d{4}(?:-\d{4})?\b', '', cleaned)
-    # Remove boolean operators and grouping punctuation.
-    cleaned = re.sub(r'\b(AND|OR|NOT)\b', ' ', cleaned, flags=re.IGNORECASE)
-    cleaned = re.sub(r'[()"\[\]]', ' ', cleaned)
-    # Tokens that are OpenAlex enum values, not meaningful search terms.
-    _SKIP = {'journal_article', 'journal', 'article', 'preprint', 'book_chapter', 'review'}
+    cleaned = query
+    for pattern, repl in _QUERY_SUBS:
+        cleaned = pattern.sub(repl, cleaned)
     # Deduplicate, preserve order.
     seen: set[str] = set()
     words: list[str] = []
     for w in cleaned.split():
         lw = w.lower().strip('.,;:-')
-        if lw and len(lw) > 2 and lw not in seen and lw not in _SKIP:
+        if lw and len(lw) > 2 and lw not in seen and lw not in _QUERY_SKIP:
             seen.add(lw)
             words.append(lw)
     return ' '.join(words[:12])  # cap at 12 terms
 
 
-def _headers(email: str) -> dict:
+@functools.lru_cache(maxsize=8)
+def _headers(email: str) -> Mapping[str, str]:
+    """Request headers, built once per email and shared read-only."""
     h = {"User-Agent": f"LitReviewApp/1.0 (mailto:{email})"}
     if email:
         h["mailto"] = email
-    return h
+    return MappingProxyType(h)
+
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    """
+    Shared synchronous client, created on first use. httpx.Client is
+    thread-safe, so keep-alive connections to OpenAlex are reused across
+    calls instead of paying a TCP+TLS handshake per lookup.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(http2=True, base_url=OPENALEX_BASE, timeout=30)
+                atexit.register(_client.close)
+    return _client
 
 
 def reconstruct_abstract(inverted_index: dict | None) -> str:
@@ -60,47 +100,48 @@ def reconstruct_abstract(inverted_index: dict | None) -> str:
     if not inverted_index:
         return ""
     try:
-        positions: list[tuple[int, str]] = []
+        # Positions are small dense ints, so scatter words into a slot array
+        # instead of sorting (pos, word) pairs.
+        max_pos = max((pos for locs in inverted_index.values() for pos in locs), default=-1)
+        words = [""] * (max_pos + 1)
         for word, locs in inverted_index.items():
             for pos in locs:
-                positions.append((pos, word))
-        positions.sort(key=lambda x: x[0])
-        return " ".join(w for _, w in positions)
+                words[pos] = word
+        return " ".join(w for w in words if w)
     except Exception:
         return ""
 
 
+_EMPTY: dict = {}  # shared read-only default for missing nested objects
+
+
 def _parse_work(w: dict, query_source: str = "") -> dict | None:
-    title = w.get("title")
+    get = w.get
+    title = get("title")
     if not title:
         return None
-    oa_id = w.get("id", "")
-    doi = w.get("doi", "")
-    paper_id = doi or oa_id or hashlib.md5(title.encode()).hexdigest()
+    oa_id = get("id", "")
+    doi = get("doi", "")
+    paper_id = doi or oa_id or title_id(title)
 
-    abstract = reconstruct_abstract(w.get("abstract_inverted_index"))
+    abstract = reconstruct_abstract(get("abstract_inverted_index"))
     authors = [
-        {
-            "name": a.get("author", {}).get("display_name", ""),
-            "orcid": a.get("author", {}).get("orcid", ""),
-        }
-        for a in w.get("authorships", [])[:20]
+        {"name": author.get("display_name", ""), "orcid": author.get("orcid", "")}
+        for author in (
+            a.get("author") or _EMPTY for a in islice(get("authorships") or (), 20)
+        )
     ]
     concepts = [
         {"name": c.get("display_name", ""), "score": c.get("score", 0)}
-        for c in w.get("concepts", [])[:10]
+        for c in islice(get("concepts") or (), 10)
     ]
 
-    pub_year = w.get("publication_year")
-    venue = w.get("primary_location", {}) or {}
-    source = venue.get("source", {}) or {}
+    pub_year = get("publication_year")
+    source = (get("primary_location") or _EMPTY).get("source") or _EMPTY
     journal = source.get("display_name", "")
-
-    oa_location = w.get("open_access", {}) or {}
-    oa_url = oa_location.get("oa_url", "")
-
-    doc_type = w.get("type", "article")
-    ref_works = [r for r in (w.get("referenced_works") or []) if r]
+    oa_url = (get("open_access") or _EMPTY).get("oa_url", "")
+    doc_type = get("type", "article")
+    ref_works = [r for r in (get("referenced_works") or ()) if r]
 
     return {
         "id": paper_id,
@@ -112,7 +153,7 @@ def _parse_work(w: dict, query_source: str = "") -> dict | None:
         "journal": journal,
         "source": "openalex",
         "document_type": doc_type,
-        "citation_count": w.get("cited_by_count", 0) or 0,
+        "citation_count": get("cited_by_count", 0) or 0,
         "open_access_url": oa_url,
         "concepts": concepts,
         "openalex_id": oa_id,
@@ -122,6 +163,36 @@ def _parse_work(w: dict, query_source: str = "") -> dict | None:
     }
 
 
+_MAX_PER_PAGE = 200
+_MAX_PAGED_RESULTS = 10_000  # OpenAlex refuses page= beyond the first 10k results
+
+
+async def _search_pages_async(params: dict, email: str, max_results: int) -> list[list[dict]]:
+    """
+    Fetch page 1 to learn `meta.count`, then every further page needed for
+    `max_results` concurrently (paced by the shared rate limiter).
+    Returns the raw results of each page, in page order.
+    """
+    per_page = params["per-page"]
+
+    async with httpx.AsyncClient(
+        http2=True, base_url=OPENALEX_BASE, headers=_headers(email), timeout=30
+    ) as client:
+
+        async def fetch(page: int) -> dict:
+            await _limiter.wait()
+            resp = await client.get("/works", params={**params, "page": page})
+            resp.raise_for_status()
+            return fastjson.loads(resp.content)
+
+        first = await fetch(1)
+        total = min(first.get("meta", {}).get("count") or 0, max_results, _MAX_PAGED_RESULTS)
+        n_pages = -(-total // per_page)
+        rest = await asyncio.gather(*(fetch(page) for page in range(2, n_pages + 1)))
+
+    return [data.get("results", []) for data in (first, *rest)]
+
+
 def search_works(
     query: str,
     email: str,
@@ -144,7 +215,7 @@ def search_works(
             "id,doi,title,abstract_inverted_index,authorships,publication_year,"
             "primary_location,open_access,type,cited_by_count,concepts,referenced_works"
         ),
-        "per-page": 50,
+        "per-page": max(1, min(max_results, _MAX_PER_PAGE)),
     }
     if email:
         params["mailto"] = email
@@ -160,51 +231,28 @@ def search_works(
     if filters:
         params["filter"] = ",".join(filters)
 
-    papers: list[dict] = []
-    cursor = "*"
-    client = httpx.Client(timeout=30)
-
-    try:
-        while len(papers) < max_results:
-            params["cursor"] = cursor
-            resp = client.get(f"{OPENALEX_BASE}/works", params=params, headers=_headers(email))
-            resp.raise_for_status()
-            data = resp.json()
-
-            results = data.get("results", [])
-            if not results:
-                break
-
-            for w in results:
-                parsed = _parse_work(w, query_source)
-                if parsed:
-                    papers.append(parsed)
-                if len(papers) >= max_results:
-                    break
-
-            meta = data.get("meta", {})
-            cursor = meta.get("next_cursor")
-            if not cursor:
-                break
-
-            if progress_callback:
-                progress_callback(f"OpenAlex: retrieved {len(papers)} papers…")
-            time.sleep(0.12)  # ~8 req/sec, polite pool limit is 10/sec
-    finally:
-        client.close()
+    pages = asyncio.run(_search_pages_async(params, email, max_results))
 
+    papers: list[dict] = []
+    for results in pages:
+        for w in results:
+            parsed = _parse_work(w, query_source)
+            if parsed:
+                papers.append(parsed)
+    papers = papers[:max_results]
+    if progress_callback:
+        progress_callback(f"OpenAlex: retrieved {len(papers)} papers…")
     return papers
 
 
 def get_paper(openalex_id: str, email: str) -> dict | None:
     """Fetch a single work by OpenAlex ID."""
     try:
-        client = httpx.Client(timeout=30)
         params = {"mailto": email} if email else {}
-        resp = client.get(f"{OPENALEX_BASE}/works/{openalex_id}", params=params, headers=_headers(email))
-        client.close()
+        _limiter.wait_blocking()
+        resp = _get_client().get(f"/works/{openalex_id}", params=params, headers=_headers(email))
         if resp.status_code == 200:
-            return _parse_work(resp.json())
+            return _parse_work(fastjson.loads(resp.content))
     except Exception:
         pass
     return None
@@ -214,7 +262,7 @@ def get_references(openalex_id: str, email: str, max_results: int = 500) -> list
     """Fetch works referenced by this paper (backward snowballing)."""
     try:
         params: dict = {
-            "filter": f"cites:{openalex_id}",
+            "filter": f"cited_by:{openalex_id}",
             "select": "id,doi,title,abstract_inverted_index,authorships,publication_year,primary_location,open_access,type,cited_by_count,concepts,referenced_works",
             "per-page": 50,
         }
@@ -229,7 +277,7 @@ def get_citing_papers(openalex_id: str, email: str, max_results: int = 500) -> l
     """Fetch works that cite this paper (forward snowballing)."""
     try:
         params: dict = {
-            "filter": f"cited_by:{openalex_id}",
+            "filter": f"cites:{openalex_id}",
             "select": "id,doi,title,abstract_inverted_index,authorships,publication_year,primary_location,open_access,type,cited_by_count,concepts,referenced_works",
             "per-page": 50,
         }
@@ -243,21 +291,240 @@ def get_citing_papers(openalex_id: str, email: str, max_results: int = 500) -> l
 def _paginate(params: dict, email: str, max_results: int) -> list[dict]:
     papers: list[dict] = []
     cursor = "*"
-    client = httpx.Client(timeout=30)
-    try:
-        while len(papers) < max_results:
-            params["cursor"] = cursor
-            resp = client.get(f"{OPENALEX_BASE}/works", params=params, headers=_headers(email))
-            resp.raise_for_status()
-            data = resp.json()
-            for w in data.get("results", []):
-                parsed = _parse_work(w)
-                if parsed:
-                    papers.append(parsed)
-            cursor = data.get("meta", {}).get("next_cursor")
-            if not cursor or not data.get("results"):
-                break
-            time.sleep(0.12)
-    finally:
-        client.close()
+    client = _get_client()
+    while len(papers) < max_results:
+        params["cursor"] = cursor
+        _limiter.wait_blocking()
+        resp = client.get("/works", params=params, headers=_headers(email))
+        resp.raise_for_status()
+        data = fastjson.loads(resp.content)
+        for w in data.get("results", []):
+            parsed = _parse_work(w)
+            if parsed:
+                papers.append(parsed)
+        cursor = data.get("meta", {}).get("next_cursor")
+        if not cursor or not data.get("results"):
+            break
     return papers
+
+
+# ── Bulk snowballing lookups ───────────────────────────────────────────────────
+
+_WORK_SELECT = (
+    "id,doi,title,abstract_inverted_index,authorships,publication_year,"
+    "primary_location,open_access,type,cited_by_count,concepts,referenced_works"
+)
+_BULK_CHUNK = 50  # OR-ed ids per filter, keeps the URL well under length limits
+
+
+# Shared by every OpenAlex request in the process: the polite-pool limit is per client.
+_limiter = RequestPacer(OPENALEX_RATE_LIMIT)
+
+
+def _short_id(openalex_id: str) -> str:
+    """'https://openalex.org/W123' → 'W123' (the form filters expect)."""
+    return openalex_id.rsplit("/", 1)[-1]
+
+
+def _chunks(ids: list[str]) -> list[list[str]]:
+    return [ids[i : i + _BULK_CHUNK] for i in range(0, len(ids), _BULK_CHUNK)]
+
+
+async def _paginate_async(
+    client: httpx.AsyncClient,
+    params: dict,
+    max_results: int,
+    limiter: RequestPacer,
+) -> list[dict]:
+    """Like _paginate, but returns raw work JSON."""
+    works: list[dict] = []
+    cursor = "*"
+    while len(works) < max_results:
+        await limiter.wait()
+        resp = await client.get("/works", params={**params, "cursor": cursor})
+        resp.raise_for_status()
+        data = fastjson.loads(resp.content)
+        works.extend(data.get("results", []))
+        cursor = data.get("meta", {}).get("next_cursor")
+        if not cursor or not data.get("results"):
+            break
+    return works[:max_results]
+
+
+async def _query_filters_async(
+    filters: list[str], email: str, select: str, per_page: int, max_results: int
+) -> list[list[dict] | BaseException]:
+    semaphore = asyncio.Semaphore(OPENALEX_RATE_LIMIT)
+
+    async def fetch(client: httpx.AsyncClient, flt: str) -> list[dict]:
+        params: dict = {"filter": flt, "select": select, "per-page": per_page}
+        if email:
+            params["mailto"] = email
+        async with semaphore:
+            return await _paginate_async(client, params, max_results, _limiter)
+
+    # HTTP/2 multiplexes every concurrent request over one TLS connection.
+    async with httpx.AsyncClient(
+        http2=True, base_url=OPENALEX_BASE, headers=_headers(email), timeout=30
+    ) as client:
+        return await asyncio.gather(
+            *(fetch(client, flt) for flt in filters), return_exceptions=True
+        )
+
+
+def _query_filters(
+    filters: list[str],
+    email: str,
+    *,
+    select: str = _WORK_SELECT,
+    per_page: int = 200,
+    max_results: int = 10_000,
+    progress_callback=None,
+) -> list[list[dict] | None]:
+    """
+    Run one paginated /works query per filter, concurrently and paced to the
+    polite-pool rate limit. Returns the raw works of each filter, in filter
+    order; None for filters whose request failed (reported via progress_callback).
+    """
+    if not filters:
+        return []
+    results = asyncio.run(_query_filters_async(filters, email, select, per_page, max_results))
+    out: list[list[dict] | None] = []
+    for result in results:
+        if isinstance(result, BaseException):
+            if progress_callback:
+                progress_callback(f"OpenAlex: bulk lookup failed — {result}")
+            out.append(None)
+        else:
+            out.append(result)
+    return out
+
+
+def get_works_bulk(
+    openalex_ids: list[str],
+    email: str,
+    *,
+    select: list[str] | None = None,
+    progress_callback=None,
+) -> list[dict]:
+    """
+    Fetch many works by OpenAlex ID with `filter=openalex_id:W1|W2|…`,
+    50 ids per request. Returns raw work JSON restricted to `select` fields.
+    """
+    filters = [
+        "openalex_id:" + "|".join(_short_id(i) for i in chunk)
+        for chunk in _chunks(openalex_ids)
+    ]
+    results = _query_filters(
+        filters, email,
+        select=",".join(select) if select else _WORK_SELECT,
+        per_page=_BULK_CHUNK,
+        progress_callback=progress_callback,
+    )
+    return [w for works in results if works for w in works]
+
+
+# Persistent cache for snowballing, shared across sessions and reviews (works and
+# their citation links don't depend on the review; entries expire after the TTL),
+# keyed by short OpenAlex id:
+#   "refs:W1"   → ids W1 references     "citers:W1" → ids of works citing W1
+#   "work:W1"   → raw work JSON
+_cache = DiskCache(
+    os.path.join(tempfile.gettempdir(), "litreview_openalex_cache.sqlite"),
+    OPENALEX_CACHE_TTL_SECONDS,
+)
+
+
+def _get_works_cached(openalex_ids: list[str], email: str, progress_callback=None) -> list[dict]:
+    """Raw works for `openalex_ids` (in order), fetching only those not cached."""
+    ids = [_short_id(i) for i in openalex_ids]
+    works = {k[5:]: w for k, w in _cache.get_many([f"work:{i}" for i in ids]).items()}
+    fetched = get_works_bulk(
+        [i for i in ids if i not in works], email, progress_callback=progress_callback
+    )
+    fresh = {_short_id(w["id"]): w for w in fetched if w.get("id")}
+    _cache.put_many({f"work:{i}": w for i, w in fresh.items()})
+    works.update(fresh)
+    return [works[i] for i in ids if i in works]
+
+
+def get_references_bulk(
+    openalex_ids: list[str],
+    email: str,
+    max_results: int = 2000,
+    progress_callback=None,
+    *,
+    known_refs: dict[str, list[str]] | None = None,
+) -> Iterator[dict]:
+    """
+    Backward snowballing for many seeds: works referenced by any of them, in
+    seed order, de-duplicated. Two bulk passes — the seeds' reference lists,
+    then the referenced works themselves — each served from the disk cache
+    where possible. Reference lists the caller already has (`known_refs`,
+    keyed by OpenAlex id) skip the first pass. Works are parsed lazily as the
+    caller iterates, so stopping early skips parsing the rest.
+    """
+    seeds = [_short_id(i) for i in openalex_ids]
+    ref_lists = {_short_id(k): v for k, v in (known_refs or {}).items()}
+    ref_lists.update(
+        (k[5:], v)
+        for k, v in _cache.get_many([f"refs:{s}" for s in seeds if s not in ref_lists]).items()
+    )
+    fetched = {
+        _short_id(w["id"]): w.get("referenced_works") or []
+        for w in get_works_bulk(
+            [s for s in seeds if s not in ref_lists], email,
+            select=["id", "referenced_works"], progress_callback=progress_callback,
+        )
+        if w.get("id")
+    }
+    _cache.put_many({f"refs:{s}": refs for s, refs in fetched.items()})
+    ref_lists.update(fetched)
+
+    ref_ids = list(dict.fromkeys(
+        _short_id(r) for s in seeds for r in ref_lists.get(s, []) if r
+    ))[:max_results]
+    works = _get_works_cached(ref_ids, email, progress_callback)
+    return (p for p in map(_parse_work, works) if p)
+
+
+def get_citing_papers_bulk(
+    openalex_ids: list[str], email: str, max_results: int = 2000, progress_callback=None
+) -> Iterator[dict]:
+    """
+    Forward snowballing for many seeds: works citing any of them
+    (`filter=cites:W1|W2|…`), parsed lazily as the caller iterates.
+    Seeds whose citing works are cached skip the network.
+    """
+    seeds = [_short_id(i) for i in openalex_ids]
+    citer_lists = {
+        k[7:]: v for k, v in _cache.get_many([f"citers:{s}" for s in seeds]).items()
+    }
+    missing = _chunks([s for s in seeds if s not in citer_lists])
+    results = _query_filters(
+        ["cites:" + "|".join(chunk) for chunk in missing], email,
+        max_results=max_results, progress_callback=progress_callback,
+    )
+
+    fresh_works: list[dict] = []
+    new_lists: dict[str, list[str]] = {}
+    for chunk, works in zip(missing, results):
+        if works is None:
+            continue
+        fresh_works.extend(works)
+        if len(works) >= max_results:
+            continue  # truncated — per-seed lists would be incomplete
+        # A work matched `cites:` because a chunk seed is in its referenced_works.
+        lists = {s: [] for s in chunk}
+        for w in works:
+            for r in w.get("referenced_works") or []:
+                s = _short_id(r)
+                if s in lists:
+                    lists[s].append(_short_id(w["id"]))
+        new_lists.update(lists)
+    _cache.put_many({f"citers:{s}": ids for s, ids in new_lists.items()})
+    _cache.put_many({f"work:{_short_id(w['id'])}": w for w in fresh_works if w.get("id")})
+
+    cached_ids = list(dict.fromkeys(i for s in seeds for i in citer_lists.get(s, [])))
+    works = _get_works_cached(cached_ids, email, progress_callback) + fresh_works
+    return (p for p in map(_parse_work, works) if p)
@@ -0,0 +1,44 @@
+"""Request pacing shared by the scholarly API clients."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class RequestPacer:
+    """
+    Spaces request starts at most `rate` per second across every caller:
+    async tasks await wait(), synchronous code calls wait_blocking(). A caller
+    only sleeps for the residual of its slot, so slow responses cost no extra
+    delay. The slot bookkeeping uses a thread lock (never held across an
+    await), so one limiter paces event loops and threads alike.
+    """
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Claim the next slot and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        return delay
+
+    def back_off(self, seconds: float) -> None:
+        """Hold every caller's next slot until `seconds` from now (e.g. after a 429)."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+    async def wait(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def wait_blocking(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
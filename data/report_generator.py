@@ -3,7 +3,6 @@ from __future__ import annotations
 
 import copy
 import html
-import json
 import re
 from datetime import datetime
 
@@ -109,11 +108,7 @@ def _build_cluster_fig(included: list[dict], synthesis: dict) -> go.Figure | Non
     rows = []
     for pid, (x, y) in zip(paper_ids, coords):
         p = id_to_paper.get(pid, {})
-        try:
-            authors = [a["name"] for a in json.loads(p.get("authors") or "[]")]
-            author_str = ", ".join(authors[:2])
-        except Exception:
-            author_str = ""
+        author_str = ", ".join((p.get("author_names") or [])[:2])
         rows.append({
             "x": x, "y": y,
             "title": p.get("title", "?"),
@@ -167,37 +162,14 @@ def _build_stats_figs(included: list[dict]) -> dict[str, go.Figure | None]:
 
 
 def _build_prisma_fig(all_papers: list[dict], counts: dict) -> go.Figure:
-    by_source_oa = sum(1 for p in all_papers if p.get("source") == "openalex")
-    by_source_ss = sum(1 for p in all_papers if p.get("source") == "semantic_scholar")
-    by_snowball = sum(1 for p in all_papers if "snowball" in (p.get("found_via") or ""))
-    excluded_count = sum(1 for p in all_papers if p.get("final_status") == "EXCLUDED")
-    included_count = sum(1 for p in all_papers if p.get("final_status") == "INCLUDED")
-    human_reviewed = sum(1 for p in all_papers if p.get("human_decision"))
-    human_excluded = sum(1 for p in all_papers if p.get("human_decision") == "EXCLUDE")
-    prisma = PRISMAData(
-        identified_openalex=by_source_oa,
-        identified_semantic_scholar=by_source_ss,
-        identified_snowballing=by_snowball,
-        duplicates_removed=0,
-        screened_title_abstract=counts.get("total", 0),
-        excluded_title_abstract=excluded_count,
-        assessed_full_text=included_count + human_reviewed,
-        excluded_full_text=human_excluded,
-        human_reviewed=human_reviewed,
-        human_excluded=human_excluded,
-        included_final=included_count,
-    )
+    prisma = PRISMAData.from_papers(all_papers, counts.get("total", 0))
     return build_prisma_figure(prisma)
 
 
 def _papers_to_html_table(included: list[dict]) -> str:
     rows = []
     for p in included:
-        try:
-            authors = [a["name"] for a in (json.loads(p.get("authors") or "[]") or [])[:3]]
-            author_str = "; ".join(authors)
-        except Exception:
-            author_str = ""
+        author_str = "; ".join((p.get("author_names") or [])[:3])
         rel = round(p.get("relevance_score") or 0, 1)
         rows.append({
             "Relevance": rel,
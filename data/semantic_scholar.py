@@ -1,54 +1,106 @@
 """Semantic Scholar API client."""
 from __future__ import annotations
 
-import time
-import hashlib
+import asyncio
+import atexit
+import functools
+import os
+import tempfile
+import threading
+from itertools import islice
+from types import MappingProxyType
+from typing import Iterator, Mapping
 
 import httpx
 
-from config import SEMANTIC_SCHOLAR_BASE
+from config import (
+    SEMANTIC_SCHOLAR_BASE,
+    SEMANTIC_SCHOLAR_CACHE_TTL_SECONDS,
+    SEMANTIC_SCHOLAR_SNAPSHOT_DB,
+    SS_RATE_LIMIT_AUTH,
+    SS_RATE_LIMIT_UNAUTH,
+)
+from data.disk_cache import DiskCache
+from data.pacing import RequestPacer
+from data.semantic_scholar_local import LocalCorpus
+from utils import fastjson
+from utils.text import title_id
 
+# Only what _parse_paper reads.
 FIELDS = (
     "paperId,externalIds,title,abstract,authors,year,venue,"
-    "citationCount,fieldsOfStudy,tldr,openAccessPdf,references"
+    "citationCount,tldr,openAccessPdf,references"
 )
 
 
-def _headers(api_key: str) -> dict:
+@functools.lru_cache(maxsize=8)
+def _headers(api_key: str) -> Mapping[str, str]:
+    """Request headers, built once per key and shared read-only."""
     h = {"User-Agent": "LitReviewApp/1.0"}
     if api_key:
         h["x-api-key"] = api_key
-    return h
+    return MappingProxyType(h)
+
+
+# HTTP/2 multiplexes concurrent page requests over one connection, so a
+# small pool suffices; a dead host fails fast on connect.
+_TIMEOUT = httpx.Timeout(30, connect=10)
+_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=20)
+
+_client: httpx.Client | None = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    """
+    Shared synchronous client, created on first use and closed at exit.
+    Headers stay per request because they carry the caller's API key.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=True, base_url=SEMANTIC_SCHOLAR_BASE, timeout=_TIMEOUT, limits=_LIMITS
+                )
+                atexit.register(_client.close)
+    return _client
+
+
+# One budget per API key (quotas are per key); keyless requests share the public one.
+_pacers: dict[str, RequestPacer] = {}
+_pacers_lock = threading.Lock()
 
 
-def _rate_limit(api_key: str) -> float:
-    return 0.12 if api_key else 1.1  # seconds between requests
+def _pacer(api_key: str) -> RequestPacer:
+    pacer = _pacers.get(api_key)
+    if pacer is None:
+        with _pacers_lock:
+            pacer = _pacers.setdefault(
+                api_key, RequestPacer(SS_RATE_LIMIT_AUTH if api_key else SS_RATE_LIMIT_UNAUTH)
+            )
+    return pacer
+
+
+_EMPTY: dict = {}  # shared read-only default for missing nested objects
 
 
 def _parse_paper(p: dict, query_source: str = "") -> dict | None:
-    title = p.get("title")
+    get = p.get
+    title = get("title")
     if not title:
         return None
 
-    ss_id = p.get("paperId", "")
-    ext = p.get("externalIds", {}) or {}
-    doi = ext.get("DOI", "")
-    paper_id = doi or ss_id or hashlib.md5(title.encode()).hexdigest()
+    ss_id = get("paperId", "")
+    doi = (get("externalIds") or _EMPTY).get("DOI", "")
+    paper_id = doi or ss_id or title_id(title)
 
-    abstract = p.get("abstract") or ""
-    tldr = (p.get("tldr") or {}).get("text", "")
-    if not abstract and tldr:
-        abstract = tldr
+    abstract = get("abstract") or (get("tldr") or _EMPTY).get("text") or ""
 
-    authors = [
-        {"name": a.get("name", ""), "orcid": ""}
-        for a in (p.get("authors") or [])[:20]
-    ]
+    authors = [{"name": a.get("name", ""), "orcid": ""} for a in islice(get("authors") or (), 20)]
 
-    oa_pdf = (p.get("openAccessPdf") or {}).get("url", "")
-    refs = [
-        r.get("paperId") for r in (p.get("references") or []) if r.get("paperId")
-    ]
+    oa_pdf = (get("openAccessPdf") or _EMPTY).get("url", "")
+    refs = [rid for rid in (r.get("paperId") for r in get("references") or ()) if rid]
 
     return {
         "id": paper_id,
@@ -56,11 +108,11 @@ def _parse_paper(p: dict, query_source: str = "") -> dict | None:
         "title": title,
         "abstract": abstract,
         "authors": authors,
-        "year": p.get("year"),
-        "journal": p.get("venue") or "",
+        "year": get("year"),
+        "journal": get("venue") or "",
         "source": "semantic_scholar",
         "document_type": "article",
-        "citation_count": p.get("citationCount") or 0,
+        "citation_count": get("citationCount") or 0,
         "open_access_url": oa_pdf,
         "concepts": [],
         "openalex_id": None,
@@ -70,6 +122,69 @@ def _parse_paper(p: dict, query_source: str = "") -> dict | None:
     }
 
 
+_MAX_SEARCH_RESULTS = 1000  # relevance search never pages beyond the first 1000
+_RETRY_AFTER_SECONDS = 5
+
+
+async def _search_pages_async(
+    params: dict, api_key: str, max_results: int, query_source: str
+) -> list[list[dict]]:
+    """
+    Fetch offset 0 to learn `total` (stopping there if the first page is
+    already the last), then every further page needed for `max_results`
+    concurrently, paced to the key's rate limit. A 429 pauses every request
+    on the key for 5 s and retries that page. Each page is parsed as soon as
+    it arrives, so raw response JSON is dropped page by page. Returns each
+    page's parsed papers, in order.
+    """
+    pacer = _pacer(api_key)
+    limit = params["limit"]
+    # Pages can overlap while the index updates; a paperId is parsed once,
+    # on whichever page arrives first (all fetches share this event loop).
+    seen: set[str] = set()
+
+    def fresh(raw) -> Iterator[dict]:
+        for p in raw:
+            pid = p.get("paperId")
+            if pid:
+                if pid in seen:
+                    continue
+                seen.add(pid)
+            yield p
+
+    async with httpx.AsyncClient(
+        http2=True,
+        base_url=SEMANTIC_SCHOLAR_BASE,
+        headers=_headers(api_key),
+        timeout=_TIMEOUT,
+        limits=_LIMITS,
+    ) as client:
+
+        async def fetch(offset: int) -> tuple[int, bool, list[dict]]:
+            while True:
+                await pacer.wait()
+                resp = await client.get("/paper/search", params={**params, "offset": offset})
+                if resp.status_code == 429:
+                    # Pause the whole key, not just this page, then retry it.
+                    pacer.back_off(_RETRY_AFTER_SECONDS)
+                    continue
+                resp.raise_for_status()
+                data = fastjson.loads(resp.content)
+                raw = data.get("data") or ()
+                parsed = (_parse_paper(p, query_source) for p in fresh(raw))
+                # A short page or a missing `next` offset means the results are exhausted.
+                more = len(raw) == limit and "next" in data
+                return data.get("total") or 0, more, [p for p in parsed if p]
+
+        total, more, first = await fetch(0)
+        if not more:
+            return [first]
+        total = min(total, max_results, _MAX_SEARCH_RESULTS)
+        rest = await asyncio.gather(*(fetch(offset) for offset in range(limit, total, limit)))
+
+    return [first, *(papers for _, _, papers in rest)]
+
+
 def search_papers(
     query: str,
     api_key: str,
@@ -81,12 +196,29 @@ def search_papers(
     query_source: str = "",
     progress_callback=None,
 ) -> list[dict]:
-    """Search Semantic Scholar. Returns normalised paper dicts."""
+    """
+    Search Semantic Scholar. Returns normalised paper dicts.
+    Hits from the local snapshot store come first; the API is only queried
+    when the store yields fewer than `max_results`.
+    """
+    local = [
+        p for p in (
+            _parse_paper(r, query_source)
+            for r in _local.search(
+                query, fields_of_study=fields_of_study,
+                year_min=year_min, year_max=year_max, limit=max_results,
+            )
+        ) if p
+    ]
+    if len(local) >= max_results:
+        if progress_callback:
+            progress_callback(f"Semantic Scholar: {len(local)} papers from the local snapshot…")
+        return local
+
     params: dict = {
         "query": query,
         "fields": FIELDS,
-        "limit": 100,
-        "offset": 0,
+        "limit": min(100, max_results),
     }
     if fields_of_study:
         params["fieldsOfStudy"] = ",".join(fields_of_study)
@@ -97,56 +229,52 @@ def search_papers(
     elif year_max:
         params["year"] = f"-{year_max}"
 
-    papers: list[dict] = []
-    client = httpx.Client(timeout=30)
-    sleep = _rate_limit(api_key)
-
     try:
-        while len(papers) < max_results:
-            resp = client.get(
-                f"{SEMANTIC_SCHOLAR_BASE}/paper/search",
-                params=params,
-                headers=_headers(api_key),
-            )
-            if resp.status_code == 429:
-                time.sleep(5)
-                continue
-            resp.raise_for_status()
-            data = resp.json()
-
-            for p in data.get("data", []):
-                parsed = _parse_paper(p, query_source)
-                if parsed:
-                    papers.append(parsed)
-                if len(papers) >= max_results:
-                    break
-
-            total = data.get("total", 0)
-            params["offset"] += params["limit"]
-            if params["offset"] >= min(total, max_results):
-                break
-
-            if progress_callback:
-                progress_callback(f"Semantic Scholar: retrieved {len(papers)} papers…")
-            time.sleep(sleep)
-    finally:
-        client.close()
-
+        pages = asyncio.run(_search_pages_async(params, api_key, max_results, query_source))
+    except httpx.HTTPError:
+        if not local:
+            raise
+        pages = []  # API unreachable: the local hits are still a usable result
+    seen = {p["id"] for p in local}
+    papers = (local + [p for page in pages for p in page if p["id"] not in seen])[:max_results]
+    # Search pages carry the same fields as /paper/{id}, so later get_paper calls can hit.
+    _cache.put_many({
+        f"paper:{p['semantic_scholar_id']}": {**p, "query_source": ""}
+        for p in papers if p["semantic_scholar_id"]
+    })
+    if progress_callback:
+        progress_callback(f"Semantic Scholar: retrieved {len(papers)} papers…")
     return papers
 
 
+_local = LocalCorpus(SEMANTIC_SCHOLAR_SNAPSHOT_DB)
+
+# Parsed papers by Semantic Scholar id ("paper:<id>"), shared across reviews.
+_cache = DiskCache(
+    os.path.join(tempfile.gettempdir(), "litreview_semantic_scholar_cache.sqlite"),
+    SEMANTIC_SCHOLAR_CACHE_TTL_SECONDS,
+)
+
+
 def get_paper(paper_id: str, api_key: str) -> dict | None:
-    """Fetch a single paper by Semantic Scholar ID."""
+    """Fetch a single paper by Semantic Scholar ID, from the disk cache or local store when possible."""
+    key = f"paper:{paper_id}"
+    cached = _cache.get_many([key]).get(key)
+    if cached is not None:
+        return cached
+    local = _local.get_many([paper_id]).get(paper_id)
+    if local is not None:
+        return _parse_paper(local)
     try:
-        client = httpx.Client(timeout=30)
-        resp = client.get(
-            f"{SEMANTIC_SCHOLAR_BASE}/paper/{paper_id}",
-            params={"fields": FIELDS},
-            headers=_headers(api_key),
+        _pacer(api_key).wait_blocking()
+        resp = _get_client().get(
+            f"/paper/{paper_id}", params={"fields": FIELDS}, headers=_headers(api_key)
         )
-        client.close()
         if resp.status_code == 200:
-            return _parse_paper(resp.json())
+            paper = _parse_paper(fastjson.loads(resp.content))
+            if paper:
+                _cache.put_many({key: paper})
+            return paper
     except Exception:
         pass
     return None
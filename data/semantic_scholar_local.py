@@ -0,0 +1,190 @@
+"""
+Local, full-text-searchable copy of a Semantic Scholar corpus snapshot.
+
+Records are stored in Graph API shape (paperId, externalIds, title, ...) so
+data.semantic_scholar parses local and remote hits with the same code.
+Build or refresh the store from the snapshot's JSONL files with
+
+    python -m data.semantic_scholar_local store.sqlite papers-*.jsonl.gz
+
+A refresh writes a new file and swaps it in, so readers never see a half-built store.
+"""
+from __future__ import annotations
+
+import gzip
+import os
+import re
+import sqlite3
+import sys
+import threading
+from typing import Iterable, Iterator
+
+from utils import fastjson
+
+_INGEST_BATCH = 10_000
+_SQLITE_MAX_PARAMS = 500
+_TOKEN_RE = re.compile(r"\w+")
+
+# Snapshot datasets use lower-case keys; the Graph API uses camelCase.
+_SNAPSHOT_KEYS = {
+    "externalids": "externalIds",
+    "citationcount": "citationCount",
+    "openaccesspdf": "openAccessPdf",
+}
+
+
+def _api_shape(rec: dict) -> dict | None:
+    """Normalise one snapshot or API record; None when it has no usable id or title."""
+    rec = {_SNAPSHOT_KEYS.get(k, k): v for k, v in rec.items()}
+    if not rec.get("paperId") and rec.get("corpusid"):
+        rec["paperId"] = f"CorpusId:{rec['corpusid']}"
+    if not rec.get("paperId") or not rec.get("title"):
+        return None
+    fields = rec.get("fieldsOfStudy") or [
+        f["category"] for f in rec.get("s2fieldsofstudy") or () if f.get("category")
+    ]
+    rec["fieldsOfStudy"] = list(dict.fromkeys(fields))
+    return rec
+
+
+def _read_jsonl(path: str) -> Iterator[dict]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield fastjson.loads(line)
+
+
+def _match_expr(query: str, fields_of_study: list[str] | None) -> str:
+    """FTS5 MATCH expression: every query word in title/abstract, any listed field."""
+    words = " ".join(f'"{w}"' for w in _TOKEN_RE.findall(query))
+    expr = f"{{title abstract}} : ({words})"
+    if fields_of_study:
+        expr += " AND fields : (" + " OR ".join(
+            f'"{f}"' for f in (" ".join(_TOKEN_RE.findall(s)) for s in fields_of_study) if f
+        ) + ")"
+    return expr
+
+
+def build(db_path: str, snapshot_paths: Iterable[str]) -> int:
+    """Build the store from snapshot JSONL files, replacing `db_path` atomically. Returns rows stored."""
+    tmp_path = f"{db_path}.building"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    db = sqlite3.connect(tmp_path)
+    db.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE papers (rowid INTEGER PRIMARY KEY, paper_id TEXT UNIQUE, year INTEGER, blob BLOB);
+        CREATE VIRTUAL TABLE papers_fts USING fts5(title, abstract, fields, content='');
+    """)
+    n = 0
+    batch: list[tuple] = []
+
+    def flush() -> None:
+        db.executemany("INSERT OR IGNORE INTO papers VALUES (?, ?, ?, ?)", [b[:4] for b in batch])
+        db.executemany(
+            "INSERT INTO papers_fts (rowid, title, abstract, fields) VALUES (?, ?, ?, ?)",
+            [(b[0], *b[4:]) for b in batch],
+        )
+        batch.clear()
+
+    for path in snapshot_paths:
+        for raw in _read_jsonl(path):
+            rec = _api_shape(raw)
+            if rec is None:
+                continue
+            n += 1
+            batch.append((
+                n, rec["paperId"], rec.get("year"), fastjson.dumps(rec),
+                rec["title"], rec.get("abstract") or "", ", ".join(rec["fieldsOfStudy"]),
+            ))
+            if len(batch) >= _INGEST_BATCH:
+                flush()
+    if batch:
+        flush()
+    db.commit()
+    db.close()
+    os.replace(tmp_path, db_path)
+    return n
+
+
+class LocalCorpus:
+    """
+    Read-only view of a built store. Safe to share between threads; the
+    sqlite file is opened lazily on first use. Errors are swallowed — a
+    missing or broken store only sends every lookup to the API.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                f"file:{self._path}?mode=ro", uri=True, check_same_thread=False
+            )
+        return self._conn
+
+    def available(self) -> bool:
+        return bool(self._path) and os.path.exists(self._path)
+
+    def search(
+        self,
+        query: str,
+        *,
+        fields_of_study: list[str] | None = None,
+        year_min: int | None = None,
+        year_max: int | None = None,
+        limit: int = 100,
+    ) -> list[dict]:
+        """Best BM25 matches for `query`, as raw API-shape records."""
+        if not self.available() or not _TOKEN_RE.search(query):
+            return []
+        sql = (
+            "SELECT p.blob FROM papers_fts f JOIN papers p ON p.rowid = f.rowid "
+            "WHERE papers_fts MATCH ?"
+        )
+        params: list = [_match_expr(query, fields_of_study)]
+        if year_min:
+            sql += " AND p.year >= ?"
+            params.append(year_min)
+        if year_max:
+            sql += " AND p.year <= ?"
+            params.append(year_max)
+        sql += " ORDER BY f.rank LIMIT ?"
+        params.append(limit)
+        try:
+            with self._lock:
+                rows = self._db().execute(sql, params).fetchall()
+        except sqlite3.Error:
+            return []
+        return [fastjson.loads(blob) for (blob,) in rows]
+
+    def get_many(self, paper_ids: list[str]) -> dict[str, dict]:
+        """Return {paper_id: raw record} for the ids present in the store."""
+        found: dict[str, dict] = {}
+        if not paper_ids or not self.available():
+            return found
+        try:
+            with self._lock:
+                db = self._db()
+                for i in range(0, len(paper_ids), _SQLITE_MAX_PARAMS):
+                    chunk = paper_ids[i : i + _SQLITE_MAX_PARAMS]
+                    rows = db.execute(
+                        f"SELECT paper_id, blob FROM papers "
+                        f"WHERE paper_id IN ({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    found.update((pid, fastjson.loads(blob)) for pid, blob in rows)
+        except sqlite3.Error:
+            pass
+        return found
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        sys.exit("usage: python -m data.semantic_scholar_local STORE.sqlite SNAPSHOT.jsonl[.gz] ...")
+    print(f"{build(sys.argv[1], sys.argv[2:])} papers stored in {sys.argv[1]}")
@@ -1,6 +1,8 @@
 """Page 1: Define Review — research question, constraints, and screening configuration."""
 import streamlit as st
 
+import config
+
 st.set_page_config(page_title="Define Review", page_icon="📋", layout="wide")
 
 # Guard: session state must be initialised from app.py
@@ -176,6 +178,33 @@ with col_d:
         placeholder="e.g. Animal studies, non-peer-reviewed, case reports...",
     )
 
+with st.expander("Advanced: LLM concurrency", expanded=False):
+    st.caption(
+        "Number of concurrent OpenAI calls. Higher is faster, but lower these "
+        "if you see 429 rate-limit errors on your OpenAI tier."
+    )
+    col_w1, col_w2 = st.columns(2)
+    with col_w1:
+        screening_max_workers = st.number_input(
+            "Screening workers",
+            min_value=1, max_value=128,
+            value=existing.get("screening_max_workers", config.SCREENING_MAX_WORKERS),
+        )
+    with col_w2:
+        quality_max_workers = st.number_input(
+            "Quality assessment workers",
+            min_value=1, max_value=128,
+            value=existing.get("quality_max_workers", config.QUALITY_MAX_WORKERS),
+        )
+    use_batch_api = st.checkbox(
+        "Screen via the OpenAI Batch API",
+        value=existing.get("use_batch_api", False),
+        help=(
+            "About 50% cheaper and avoids rate limits, but results can take minutes "
+            "to hours. Only used for large screening runs."
+        ),
+    )
+
 # ── 1.4 Launch ─────────────────────────────────────────────────────────────────
 st.divider()
 
@@ -199,6 +228,9 @@ cfg = {
     "snowball_direction": snowball_direction if enable_snowballing else "both",
     "inclusion_criteria": inclusion_criteria,
     "exclusion_criteria": exclusion_criteria,
+    "screening_max_workers": int(screening_max_workers),
+    "quality_max_workers": int(quality_max_workers),
+    "use_batch_api": use_batch_api,
 }
 
 col1, col2, col3 = st.columns([2, 2, 1])
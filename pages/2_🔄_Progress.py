@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import traceback
-import json
 
 import streamlit as st
 
@@ -11,7 +10,7 @@ st.set_page_config(page_title="Review Progress", page_icon="🔄", layout="wide"
 if "pipeline_stage" not in st.session_state:
     st.switch_page("app.py")
 
-from data.database import get_log, count_papers, get_papers, update_paper
+from data.database import get_log, get_counts_cached, get_papers, update_papers_bulk
 from agents.orchestrator import Orchestrator
 
 # ── Stage progress bar ─────────────────────────────────────────────────────────
@@ -28,22 +27,21 @@ ORDERED_STAGES = [
     ("COMPLETE",         "Done"),
 ]
 
+_STAGE_INDEX = {key: i for i, (key, _) in enumerate(ORDERED_STAGES)}
+_STAGE_CELL = "<div style='flex:1;text-align:center;font-size:11px;{style}'>{text}</div>"
+
+
 def _stage_bar(current: str) -> None:
-    stage_keys = [s[0] for s in ORDERED_STAGES]
-    labels     = [s[1] for s in ORDERED_STAGES]
-    try:
-        idx = stage_keys.index(current)
-    except ValueError:
-        idx = 0
-    cols = st.columns(len(ORDERED_STAGES))
-    for i, (col, label) in enumerate(zip(cols, labels)):
-        if i < idx:
-            col.markdown(f"<div style='text-align:center;color:#22c55e;font-size:11px'>✓ {label}</div>", unsafe_allow_html=True)
-        elif i == idx:
-            col.markdown(f"<div style='text-align:center;color:#3b82f6;font-weight:bold;font-size:11px'>▶ {label}</div>", unsafe_allow_html=True)
-        else:
-            col.markdown(f"<div style='text-align:center;color:#475569;font-size:11px'>{label}</div>", unsafe_allow_html=True)
-    st.progress((idx) / (len(ORDERED_STAGES) - 1))
+    """Render every stage label in one flex row (one markdown element, not 9 columns)."""
+    idx = _STAGE_INDEX.get(current, 0)
+    cells = "".join(
+        _STAGE_CELL.format(style="color:#22c55e", text=f"✓ {label}") if i < idx
+        else _STAGE_CELL.format(style="color:#3b82f6;font-weight:bold", text=f"▶ {label}") if i == idx
+        else _STAGE_CELL.format(style="color:#475569", text=label)
+        for i, (_, label) in enumerate(ORDERED_STAGES)
+    )
+    st.markdown(f"<div style='display:flex'>{cells}</div>", unsafe_allow_html=True)
+    st.progress(idx / (len(ORDERED_STAGES) - 1))
 
 
 # ── Live-log callback ──────────────────────────────────────────────────────────
@@ -65,7 +63,7 @@ def _make_callback(log_placeholder):
 
 def _show_db_log(conn) -> None:
     with st.expander("Activity log", expanded=False):
-        entries = get_log(conn, limit=100)
+        entries = get_log(conn, limit=100, with_details=False)
         if entries:
             for e in reversed(entries):
                 st.caption(f"[{e['stage']}] {e['message']}")
@@ -89,6 +87,9 @@ st.title("🔄 Review Progress")
 conn   = st.session_state.get("db_conn")
 cfg    = st.session_state.get("review_config", {})
 stage  = st.session_state.get("pipeline_stage", "IDLE")
+run_query_only      = st.session_state.get("run_query_only", False)
+hitl_enabled        = cfg.get("hitl_enabled", True)
+snowballing_enabled = cfg.get("enable_snowballing", True)
 
 if not conn:
     st.error("No database connection. Return to the home page.")
@@ -126,7 +127,9 @@ if stage == "RUNNING_QUERY":
     with st.status("Query Agent: formulating search strategy…", expanded=True) as status:
         try:
             orch = Orchestrator(conn, st.session_state, _make_callback(log_ph))
-            queries = orch.run_query_formulation()
+            queries = orch.run_query_formulation(
+                use_cache=not st.session_state.pop("regenerate_queries", False)
+            )
             status.update(label="Search strategy ready!", state="complete")
         except Exception as exc:
             status.update(label="Query formulation failed", state="error")
@@ -166,18 +169,19 @@ if stage == "QUERY_APPROVAL":
     col1, col2, col3 = st.columns([2, 2, 1])
     with col1:
         if st.button("✅ Approve & Run Search", type="primary", use_container_width=True,
-                     disabled=st.session_state.get("run_query_only", False)):
+                     disabled=run_query_only):
             st.session_state.pipeline_stage = "RUNNING_SEARCH"
             st.rerun()
     with col2:
         if st.button("🔄 Regenerate queries", use_container_width=True):
+            st.session_state.regenerate_queries = True
             st.session_state.pipeline_stage = "RUNNING_QUERY"
             st.rerun()
     with col3:
         if st.button("← Back", use_container_width=True):
             st.switch_page("pages/1_📋_Define_Review.py")
 
-    if st.session_state.get("run_query_only"):
+    if run_query_only:
         st.info("Query-only mode. Approve to run the full search.")
     st.stop()
 
@@ -194,7 +198,7 @@ if stage == "RUNNING_SEARCH":
             _error("Search Agent failed", exc)
             st.stop()
 
-    counts = count_papers(conn)
+    counts = get_counts_cached(conn)
     st.metric("Papers retrieved", counts["total"])
     st.session_state.pipeline_stage = "RUNNING_SCREENING"
     st.rerun()
@@ -226,9 +230,9 @@ if stage == "RUNNING_SCREENING":
 
     # Decide next stage
     borderline_count = screen_counts.get("borderline", 0)
-    if cfg.get("hitl_enabled", True) and borderline_count > 0:
+    if hitl_enabled and borderline_count > 0:
         st.session_state.pipeline_stage = "HITL_REVIEW"
-    elif cfg.get("enable_snowballing", True):
+    elif snowballing_enabled:
         st.session_state.pipeline_stage = "RUNNING_SNOWBALL"
     else:
         st.session_state.pipeline_stage = "RUNNING_QUALITY"
@@ -239,47 +243,41 @@ if stage == "HITL_REVIEW":
     st.subheader("Your review — borderline papers")
     st.info(
         "The screening agent flagged these papers as uncertain. "
-        "Mark each **Include** or **Exclude**, then click **Continue Pipeline**."
+        "Mark each **Include** or **Exclude**, click **Save decisions**, then **Continue Pipeline**."
     )
 
-    borderline = [
-        p for p in get_papers(conn)
-        if p.get("screening_pass1") == "BORDERLINE" and not p.get("human_decision")
-    ]
-    decided = [
-        p for p in get_papers(conn)
-        if p.get("screening_pass1") == "BORDERLINE" and p.get("human_decision")
-    ]
+    borderline = get_papers(conn, pass1="BORDERLINE", human_decided=False)
+    decided_count = len(get_papers(conn, pass1="BORDERLINE", human_decided=True, columns=("id",)))
 
     if borderline:
-        st.write(f"**{len(borderline)} remaining** · {len(decided)} decided")
-        for p in borderline:
-            authors = []
-            try:
-                authors = [a["name"] for a in (json.loads(p.get("authors") or "[]") or [])[:3]]
-            except Exception:
-                pass
-            with st.expander(
-                f"📄 {p.get('title', 'Untitled')} ({p.get('year', '?')}) — {', '.join(authors[:2])}"
-            ):
-                st.caption(f"**Journal:** {p.get('journal', '—')} · **Citations:** {p.get('citation_count', 0)}")
-                st.caption(f"**Agent reasoning:** _{p.get('screening_pass1_reason', '—')}_")
-                if p.get("abstract"):
-                    abs_text = p["abstract"]
-                    st.markdown(abs_text[:600] + ("…" if len(abs_text) > 600 else ""))
-                if p.get("doi"):
-                    st.markdown(f"[View paper →](https://doi.org/{p['doi']})")
-                bcol1, bcol2 = st.columns(2)
-                with bcol1:
-                    if st.button("✅ Include", key=f"inc_{p['id']}", use_container_width=True):
-                        update_paper(conn, p["id"], human_decision="INCLUDE")
-                        st.rerun()
-                with bcol2:
-                    if st.button("❌ Exclude", key=f"exc_{p['id']}", use_container_width=True):
-                        update_paper(conn, p["id"], human_decision="EXCLUDE")
-                        st.rerun()
+        st.write(f"**{len(borderline)} remaining** · {decided_count} decided")
+        # Choices are buffered in the form and written in one transaction on submit,
+        # instead of an UPDATE + full rerun per click.
+        with st.form("hitl"):
+            for p in borderline:
+                with st.expander(
+                    f"📄 {p.get('title', 'Untitled')} ({p.get('year', '?')}) — {p.get('authors_display') or ''}"
+                ):
+                    st.caption(f"**Journal:** {p.get('journal', '—')} · **Citations:** {p.get('citation_count', 0)}")
+                    st.caption(f"**Agent reasoning:** _{p.get('screening_pass1_reason', '—')}_")
+                    if p.get("abstract"):
+                        abs_text = p["abstract"]
+                        st.markdown(abs_text[:600] + ("…" if len(abs_text) > 600 else ""))
+                    if p.get("doi"):
+                        st.markdown(f"[View paper →](https://doi.org/{p['doi']})")
+                    st.radio(
+                        "Decision", ["—", "INCLUDE", "EXCLUDE"],
+                        key=f"d_{p['id']}", horizontal=True, label_visibility="collapsed",
+                    )
+            if st.form_submit_button("💾 Save decisions", use_container_width=True):
+                updates = [
+                    (v, p["id"]) for p in borderline
+                    if (v := st.session_state.get(f"d_{p['id']}", "—")) != "—"
+                ]
+                update_papers_bulk(conn, updates, ["human_decision"])
+                st.rerun()
     else:
-        st.success(f"All {len(decided)} borderline papers reviewed.")
+        st.success(f"All {decided_count} borderline papers reviewed.")
 
     st.divider()
     col1, col2 = st.columns(2)
@@ -290,11 +288,11 @@ if stage == "HITL_REVIEW":
                 orch = Orchestrator(conn, st.session_state, _make_callback(log_ph))
                 orch.resume_after_hitl()
                 status.update(label="Decisions applied.", state="complete")
-            next_stage = "RUNNING_SNOWBALL" if cfg.get("enable_snowballing", True) else "RUNNING_QUALITY"
+            next_stage = "RUNNING_SNOWBALL" if snowballing_enabled else "RUNNING_QUALITY"
             st.session_state.pipeline_stage = next_stage
             st.rerun()
     with col2:
-        st.caption("Your decisions are saved automatically. You can come back later.")
+        st.caption("Saved decisions persist. You can come back later.")
     st.stop()
 
 # ── RUNNING_SNOWBALL ───────────────────────────────────────────────────────────
@@ -316,7 +314,7 @@ if stage == "RUNNING_SNOWBALL":
 
 # ── RUNNING_QUALITY ────────────────────────────────────────────────────────────
 if stage == "RUNNING_QUALITY":
-    included_count = count_papers(conn)["included"]
+    included_count = get_counts_cached(conn)["included"]
     log_ph = st.empty()
     with st.status(f"Quality Agent: assessing {included_count} included papers…", expanded=True) as status:
         try:
@@ -333,7 +331,7 @@ if stage == "RUNNING_QUALITY":
 
 # ── RUNNING_SYNTHESIS ──────────────────────────────────────────────────────────
 if stage == "RUNNING_SYNTHESIS":
-    included_count = count_papers(conn)["included"]
+    included_count = get_counts_cached(conn)["included"]
     log_ph = st.empty()
     with st.status(f"Synthesis Agent: clustering and synthesising {included_count} papers…", expanded=True) as status:
         try:
@@ -351,7 +349,7 @@ if stage == "RUNNING_SYNTHESIS":
 # ── COMPLETE ───────────────────────────────────────────────────────────────────
 if stage == "COMPLETE":
     st.success("Pipeline complete!")
-    counts = count_papers(conn)
+    counts = get_counts_cached(conn)
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total retrieved", counts["total"])
     col2.metric("Included", counts["included"])
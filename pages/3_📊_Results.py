@@ -1,8 +1,9 @@
 """Page 3: Results Dashboard — paper table, cluster map, statistics, synthesis, network."""
 from __future__ import annotations
 
-import json
+from datetime import datetime
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -14,7 +15,12 @@ st.set_page_config(page_title="Results", page_icon="📊", layout="wide")
 if "pipeline_stage" not in st.session_state:
     st.switch_page("app.py")
 
-from data.database import get_papers, get_synthesis, count_papers, get_embeddings
+from agents.orchestrator import Orchestrator
+from data.database import (
+    get_papers_cached, get_synthesis, get_counts_cached, get_embeddings, get_config, data_version,
+)
+from data.report_generator import build_html_report
+from utils.network import build_network
 from utils.prisma import PRISMAData, build_prisma_figure
 
 conn = st.session_state.get("db_conn")
@@ -22,16 +28,192 @@ if not conn:
     st.error("No database connection.")
     st.stop()
 
-counts = count_papers(conn)
+counts = get_counts_cached(conn)
 if counts["total"] == 0:
     st.warning("No papers yet. Run the pipeline first.")
     st.stop()
 
 # ── Load data ──────────────────────────────────────────────────────────────────
-all_papers = get_papers(conn)
+all_papers = get_papers_cached(conn)
 included = [p for p in all_papers if p.get("final_status") == "INCLUDED"]
 synthesis = get_synthesis(conn)
 
+# Derived frames are cached per (session, data version): filter widgets rerun
+# the page without touching the DB, so they reuse the frames instead of rebuilding.
+# Underscored arguments are not hashed; the version stands in for them.
+data_key = (st.session_state.get("session_id"), data_version(conn))
+
+
+_NO_CLUSTER = "Uncategorised"  # label for papers synthesis has not clustered
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _paper_table(key: tuple, _included: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame([
+        {
+            "Relevance": round(p.get("relevance_score") or 0, 1),
+            "Title": p.get("title", ""),
+            "Authors": "; ".join((p.get("author_names") or [])[:3]),
+            "Year": p.get("year"),
+            "Journal": p.get("journal", ""),
+            "Citations": p.get("citation_count", 0),
+            "Quality": round(p.get("quality_score") or 0, 1),
+            "Cluster": p.get("cluster_label"),
+            "DOI": p.get("doi", ""),
+            "OA": "🔓" if p.get("open_access_url") else "",
+        }
+        for p in _included
+    ]).sort_values("Relevance", ascending=False)
+    df["Cluster"] = df["Cluster"].replace("", None).fillna(_NO_CLUSTER)
+    # Lower-cased "title\nauthors", so a search is one literal substring scan.
+    df["_search"] = (df["Title"].fillna("") + "\n" + df["Authors"]).str.lower()
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _filter_options(key: tuple, _df: pd.DataFrame) -> tuple[list, list]:
+    """(years newest first, cluster labels A–Z) for the table filters."""
+    return (
+        sorted(_df["Year"].dropna().unique().tolist(), reverse=True),
+        sorted(_df["Cluster"].dropna().unique().tolist()),
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cluster_points(key: tuple, _included: list[dict], _synthesis: dict) -> pd.DataFrame:
+    coords = np.asarray(_synthesis.get("coords_2d", []), dtype=float).reshape(-1, 2)
+    points = pd.DataFrame({
+        "id": _synthesis.get("paper_ids", [])[: len(coords)], "x": coords[:, 0], "y": coords[:, 1],
+    })
+    papers = pd.DataFrame.from_records(
+        _included, columns=["id", "title", "cluster_label", "year", "citation_count"]
+    ).rename(columns={"cluster_label": "cluster", "citation_count": "citations"})
+    papers["cluster"] = papers["cluster"].replace("", None)
+    papers["author"] = [", ".join((p.get("author_names") or [])[:2]) for p in _included]
+    # Integer columns as objects, so hover labels read 2020 rather than 2020.0.
+    papers[["year", "citations"]] = papers[["year", "citations"]].astype("Int64").astype(object)
+    return points.merge(papers, on="id", how="left").drop(columns="id").fillna({
+        "title": "?", "cluster": _NO_CLUSTER, "year": "", "citations": 0, "author": "",
+    })
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _stats_frame(key: tuple, _included: list[dict]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        _included, columns=["year", "journal", "quality_score", "citation_count", "relevance_score"]
+    )
+
+
+_TRANSPARENT_LAYOUT = dict(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cluster_figure(key: tuple, _plot_df: pd.DataFrame) -> go.Figure:
+    fig = px.scatter(
+        _plot_df,
+        x="x", y="y",
+        color="cluster",
+        hover_data={"title": True, "author": True, "year": True, "citations": True, "x": False, "y": False},
+        title="Paper clusters (2D projection of semantic embeddings)",
+        labels={"x": "Dimension 1", "y": "Dimension 2"},
+    )
+    fig.update_traces(marker=dict(size=10, opacity=0.8))
+    fig.update_layout(**_TRANSPARENT_LAYOUT, legend_title="Cluster")
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _stats_figures(key: tuple, _stats: pd.DataFrame) -> dict[str, go.Figure]:
+    """The four Statistics-tab charts; a chart with no data to show is left out."""
+    figs: dict[str, go.Figure] = {}
+
+    years = _stats["year"]
+    year_counts = years[years > 0].astype(int).value_counts().sort_index()
+    figs["year"] = px.bar(
+        x=year_counts.index.tolist(),
+        y=year_counts.values.tolist(),
+        labels={"x": "Year", "y": "Papers"},
+        title="Papers by Year",
+    )
+
+    journals = _stats["journal"]
+    journal_counts = journals[journals.fillna("") != ""].value_counts().head(15)
+    if not journal_counts.empty:
+        figs["journal"] = px.bar(
+            x=journal_counts.values.tolist(),
+            y=journal_counts.index.tolist(),
+            orientation="h",
+            labels={"x": "Papers", "y": "Journal"},
+            title="Top Journals",
+        )
+
+    quality_scores = _stats["quality_score"]
+    quality_scores = quality_scores[quality_scores > 0]
+    if not quality_scores.empty:
+        figs["quality"] = px.histogram(
+            x=quality_scores,
+            nbins=20,
+            labels={"x": "Quality Score", "y": "Count"},
+            title="Quality Score Distribution",
+        )
+
+    citations = _stats["citation_count"]
+    citations = citations[citations > 0]
+    if not citations.empty:
+        figs["citations"] = px.histogram(
+            x=citations,
+            nbins=20,
+            labels={"x": "Citation Count", "y": "Papers"},
+            title="Citation Count Distribution",
+        )
+
+    for fig in figs.values():
+        fig.update_layout(**_TRANSPARENT_LAYOUT)
+    return figs
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _has_embeddings(key: tuple, _conn) -> bool:
+    return bool(get_embeddings(_conn)[0])
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _embedding_map(key: tuple, _conn) -> dict | None:
+    """One shared map per data version, so build_network reuses its similarity matrix."""
+    emb_ids, emb_matrix = get_embeddings(_conn)
+    return dict(zip(emb_ids, emb_matrix)) if emb_ids else None
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _network(
+    key: tuple, network_type: str, max_nodes: int, sim_k: int, sim_thresh: float, top_n: int,
+    _conn, _included: list[dict],
+) -> tuple[str, int, int, list[dict]]:
+    """build_network() for one combination of the tab's settings."""
+    embedding_map = _embedding_map(key, _conn) if network_type == "similarity" else None
+    return build_network(
+        _included,
+        network_type=network_type,
+        max_nodes=max_nodes,
+        similarity_k=sim_k,
+        similarity_threshold=sim_thresh,
+        embedding_map=embedding_map,
+        top_n=top_n,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _prisma_figure(key: tuple, _prisma: PRISMAData) -> go.Figure:
+    return build_prisma_figure(_prisma)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _prisma_data(key: tuple, _all_papers: list[dict], screened: int) -> PRISMAData:
+    return PRISMAData.from_papers(_all_papers, screened)
+
+
+stats_df = _stats_frame(data_key, included)
+
 # ── Header ─────────────────────────────────────────────────────────────────────
 col_title, col_rescore, col_save = st.columns([4, 1, 1])
 with col_title:
@@ -43,10 +225,9 @@ with col_title:
 with col_rescore:
     st.write("")
     st.write("")
-    has_scores = any(p.get("relevance_score") for p in included)
+    has_scores = bool(stats_df["relevance_score"].fillna(0).to_numpy().any())
     btn_label = "🔄 Re-score Relevance" if has_scores else "⚡ Score Relevance"
     if st.button(btn_label, help="Score all included papers by semantic similarity to the research question"):
-        from agents.orchestrator import Orchestrator
         log_placeholder = st.empty()
         def _cb(msg): log_placeholder.info(msg)
         orch = Orchestrator(conn, st.session_state, _cb)
@@ -57,9 +238,7 @@ with col_save:
     st.write("")
     st.write("")
     if st.button("💾 Save Dashboard", help="Download full interactive HTML report (excludes network for speed)"):
-        from data.report_generator import build_html_report
-        from data.database import get_config as _get_cfg
-        _rq = _get_cfg(conn).get("research_question", "Literature Review")
+        _rq = get_config(conn).get("research_question", "Literature Review")
         with st.spinner("Building report…"):
             _report_bytes = build_html_report(
                 included=included,
@@ -68,7 +247,7 @@ with col_save:
                 counts=counts,
                 research_question=_rq,
             )
-        _date_str = __import__("datetime").datetime.now().strftime("%Y-%m-%d")
+        _date_str = datetime.now().strftime("%Y-%m-%d")
         st.download_button(
             label="⬇️ Download HTML",
             data=_report_bytes,
@@ -83,63 +262,41 @@ tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
 
 
 # ── Tab 1: Paper Table ─────────────────────────────────────────────────────────
-with tab1:
+# A fragment: filter and search widgets rerun only this tab, not the whole page.
+@st.fragment
+def _paper_table_tab() -> None:
     if not included:
         st.info("No included papers yet.")
     else:
         st.subheader(f"Included Papers ({len(included)})")
 
-        # Build display dataframe
-        rows = []
-        for p in included:
-            authors = []
-            try:
-                authors = [a["name"] for a in (json.loads(p.get("authors") or "[]") or [])[:3]]
-            except Exception:
-                pass
-            rows.append({
-                "Relevance": round(p.get("relevance_score") or 0, 1),
-                "Title": p.get("title", ""),
-                "Authors": "; ".join(authors),
-                "Year": p.get("year"),
-                "Journal": p.get("journal", ""),
-                "Citations": p.get("citation_count", 0),
-                "Quality": round(p.get("quality_score") or 0, 1),
-                "Cluster": p.get("cluster_label", ""),
-                "DOI": p.get("doi", ""),
-                "OA": "🔓" if p.get("open_access_url") else "",
-            })
-
-        df = pd.DataFrame(rows).sort_values("Relevance", ascending=False)
+        df = _paper_table(data_key, included)
+        year_options, cluster_options = _filter_options(data_key, df)
 
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
             year_filter = st.multiselect(
                 "Filter by year",
-                options=sorted(df["Year"].dropna().unique().tolist(), reverse=True),
+                options=year_options,
                 default=[],
             )
         with col2:
             cluster_filter = st.multiselect(
                 "Filter by cluster",
-                options=sorted(df["Cluster"].dropna().unique().tolist()),
+                options=cluster_options,
                 default=[],
             )
         with col3:
             search_text = st.text_input("Search title / authors", "")
 
-        filtered = df.copy()
+        filtered = df
         if year_filter:
             filtered = filtered[filtered["Year"].isin(year_filter)]
         if cluster_filter:
             filtered = filtered[filtered["Cluster"].isin(cluster_filter)]
         if search_text:
-            mask = (
-                filtered["Title"].str.contains(search_text, case=False, na=False)
-                | filtered["Authors"].str.contains(search_text, case=False, na=False)
-            )
-            filtered = filtered[mask]
+            filtered = filtered[filtered["_search"].str.contains(search_text.lower(), regex=False)]
 
         st.dataframe(
             filtered,
@@ -154,6 +311,7 @@ with tab1:
                 "Citations": st.column_config.NumberColumn(format="%d"),
                 "Quality": st.column_config.NumberColumn(format="%.1f"),
                 "DOI": st.column_config.LinkColumn(display_text="DOI"),
+                "_search": None,
             },
         )
         st.caption(f"Showing {len(filtered)} of {len(included)} papers")
@@ -165,11 +323,7 @@ with tab1:
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.markdown(f"**{p.get('title')}**")
-                try:
-                    authors = [a["name"] for a in json.loads(p.get("authors") or "[]")]
-                    st.caption(", ".join(authors[:5]))
-                except Exception:
-                    pass
+                st.caption(", ".join((p.get("author_names") or [])[:5]))
                 if p.get("abstract"):
                     st.markdown(p["abstract"])
             with col2:
@@ -185,51 +339,19 @@ with tab1:
                 if p.get("quality_notes"):
                     st.caption(f"Quality notes: {p['quality_notes']}")
 
+
+with tab1:
+    _paper_table_tab()
+
+
 # ── Tab 2: Cluster Map ─────────────────────────────────────────────────────────
 with tab2:
     if not synthesis or not synthesis.get("coords_2d"):
         st.info("Cluster map available after synthesis is complete.")
     else:
         st.subheader("Topic Cluster Map")
-        coords = synthesis.get("coords_2d", [])
-        paper_ids = synthesis.get("paper_ids", [])
-
-        # Build lookup
-        id_to_paper = {p["id"]: p for p in included}
-
-        plot_data = []
-        for pid, (x, y) in zip(paper_ids, coords):
-            p = id_to_paper.get(pid, {})
-            try:
-                authors = [a["name"] for a in json.loads(p.get("authors") or "[]")]
-                author_str = ", ".join(authors[:2])
-            except Exception:
-                author_str = ""
-            plot_data.append({
-                "x": x, "y": y,
-                "title": p.get("title", "?"),
-                "cluster": p.get("cluster_label", "Uncategorised"),
-                "year": p.get("year", ""),
-                "citations": p.get("citation_count", 0),
-                "author": author_str,
-            })
-
-        plot_df = pd.DataFrame(plot_data)
-        fig = px.scatter(
-            plot_df,
-            x="x", y="y",
-            color="cluster",
-            hover_data={"title": True, "author": True, "year": True, "citations": True, "x": False, "y": False},
-            title="Paper clusters (2D projection of semantic embeddings)",
-            labels={"x": "Dimension 1", "y": "Dimension 2"},
-        )
-        fig.update_traces(marker=dict(size=10, opacity=0.8))
-        fig.update_layout(
-            plot_bgcolor="rgba(0,0,0,0)",
-            paper_bgcolor="rgba(0,0,0,0)",
-            legend_title="Cluster",
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        plot_df = _cluster_points(data_key, included, synthesis)
+        st.plotly_chart(_cluster_figure(data_key, plot_df), use_container_width=True)
 
         # Cluster legend
         clusters = synthesis.get("cluster_summaries", [])
@@ -246,65 +368,14 @@ with tab3:
     if not included:
         st.info("No included papers yet.")
     else:
+        # Figures are built once per data version; filter reruns only re-send them.
+        stats_figs = _stats_figures(data_key, stats_df)
         col1, col2 = st.columns(2)
-
-        # Papers by year
-        year_counts = pd.Series([p.get("year") for p in included if p.get("year")]).value_counts().sort_index()
-        with col1:
-            fig_year = px.bar(
-                x=year_counts.index.tolist(),
-                y=year_counts.values.tolist(),
-                labels={"x": "Year", "y": "Papers"},
-                title="Papers by Year",
-            )
-            fig_year.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-            st.plotly_chart(fig_year, use_container_width=True)
-
-        # Papers by journal
-        journal_counts = (
-            pd.Series([p.get("journal") for p in included if p.get("journal")])
-            .value_counts()
-            .head(15)
-        )
-        with col2:
-            if not journal_counts.empty:
-                fig_journal = px.bar(
-                    x=journal_counts.values.tolist(),
-                    y=journal_counts.index.tolist(),
-                    orientation="h",
-                    labels={"x": "Papers", "y": "Journal"},
-                    title="Top Journals",
-                )
-                fig_journal.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-                st.plotly_chart(fig_journal, use_container_width=True)
-
         col3, col4 = st.columns(2)
-
-        # Quality distribution
-        quality_scores = [p.get("quality_score") for p in included if p.get("quality_score")]
-        with col3:
-            if quality_scores:
-                fig_q = px.histogram(
-                    x=quality_scores,
-                    nbins=20,
-                    labels={"x": "Quality Score", "y": "Count"},
-                    title="Quality Score Distribution",
-                )
-                fig_q.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-                st.plotly_chart(fig_q, use_container_width=True)
-
-        # Citation distribution
-        citations = [p.get("citation_count") for p in included if p.get("citation_count")]
-        with col4:
-            if citations:
-                fig_c = px.histogram(
-                    x=citations,
-                    nbins=20,
-                    labels={"x": "Citation Count", "y": "Papers"},
-                    title="Citation Count Distribution",
-                )
-                fig_c.update_layout(plot_bgcolor="rgba(0,0,0,0)", paper_bgcolor="rgba(0,0,0,0)")
-                st.plotly_chart(fig_c, use_container_width=True)
+        for col, name in ((col1, "year"), (col2, "journal"), (col3, "quality"), (col4, "citations")):
+            if name in stats_figs:
+                with col:
+                    st.plotly_chart(stats_figs[name], use_container_width=True)
 
 
 # ── Tab 4: Synthesis ───────────────────────────────────────────────────────────
@@ -355,43 +426,20 @@ with tab5:
     st.subheader("PRISMA 2020 Flow Diagram")
 
     # Calculate PRISMA data from pipeline counts
-    all_p = get_papers(conn)
-    by_source_oa = sum(1 for p in all_p if p.get("source") == "openalex")
-    by_source_ss = sum(1 for p in all_p if p.get("source") == "semantic_scholar")
-    by_snowball = sum(1 for p in all_p if "snowball" in (p.get("found_via") or ""))
-
-    excluded_count = sum(1 for p in all_p if p.get("final_status") == "EXCLUDED")
-    included_count = sum(1 for p in all_p if p.get("final_status") == "INCLUDED")
-    human_reviewed = sum(1 for p in all_p if p.get("human_decision"))
-    human_excluded = sum(1 for p in all_p if p.get("human_decision") == "EXCLUDE")
-
-    prisma = PRISMAData(
-        identified_openalex=by_source_oa,
-        identified_semantic_scholar=by_source_ss,
-        identified_snowballing=by_snowball,
-        duplicates_removed=0,  # tracked at insertion time
-        screened_title_abstract=counts["total"],
-        excluded_title_abstract=excluded_count,
-        assessed_full_text=included_count + human_reviewed,
-        excluded_full_text=human_excluded,
-        human_reviewed=human_reviewed,
-        human_excluded=human_excluded,
-        included_final=included_count,
-    )
+    prisma = _prisma_data(data_key, all_papers, counts["total"])
 
-    fig_prisma = build_prisma_figure(prisma)
-    st.plotly_chart(fig_prisma, use_container_width=True)
+    st.plotly_chart(_prisma_figure(data_key, prisma), use_container_width=True)
 
 
 # ── Tab 6: Paper Network ───────────────────────────────────────────────────────
-with tab6:
+# A fragment: network sliders rerun only this tab, not the whole page.
+@st.fragment
+def _network_tab() -> None:
     st.subheader("Paper Network")
 
     if not included:
         st.info("No included papers yet.")
     else:
-        from utils.network import build_network
-
         col_nw1, col_nw2, col_nw3, col_nw4 = st.columns(4)
         with col_nw1:
             network_type = st.radio(
@@ -412,24 +460,12 @@ with tab6:
             top_n = st.slider("Key papers to highlight", min_value=3, max_value=20, value=10,
                               help="Top N papers by network centrality, highlighted in red")
 
-        # Build embedding map for similarity network
-        embedding_map = None
-        if network_type == "similarity":
-            stored = get_embeddings(conn)
-            if stored:
-                embedding_map = {pid: vec for pid, vec in stored}
-            else:
-                st.warning("No embeddings found. Run synthesis first to enable semantic similarity network.")
+        if network_type == "similarity" and not _has_embeddings(data_key, conn):
+            st.warning("No embeddings found. Run synthesis first to enable semantic similarity network.")
 
         with st.spinner("Building network…"):
-            html_str, n_nodes, n_edges, important_papers = build_network(
-                included,
-                network_type=network_type,
-                max_nodes=max_nodes,
-                similarity_k=sim_k,
-                similarity_threshold=sim_thresh,
-                embedding_map=embedding_map,
-                top_n=top_n,
+            html_str, n_nodes, n_edges, important_papers = _network(
+                data_key, network_type, max_nodes, sim_k, sim_thresh, top_n, conn, included
             )
 
         st.caption(f"Showing **{n_nodes}** papers · **{n_edges}** edges")
@@ -454,11 +490,7 @@ with tab6:
             )
 
             for rank, p in enumerate(important_papers, start=1):
-                try:
-                    authors = [a["name"] for a in json.loads(p.get("authors") or "[]")][:3]
-                    author_str = "; ".join(authors) or "Unknown"
-                except Exception:
-                    author_str = "Unknown"
+                author_str = "; ".join((p.get("author_names") or [])[:3]) or "Unknown"
 
                 with st.container():
                     c1, c2 = st.columns([6, 1])
@@ -469,10 +501,14 @@ with tab6:
                         st.markdown(f"**#{rank}** {title_link}")
                         st.caption(
                             f"{author_str} · {p.get('year', '?')} · "
-                            f"Cluster: {p.get('cluster_label') or 'Uncategorised'} · "
+                            f"Cluster: {p.get('cluster_label') or _NO_CLUSTER} · "
                             f"Relevance: {p.get('relevance_score') or 0:.1f}/100"
                         )
                     with c2:
                         st.metric(metric_label, p["_connections"])
         else:
             st.info("No network connections found — key papers cannot be determined. Try adjusting the settings above.")
+
+
+with tab6:
+    _network_tab()
@@ -1,7 +1,8 @@
 """Page 4: Export — download papers in BibTeX, RIS, CSV, DOCX, and audit trail formats."""
 from __future__ import annotations
 
-import json
+import heapq
+from datetime import datetime
 
 import streamlit as st
 
@@ -10,28 +11,104 @@ st.set_page_config(page_title="Export", page_icon="📥", layout="wide")
 if "pipeline_stage" not in st.session_state:
     st.switch_page("app.py")
 
-from data.database import get_papers, get_log, get_synthesis, count_papers
+from data.database import (
+    get_papers_cached, get_log, get_synthesis, get_counts_cached, get_config, get_embeddings,
+    data_version,
+)
 from data.exporters import (
     papers_to_bibtex,
     papers_to_ris,
     papers_to_dataframe,
+    dataframe_to_xlsx_bytes,
     papers_to_docx_bytes,
     build_audit_trail,
 )
+from data.report_generator import build_html_report
+from utils import fastjson
+from utils.network import build_network
 
 conn = st.session_state.get("db_conn")
 if not conn:
     st.error("No database connection.")
     st.stop()
 
-counts = count_papers(conn)
+counts = get_counts_cached(conn)
 if counts["total"] == 0:
     st.warning("No papers yet. Run the pipeline first.")
     st.stop()
 
-included = [p for p in get_papers(conn) if p.get("final_status") == "INCLUDED"]
+all_papers = get_papers_cached(conn)
+included = [p for p in all_papers if p.get("final_status") == "INCLUDED"]
 synthesis = get_synthesis(conn)
 
+# Export files are cached per (session, data version), so reruns rebuild them
+# only after the papers change. Underscored arguments are not hashed.
+data_key = (st.session_state.get("session_id"), data_version(conn))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _reference_files(key: tuple, _included: list[dict]) -> tuple[str, str]:
+    return papers_to_bibtex(_included), papers_to_ris(_included)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _spreadsheets(key: tuple, _included: list[dict]) -> tuple[bytes, bytes]:
+    df = papers_to_dataframe(_included)
+    return df.to_csv(index=False).encode(), dataframe_to_xlsx_bytes(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _html_report(key: tuple, _conn, _included: list[dict], _all_papers: list[dict], _synthesis) -> bytes:
+    # Build a default similarity network for the report
+    net_html = None
+    try:
+        emb_ids, emb_matrix = get_embeddings(_conn)
+        emb_map = dict(zip(emb_ids, emb_matrix)) if emb_ids else None
+        net_html, _, _, _ = build_network(
+            _included, network_type="similarity", max_nodes=80, embedding_map=emb_map
+        )
+    except Exception:
+        pass
+
+    return build_html_report(
+        included=_included,
+        all_papers=_all_papers,
+        synthesis=_synthesis,
+        counts=get_counts_cached(_conn),
+        research_question=get_config(_conn).get("research_question", "Literature Review"),
+        network_html=net_html,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _docx(key: tuple, _included: list[dict], _synthesis) -> bytes:
+    return papers_to_docx_bytes(_included, _synthesis)
+
+
+_PREVIEW_SIZE = 10
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _preview_markdown(key: tuple, _included: list[dict]) -> str:
+    """Numbered list of the most relevant papers (DB order breaks ties)."""
+    top = heapq.nlargest(_PREVIEW_SIZE, _included, key=lambda p: p.get("relevance_score") or 0)
+    lines = []
+    for i, p in enumerate(top, 1):
+        author_str = p.get("authors_display") or ""
+        doi_link = f" | [DOI](https://doi.org/{p['doi']})" if p.get("doi") else ""
+        oa_link = f" | [PDF]({p['open_access_url']})" if p.get("open_access_url") else ""
+        lines.append(
+            f"{i}. **{p.get('title', 'Untitled')}** "
+            f"({p.get('year', '?')}) — {author_str}{doi_link}{oa_link}"
+        )
+    return "\n".join(lines)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _audit_trail(key: tuple, _conn, _all_papers: list[dict]) -> str:
+    return build_audit_trail(get_log(_conn, limit=10000), _all_papers)
+
+
 st.title("📥 Export Results")
 st.caption(f"**{len(included)}** papers included · ready to export")
 
@@ -46,8 +123,9 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Reference Formats")
 
+    bibtex_str, ris_str = _reference_files(data_key, included)
+
     # BibTeX
-    bibtex_str = papers_to_bibtex(included)
     st.download_button(
         label="📄 Download BibTeX (.bib)",
         data=bibtex_str,
@@ -57,7 +135,6 @@ with col1:
     )
 
     # RIS
-    ris_str = papers_to_ris(included)
     st.download_button(
         label="📄 Download RIS (.ris)",
         data=ris_str,
@@ -69,9 +146,9 @@ with col1:
     st.divider()
     st.subheader("Spreadsheets")
 
+    csv_bytes, xlsx_bytes = _spreadsheets(data_key, included)
+
     # CSV
-    df = papers_to_dataframe(included)
-    csv_bytes = df.to_csv(index=False).encode()
     st.download_button(
         label="📊 Download CSV",
         data=csv_bytes,
@@ -81,12 +158,9 @@ with col1:
     )
 
     # Excel
-    import io
-    excel_buf = io.BytesIO()
-    df.to_excel(excel_buf, index=False, engine="openpyxl")
     st.download_button(
         label="📊 Download Excel (.xlsx)",
-        data=excel_buf.getvalue(),
+        data=xlsx_bytes,
         file_name="literature_review.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         use_container_width=True,
@@ -95,36 +169,10 @@ with col1:
 with col2:
     st.subheader("Interactive Dashboard")
 
-    from data.report_generator import build_html_report
-    from data.database import get_config
-    from utils.network import build_network
-
-    cfg = get_config(conn)
-    rq = cfg.get("research_question", "Literature Review")
-
-    # Build a default similarity network for the report
-    _net_html = None
-    try:
-        from data.database import get_embeddings as _get_emb
-        _stored = _get_emb(conn)
-        _emb_map = {pid: vec for pid, vec in _stored} if _stored else None
-        _net_html, _, _, _ = build_network(
-            included, network_type="similarity", max_nodes=80, embedding_map=_emb_map
-        )
-    except Exception:
-        pass
-
     with st.spinner("Assembling HTML report…"):
-        _report_bytes = build_html_report(
-            included=included,
-            all_papers=all_papers,
-            synthesis=synthesis,
-            counts=counts,
-            research_question=rq,
-            network_html=_net_html,
-        )
+        _report_bytes = _html_report(data_key, conn, included, all_papers, synthesis)
 
-    _date_str = __import__("datetime").datetime.now().strftime("%Y-%m-%d")
+    _date_str = datetime.now().strftime("%Y-%m-%d")
     st.download_button(
         label="🌐 Download Dashboard Report (.html)",
         data=_report_bytes,
@@ -139,7 +187,7 @@ with col2:
 
     # DOCX narrative report
     try:
-        docx_bytes = papers_to_docx_bytes(included, synthesis)
+        docx_bytes = _docx(data_key, included, synthesis)
         st.download_button(
             label="📝 Download Narrative Report (.docx)",
             data=docx_bytes,
@@ -152,7 +200,7 @@ with col2:
 
     # Synthesis JSON
     if synthesis:
-        synthesis_json = json.dumps(synthesis, indent=2, default=str)
+        synthesis_json = fastjson.dumps_pretty(synthesis)
         st.download_button(
             label="🧠 Download Synthesis (JSON)",
             data=synthesis_json,
@@ -165,9 +213,7 @@ with col2:
     st.subheader("Audit Trail")
     st.caption("Full log of every agent decision — for methods section documentation.")
 
-    log = get_log(conn, limit=10000)
-    all_papers = get_papers(conn)
-    audit_json = build_audit_trail(log, all_papers)
+    audit_json = _audit_trail(data_key, conn, all_papers)
     st.download_button(
         label="🔍 Download Audit Trail (JSON)",
         data=audit_json,
@@ -180,19 +226,8 @@ with col2:
 st.divider()
 st.subheader("Paper List Preview")
 
-for i, p in enumerate(included[:10], 1):
-    try:
-        authors = [a["name"] for a in (json.loads(p.get("authors") or "[]") or [])[:3]]
-        author_str = ", ".join(authors)
-    except Exception:
-        author_str = ""
-
-    doi_link = f" | [DOI](https://doi.org/{p['doi']})" if p.get("doi") else ""
-    oa_link = f" | [PDF]({p['open_access_url']})" if p.get("open_access_url") else ""
-    st.markdown(
-        f"{i}. **{p.get('title', 'Untitled')}** "
-        f"({p.get('year', '?')}) — {author_str}{doi_link}{oa_link}"
-    )
+st.markdown(_preview_markdown(data_key, included))
 
-if len(included) > 10:
-    st.caption(f"… and {len(included) - 10} more papers in the downloaded files.")
+n_total = len(included)
+if n_total > _PREVIEW_SIZE:
+    st.caption(f"… and {n_total - _PREVIEW_SIZE} more papers in the downloaded files.")
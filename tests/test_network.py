@@ -0,0 +1,21 @@
+"""The numba top-k kernel in utils.network must agree with the argpartition path."""
+import numpy as np
+import pytest
+
+pytest.importorskip("numba")
+
+from utils import network
+
+
+@pytest.mark.parametrize("k", [1, 4, 10])
+def test_top_k_kernel_matches_argpartition(k):
+    rng = np.random.default_rng(0)
+    block = rng.normal(size=(64, 500)).astype(np.float32)
+    block[np.arange(64), np.arange(64)] = -np.inf
+
+    idx, vals = network._top_k(block, k, use_kernel=True)
+    ref_idx, ref_vals = network._top_k(block, k, use_kernel=False)
+
+    assert [set(r) for r in idx.tolist()] == [set(r) for r in ref_idx.tolist()]
+    np.testing.assert_allclose(np.sort(vals, axis=1), np.sort(ref_vals, axis=1))
+    np.testing.assert_array_equal(vals, np.take_along_axis(block, idx, axis=1))
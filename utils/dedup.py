@@ -0,0 +1,95 @@
+"""
+Near-duplicate detection for paper titles.
+
+64-bit SimHash fingerprints over word unigrams + bigrams, indexed with
+band LSH: a fingerprint is split into `bands` chunks, and two fingerprints
+within Hamming distance < bands must agree exactly on at least one chunk
+(pigeonhole), so only papers sharing a chunk are ever compared.
+
+A SimHash hit is only a candidate: titles that differ in one word (a year,
+a population) can land within a few bits, so callers confirm it with
+same_title() before treating two papers as one.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Any, Iterator
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-case alphanumeric word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def shingles(tokens: list[str]) -> list[str]:
+    """Unigrams plus bigrams, so word order contributes to the fingerprint."""
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _numeric(tokens: set[str]) -> set[str]:
+    return {t for t in tokens if any(c.isdigit() for c in t)}
+
+
+def same_title(
+    a: list[str], b: list[str], year_a: int | None = None, year_b: int | None = None
+) -> bool:
+    """
+    Confirm a near-duplicate candidate: token-set Jaccard >= 0.9, the same
+    numeric tokens (years, editions, counts), and years at most one apart.
+    """
+    sa, sb = set(a), set(b)
+    if _numeric(sa) != _numeric(sb):
+        return False
+    if year_a and year_b and abs(year_a - year_b) > 1:
+        return False
+    return len(sa & sb) >= 0.9 * len(sa | sb)
+
+
+def simhash(tokens: list[str]) -> int:
+    """Return the 64-bit SimHash of a token list."""
+    weights = [0] * 64
+    for t in tokens:
+        h = int.from_bytes(hashlib.blake2b(t.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+class SimHashIndex:
+    """SimHash fingerprints with payloads, supporting 'what is within max_distance?' queries."""
+
+    def __init__(self, max_distance: int = 3, bands: int = 4):
+        if bands <= max_distance:
+            raise ValueError("bands must exceed max_distance for LSH recall to be exact")
+        self.max_distance = max_distance
+        self.bands = bands
+        self._width = 64 // bands
+        self._mask = (1 << self._width) - 1
+        self._entries: list[tuple[int, Any]] = []
+        # Per band: chunk value -> positions in _entries.
+        self._buckets: list[dict[int, list[int]]] = [defaultdict(list) for _ in range(bands)]
+
+    def _chunks(self, h: int) -> list[int]:
+        return [(h >> (i * self._width)) & self._mask for i in range(self.bands)]
+
+    def near(self, h: int) -> Iterator[Any]:
+        """Yield the payload of every fingerprint within max_distance of `h`, once each."""
+        checked: set[int] = set()
+        for band, chunk in enumerate(self._chunks(h)):
+            for pos in self._buckets[band].get(chunk, ()):
+                if pos in checked:
+                    continue
+                checked.add(pos)
+                other, item = self._entries[pos]
+                if (h ^ other).bit_count() <= self.max_distance:
+                    yield item
+
+    def add(self, h: int, item: Any = None) -> None:
+        pos = len(self._entries)
+        self._entries.append((h, item))
+        for band, chunk in enumerate(self._chunks(h)):
+            self._buckets[band][chunk].append(pos)
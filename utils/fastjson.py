@@ -0,0 +1,37 @@
+"""JSON encode/decode via orjson when it is installed, stdlib json otherwise."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON with non-ASCII characters left unescaped."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def loads(data: str | bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Two-space indented JSON for downloads; unknown types (incl. datetimes) via str()."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME,
+        ).decode()
+    return json.dumps(obj, indent=2, default=str)
@@ -1,15 +1,119 @@
 """OpenAI API wrapper — synchronous, with rate-limit-aware retry logic."""
 from __future__ import annotations
 
+import atexit
 import time
 import json
+import hashlib
+import functools
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+import httpx
+import numpy as np
 from openai import OpenAI, RateLimitError, APIStatusError
 
+from data import database
+from utils import fastjson
+import config
+
+
+_clients: dict[str, OpenAI] = {}
+_clients_lock = threading.Lock()
+
 
 def _client(api_key: str) -> OpenAI:
-    return OpenAI(api_key=api_key)
+    """
+    Return a shared OpenAI client per API key. The SDK client and its httpx
+    pool are thread-safe, so all workers reuse warm HTTP/2 connections
+    instead of paying a TCP+TLS handshake per call.
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = OpenAI(
+                    api_key=api_key,
+                    http_client=httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_connections=config.HTTP_MAX_CONNECTIONS,
+                            max_keepalive_connections=config.HTTP_MAX_CONNECTIONS // 2,
+                        ),
+                        timeout=60,
+                    ),
+                )
+                _clients[api_key] = client
+                atexit.register(client.close)
+    return client
+
+
+# ── Client-side rate limiting ──────────────────────────────────────────────────
+
+class RateLimiter:
+    """
+    Thread-safe token bucket over requests/min and tokens/min.
+    Buckets refill continuously; acquire() blocks until both have capacity,
+    so concurrent workers self-throttle instead of piling into 429 retries.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last = time.monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> None:
+        tokens = min(tokens, self.tpm)  # a single oversized call must still get through
+        with self._cond:
+            while True:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+                wait = max(
+                    (1 - self._requests) * 60 / self.rpm,
+                    (tokens - self._tokens) * 60 / self.tpm,
+                    0.01,
+                )
+                self._cond.wait(wait)
+
+
+_limiter = RateLimiter(rpm=config.OPENAI_RPM, tpm=config.OPENAI_TPM)
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model: str):
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Token count of `text` for `model` (character estimate if tiktoken is unavailable)."""
+    try:
+        return len(_encoding(model).encode(text))
+    except ImportError:
+        return len(text) // 4  # ~4 characters per token for English text
+
+
+def _estimate_tokens(messages: list[dict], model: str) -> int:
+    return count_tokens("".join(m.get("content") or "" for m in messages), model)
 
 
 def chat_completion(
@@ -24,8 +128,11 @@ def chat_completion(
     """
     Return the text content of the first choice.
 
-    Retry strategy:
-    - RateLimitError (429): exponential back-off starting at 5 s, up to max_retries times.
+    Every attempt first waits on the shared RPM/TPM token bucket.
+
+    Retry strategy (fallback if the bucket's limits are set above your tier):
+    - RateLimitError (429): wait the server's Retry-After (±20% jitter), else exponential
+      back-off from 5 s capped at 60 s, up to max_retries times.
       When many workers run in parallel, a few 429s are expected and handled silently.
     - Other transient errors: exponential back-off starting at 2 s.
     - Non-retryable errors (4xx except 429): re-raise immediately.
@@ -39,17 +146,44 @@ def chat_completion(
     if response_format:
         kwargs["response_format"] = response_format
 
+    est_tokens = _estimate_tokens(messages, model)
+
+    def call() -> str:
+        _limiter.acquire(est_tokens)
+        resp = client.chat.completions.create(**kwargs)
+        return resp.choices[0].message.content or ""
+
+    return _with_retries(call, max_retries) or ""
+
+
+_MAX_RETRY_WAIT = 60.0
+
+
+def _retry_after(e: APIStatusError) -> float | None:
+    """Seconds the server asked us to wait (retry-after-ms / Retry-After), capped."""
+    headers = e.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return min(float(headers["retry-after-ms"]) / 1000, _MAX_RETRY_WAIT)
+        if "retry-after" in headers:
+            return min(float(headers["retry-after"]), _MAX_RETRY_WAIT)
+    except ValueError:
+        pass  # e.g. an HTTP-date; fall back to exponential back-off
+    return None
+
+
+def _with_retries(call, max_retries: int = 6):
+    """Run `call()` with the back-off policy described in chat_completion."""
     for attempt in range(max_retries):
         try:
-            resp = client.chat.completions.create(**kwargs)
-            return resp.choices[0].message.content or ""
+            return call()
 
-        except RateLimitError:
+        except RateLimitError as e:
             if attempt == max_retries - 1:
                 raise
-            # Exponential back-off: 5, 10, 20, 40, 80 s
-            wait = 5 * (2 ** attempt)
-            time.sleep(wait)
+            # The server's hint when present, else exponential back-off: 5, 10, 20, 40, 60 s
+            wait = _retry_after(e) or min(5 * (2 ** attempt), _MAX_RETRY_WAIT)
+            time.sleep(wait * random.uniform(0.8, 1.2))
 
         except APIStatusError as e:
             # 4xx errors other than 429 are not retryable
@@ -66,9 +200,53 @@ def chat_completion(
             wait = 2 * (2 ** attempt)
             time.sleep(wait)
 
-    return ""
+    return None
+
+
+def _cache_key(messages: list[dict], model: str, temperature: float) -> str:
+    payload = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
 
+def _maybe_cached(fn):
+    """
+    Serve repeated calls from the session database's llm_cache table, so a
+    re-run or resume within one review skips calls it has already made.
+
+    Pass `cache=` a data.db_pool.CursorPool to enable it; the pool gives each
+    worker thread its own cursor. Only calls with temperature <=
+    config.LLM_CACHE_MAX_TEMPERATURE are cached. Cache failures never fail the call.
+    """
+    @functools.wraps(fn)
+    def wrapper(messages: list[dict], model: str, api_key: str, *, cache=None, **kwargs):
+        temperature = kwargs.get("temperature", 0.2)
+        if cache is None or temperature > config.LLM_CACHE_MAX_TEMPERATURE:
+            return fn(messages, model, api_key, **kwargs)
 
+        key = _cache_key(messages, model, temperature)
+        try:
+            with cache.acquire() as cur:
+                hit = database.get_cached_response(cur, key)
+            if hit is not None:
+                return hit
+        except Exception:
+            pass
+
+        result = fn(messages, model, api_key, **kwargs)
+        try:
+            with cache.acquire() as cur:
+                database.save_cached_response(cur, key, result)
+        except Exception:
+            pass
+        return result
+
+    return wrapper
+
+
+@_maybe_cached
 def chat_completion_json(
     messages: list[dict],
     model: str,
@@ -83,20 +261,56 @@ def chat_completion_json(
         response_format={"type": "json_object"},
         **kwargs,
     )
-    return json.loads(raw)
+    return fastjson.loads(raw)
 
 
 def get_embeddings(
-    texts: list[str], api_key: str, model: str = "text-embedding-3-small"
-) -> list[list[float]]:
-    """Return a list of embedding vectors, one per input text."""
+    texts: list[str],
+    api_key: str,
+    model: str = "text-embedding-3-small",
+    dimensions: int | None = config.EMBEDDING_DIM,
+) -> np.ndarray:
+    """
+    Return an (n, d) float32 matrix of embedding vectors, one row per input text.
+    `dimensions` truncates text-embedding-3 vectors server-side (None = native size).
+    """
     if not texts:
-        return []
+        return np.empty((0, 0), dtype=np.float32)
     client = _client(api_key)
-    all_embeddings: list[list[float]] = []
-    chunk_size = 512
-    for i in range(0, len(texts), chunk_size):
-        chunk = texts[i : i + chunk_size]
-        resp = client.embeddings.create(model=model, input=chunk)
-        all_embeddings.extend([item.embedding for item in resp.data])
-    return all_embeddings
+    kwargs = {"dimensions": dimensions} if dimensions else {}
+    chunk_size = 2048  # API maximum inputs per embeddings request
+
+    def embed(chunk: list[str]) -> np.ndarray:
+        resp = _with_retries(lambda: client.embeddings.create(model=model, input=chunk, **kwargs))
+        return np.array([item.embedding for item in resp.data], dtype=np.float32)
+
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if len(chunks) == 1:
+        return embed(chunks[0])
+    # Requests are network-bound; map() keeps the rows in input order.
+    with ThreadPoolExecutor(max_workers=min(config.EMBEDDING_MAX_WORKERS, len(chunks))) as ex:
+        return np.concatenate(list(ex.map(embed, chunks)))
+
+
+def get_embeddings_cached(
+    texts: list[str], api_key: str, model: str, conn
+) -> np.ndarray:
+    """
+    Like get_embeddings, but content-addressed: vectors for texts already
+    embedded with `model` are read from the DB cache and only the misses
+    are sent to the API. Results keep the order of `texts`.
+    """
+    keys = [
+        hashlib.sha256(f"{model}:{config.EMBEDDING_DIM}\x00{t}".encode()).hexdigest()
+        for t in texts
+    ]
+    cached = database.get_cached_embeddings(conn, list(set(keys)))
+    misses = list(dict.fromkeys(k for k in keys if k not in cached))
+    if misses:
+        text_of = dict(zip(keys, texts))
+        fresh = get_embeddings([text_of[k] for k in misses], api_key, model)
+        database.save_cached_embeddings(conn, misses, fresh)
+        cached.update((k, row.tobytes()) for k, row in zip(misses, fresh))
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    return np.frombuffer(b"".join(cached[k] for k in keys), dtype=np.float32).reshape(len(keys), -1)
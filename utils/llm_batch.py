@@ -0,0 +1,74 @@
+"""OpenAI Batch API helpers — asynchronous, ~50% cheaper bulk chat completions."""
+from __future__ import annotations
+
+import io
+import time
+from typing import Callable
+
+from utils import fastjson
+from utils.llm import _client
+
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def submit_batch(requests: list[dict], api_key: str) -> str:
+    """
+    Upload `requests` as a JSONL file and create a batch job. Returns the batch id.
+
+    Each request is {"custom_id": ..., "method": "POST", "url": "/v1/chat/completions", "body": {...}}.
+    """
+    client = _client(api_key)
+    jsonl = "\n".join(fastjson.dumps(r) for r in requests).encode()
+    upload = client.files.create(file=("requests.jsonl", io.BytesIO(jsonl)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def poll(batch_id: str, api_key: str) -> str:
+    """Return the current status of a batch job."""
+    return _client(api_key).batches.retrieve(batch_id).status
+
+
+def wait_for_batch(
+    batch_id: str,
+    api_key: str,
+    poll_seconds: float,
+    progress_callback: Callable[[str], None] | None = None,
+) -> str:
+    """Block until the batch reaches a terminal status and return that status."""
+    log = progress_callback or (lambda msg: None)
+    while True:
+        status = poll(batch_id, api_key)
+        if status in _TERMINAL_STATUSES:
+            return status
+        log(f"Batch {batch_id}: {status}…")
+        time.sleep(poll_seconds)
+
+
+def download_results(batch_id: str, api_key: str) -> dict[str, str]:
+    """
+    Return {custom_id: message content} for every request that succeeded.
+    Failed requests are omitted.
+    """
+    client = _client(api_key)
+    batch = client.batches.retrieve(batch_id)
+    if not batch.output_file_id:
+        return {}
+    raw = client.files.content(batch.output_file_id).text
+
+    results: dict[str, str] = {}
+    for line in raw.splitlines():
+        if not line.strip():
+            continue
+        item = fastjson.loads(line)
+        response = item.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        choices = (response.get("body") or {}).get("choices") or []
+        if choices:
+            results[item["custom_id"]] = choices[0]["message"].get("content") or ""
+    return results
@@ -12,13 +12,20 @@ Important papers (top_n) are highlighted in red based on:
 """
 from __future__ import annotations
 
-import json
+import heapq
 import textwrap
-from collections import defaultdict
+import threading
+from collections import OrderedDict
 from typing import Literal
 
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:  # optional speed-up (installed with umap-learn)
+    njit, prange = None, range
+
+
 # Colour palette for up to 12 clusters
 _CLUSTER_COLORS = [
     "#3B82F6", "#EF4444", "#10B981", "#F59E0B", "#8B5CF6",
@@ -30,23 +37,139 @@ _IMPORTANT_COLOR = {"background": "#EF4444", "border": "#7F1D1D",
                     "highlight": {"background": "#F87171", "border": "#EF4444"}}
 
 
-def _cluster_color(cluster_id) -> str:
-    if cluster_id is None or int(cluster_id) < 0:
-        return _NOISE_COLOR
-    return _CLUSTER_COLORS[int(cluster_id) % len(_CLUSTER_COLORS)]
+# Palette with the noise colour last, so one fancy-index resolves every node.
+_PALETTE = np.array(_CLUSTER_COLORS + [_NOISE_COLOR])
+
+
+def _cluster_colors(papers: list[dict]) -> list[str]:
+    """Cluster colour per paper; unclustered (None) and noise (< 0) papers are grey."""
+    ids = np.array(
+        [-1 if p.get("cluster_id") is None else int(p["cluster_id"]) for p in papers],
+        dtype=np.int64,
+    )
+    n_colors = len(_CLUSTER_COLORS)
+    return _PALETTE[np.where(ids < 0, n_colors, ids % n_colors)].tolist()
+
+
+def _node_sizes(papers: list[dict]) -> list[float]:
+    """Node diameter from relevance (unscored papers count as 30), clamped to 8–55."""
+    relevance = np.array([p.get("relevance_score") or 30.0 for p in papers], dtype=float)
+    return np.clip(relevance * 0.55, 8.0, 55.0).tolist()
+
+
+# (node ids, id(embedding_map)) -> (embedding_map, similarity matrix). Each entry
+# holds its map so the id can't be reused by another dict while the entry lives;
+# callers that keep one map per data version re-render for free when only k or
+# the threshold changes.
+_SIM_CACHE_SIZE = 4
+_DENSE_KNN_MAX_NODES = 2000
+_KNN_BLOCK_ELEMS = 16_000_000  # similarities per block on the blocked path (64 MB)
+# The numba kernel's first call compiles for ~5 s (cached on disk afterwards);
+# it only beats argpartition by that much on graphs of roughly this size.
+_NUMBA_MIN_NODES = 50_000
+_sim_cache: OrderedDict[tuple, tuple[dict, np.ndarray]] = OrderedDict()
+_sim_lock = threading.Lock()
+
+
+def _unit_rows(ids: list[str], embedding_map: dict) -> np.ndarray:
+    """
+    float32 matrix of the embeddings for `ids`, each row scaled to unit length.
+    OpenAI embeddings already are, in which case the division is skipped.
+    float32 throughout: NumPy has no BLAS kernel for float16 matmul.
+    """
+    X = np.array([embedding_map[pid] for pid in ids], dtype=np.float32)
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    if not np.allclose(norms, 1.0, atol=1e-3):
+        X /= norms + 1e-9
+    return X
+
+
+def _similarity_matrix(ids: list[str], embedding_map: dict) -> np.ndarray:
+    """Read-only cosine similarity matrix over `ids`, diagonal set to -inf."""
+    key = (tuple(ids), id(embedding_map))
+    with _sim_lock:
+        hit = _sim_cache.get(key)
+        if hit is not None and hit[0] is embedding_map:
+            _sim_cache.move_to_end(key)
+            return hit[1]
+
+    X = _unit_rows(ids, embedding_map)
+    sim_matrix = X @ X.T
+    np.fill_diagonal(sim_matrix, -np.inf)
+    sim_matrix.flags.writeable = False
+
+    with _sim_lock:
+        _sim_cache[key] = (embedding_map, sim_matrix)
+        _sim_cache.move_to_end(key)
+        while len(_sim_cache) > _SIM_CACHE_SIZE:
+            _sim_cache.popitem(last=False)
+    return sim_matrix
 
 
-def _node_size(relevance_score) -> float:
-    s = relevance_score or 30.0
-    return max(8.0, min(55.0, s * 0.55))
+def _top_k_rows(block: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-row k largest of `block` (unordered) in one pass: each row keeps a
+    k-slot buffer and replaces its smallest entry whenever a larger value
+    comes along. Compiled with numba when available; see _top_k for when it is used.
+    """
+    m, n = block.shape
+    idx = np.zeros((m, k), dtype=np.intp)
+    vals = np.empty((m, k), dtype=block.dtype)
+    for r in prange(m):
+        best = np.full(k, -np.inf, dtype=block.dtype)
+        best_idx = np.zeros(k, dtype=np.intp)
+        low = 0
+        for j in range(n):
+            v = block[r, j]
+            if v > best[low]:
+                best[low] = v
+                best_idx[low] = j
+                low = best.argmin()
+        idx[r] = best_idx
+        vals[r] = best
+    return idx, vals
+
+
+if njit is not None:
+    _top_k_rows = njit(parallel=True, cache=True)(_top_k_rows)
+
+
+def _top_k(block: np.ndarray, k: int, use_kernel: bool = False) -> tuple[np.ndarray, np.ndarray]:
+    """(indices, values) of each row's k largest entries, unordered."""
+    if use_kernel and njit is not None:
+        return _top_k_rows(block, k)
+    idx = np.argpartition(block, -k, axis=1)[:, -k:]
+    return idx, np.take_along_axis(block, idx, axis=1)
+
+
+def _knn(ids: list[str], embedding_map: dict, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (neighbour indices, cosine similarities), each shape (n, k), for every node.
+    Small graphs slice the cached dense matrix; beyond _DENSE_KNN_MAX_NODES the
+    similarities are computed a block of rows at a time and reduced to the k
+    nearest straight away, so at most _KNN_BLOCK_ELEMS of them exist at once.
+    """
+    if len(ids) <= _DENSE_KNN_MAX_NODES:
+        sim_matrix = _similarity_matrix(ids, embedding_map)
+        idx = np.argpartition(sim_matrix, -k, axis=1)[:, -k:]
+        return idx, np.take_along_axis(sim_matrix, idx, axis=1)
+
+    n = len(ids)
+    X = _unit_rows(ids, embedding_map)
+    idx = np.empty((n, k), dtype=np.intp)
+    vals = np.empty((n, k), dtype=np.float32)
+    rows = max(1, _KNN_BLOCK_ELEMS // n)
+    use_kernel = n >= _NUMBA_MIN_NODES
+    for start in range(0, n, rows):
+        block = X[start : start + rows] @ X.T
+        local = np.arange(len(block))
+        block[local, start + local] = -np.inf  # a node is not its own neighbour
+        idx[start : start + rows], vals[start : start + rows] = _top_k(block, k, use_kernel)
+    return idx, vals
 
 
 def _tooltip(p: dict, connections: int = 0, is_important: bool = False) -> str:
-    try:
-        authors = [a["name"] for a in json.loads(p.get("authors") or "[]")][:3]
-        author_str = ", ".join(authors) or "Unknown"
-    except Exception:
-        author_str = "Unknown"
+    author_str = p.get("authors_display") or "Unknown"
     title = textwrap.fill(p.get("title", "?"), width=50)
     important_badge = "<br><b style='color:#FCA5A5'>⭐ Key paper in this corpus</b>" if is_important else ""
     return (
@@ -107,103 +230,73 @@ def build_network(
     """
     from pyvis.network import Network
 
-    # Sort by relevance and cap
-    sorted_papers = sorted(
-        papers,
-        key=lambda p: p.get("relevance_score") or 0,
-        reverse=True,
-    )[:max_nodes]
-
-    paper_id_set = {p["id"] for p in sorted_papers}
+    # The max_nodes most relevant papers, best first
+    sorted_papers = heapq.nlargest(
+        max_nodes, papers, key=lambda p: p.get("relevance_score") or 0
+    )
 
     # ── Step 1: Pre-compute edge list and centrality ────────────────────────────
-    # centrality[paper_id] = number of incoming (citation) or total (similarity) edges
-    centrality: dict[str, int] = defaultdict(int)
+    # centrality[i] = incoming (citation) or total (similarity) edges of
+    # sorted_papers[i], counted in one bincount over the edge endpoints.
+    n_nodes = len(sorted_papers)
+    centrality = np.zeros(n_nodes, dtype=np.int64)
     edge_list: list[tuple] = []  # (src_id, tgt_id, kwargs)
 
     if network_type == "citation":
-        oa_to_id = {
-            p["openalex_id"]: p["id"]
-            for p in sorted_papers
+        oa_to_pos = {
+            p["openalex_id"]: i
+            for i, p in enumerate(sorted_papers)
             if p.get("openalex_id")
         }
-        for p in sorted_papers:
-            try:
-                refs = json.loads(p.get("referenced_works") or "[]")
-            except Exception:
-                refs = []
-            for ref_oa_id in refs:
-                cited_id = oa_to_id.get(ref_oa_id)
-                if cited_id and cited_id != p["id"]:
+        # A keys view intersects in C, so only the refs that land in the corpus are visited.
+        corpus_oa = oa_to_pos.keys()
+        cited: list[int] = []
+        for i, p in enumerate(sorted_papers):
+            for ref_oa_id in corpus_oa & set(p.get("referenced_works") or ()):
+                j = oa_to_pos[ref_oa_id]
+                if j != i:
                     edge_list.append((
-                        p["id"], cited_id,
+                        p["id"], sorted_papers[j]["id"],
                         {"arrows": "to", "width": 1.2, "color": {"color": "#94A3B8"}},
                     ))
-                    centrality[cited_id] += 1  # in-degree
+                    cited.append(j)
+        centrality = np.bincount(np.asarray(cited, dtype=np.intp), minlength=n_nodes)  # in-degree
 
     elif network_type == "similarity":
-        if not embedding_map:
-            # Return node-only graph — no centrality available
-            net = Network(height="660px", width="100%", bgcolor="#1E293B",
-                          font_color="#F1F5F9", directed=False)
-            for p in sorted_papers:
-                short_label = (p.get("title") or "?")[:38]
-                if len(p.get("title") or "") > 38:
-                    short_label += "…"
-                net.add_node(p["id"], label=short_label, title=_tooltip(p),
-                             size=_node_size(p.get("relevance_score")),
-                             color=_cluster_color(p.get("cluster_id")),
-                             borderWidth=2, font={"size": 11, "color": "#F1F5F9"})
-            net.set_options(_PHYSICS_OPTIONS)
-            return net.generate_html(), len(sorted_papers), 0, []
-
-        ids = [p["id"] for p in sorted_papers if p["id"] in embedding_map]
-        if len(ids) < 2:
-            net = Network(height="660px", width="100%", bgcolor="#1E293B",
-                          font_color="#F1F5F9", directed=False)
-            for p in sorted_papers:
-                short_label = (p.get("title") or "?")[:38]
-                if len(p.get("title") or "") > 38:
-                    short_label += "…"
-                net.add_node(p["id"], label=short_label, title=_tooltip(p),
-                             size=_node_size(p.get("relevance_score")),
-                             color=_cluster_color(p.get("cluster_id")),
-                             borderWidth=2, font={"size": 11, "color": "#F1F5F9"})
-            net.set_options(_PHYSICS_OPTIONS)
-            return net.generate_html(), len(sorted_papers), 0, []
-
-        X = np.array([embedding_map[pid] for pid in ids], dtype=np.float32)
-        norms = np.linalg.norm(X, axis=1, keepdims=True)
-        X_norm = X / (norms + 1e-9)
-        sim_matrix = X_norm @ X_norm.T
-
-        added_edges: set[frozenset] = set()
-        for i, src_id in enumerate(ids):
-            row = sim_matrix[i].copy()
-            row[i] = -1.0
-            top_k_idx = np.argsort(row)[-similarity_k:]
-            for j in top_k_idx:
-                if row[j] < similarity_threshold:
-                    continue
-                tgt_id = ids[j]
-                edge_key = frozenset([src_id, tgt_id])
-                if edge_key in added_edges:
-                    continue
-                added_edges.add(edge_key)
-                width = round(float((row[j] - similarity_threshold) / (1 - similarity_threshold) * 4 + 1), 2)
+        # Without at least two embedded papers this is a node-only graph.
+        emb_pos = np.array(
+            [i for i, p in enumerate(sorted_papers) if p["id"] in (embedding_map or ())],
+            dtype=np.intp,
+        )
+        if len(emb_pos) >= 2:
+            ids = [sorted_papers[i]["id"] for i in emb_pos.tolist()]
+            # Each node's k nearest (unordered), kept where similarity clears the
+            # threshold; an undirected pair found from both ends is kept once.
+            idx, vals = _knn(ids, embedding_map, min(similarity_k, len(ids) - 1))
+            src, slot = np.nonzero(vals >= similarity_threshold)
+            tgt = idx[src, slot]
+            pairs, first = np.unique(
+                np.stack([np.minimum(src, tgt), np.maximum(src, tgt)], axis=1),
+                axis=0, return_index=True,
+            )
+            sims = vals[src, slot][first]
+            widths = np.round((sims - similarity_threshold) / (1 - similarity_threshold) * 4 + 1, 2)
+
+            for (a, b), sim, width in zip(pairs.tolist(), sims.tolist(), widths.tolist()):
                 edge_list.append((
-                    src_id, tgt_id,
+                    ids[a], ids[b],
                     {"width": width, "color": {"color": "#60A5FA"},
-                     "title": f"Similarity: {row[j]:.2f}"},
+                     "title": f"Similarity: {sim:.2f}"},
                 ))
-                centrality[src_id] += 1  # undirected degree
-                centrality[tgt_id] += 1
+            centrality = np.bincount(emb_pos[pairs].ravel(), minlength=n_nodes)  # undirected degree
 
     # ── Step 2: Identify top_n important papers (must have ≥1 connection) ──────
-    connected_ids = {pid for pid in paper_id_set if centrality.get(pid, 0) > 0}
-    top_ids = set(
-        sorted(connected_ids, key=lambda pid: centrality[pid], reverse=True)[:top_n]
-    )
+    # Stable sort: equally central papers rank by relevance (their node order).
+    ranked = [
+        i for i in np.argsort(-centrality, kind="stable")[:top_n].tolist() if centrality[i] > 0
+    ]
+    top_pos = set(ranked)
+    connections = centrality.tolist()
 
     # ── Step 3: Build network with coloured nodes ───────────────────────────────
     directed = network_type == "citation"
@@ -215,18 +308,20 @@ def build_network(
         directed=directed,
     )
 
-    for p in sorted_papers:
-        is_important = p["id"] in top_ids
-        connections = centrality.get(p["id"], 0)
-        short_label = (p.get("title") or "?")[:38]
-        if len(p.get("title") or "") > 38:
-            short_label += "…"
+    # Per-node attributes as parallel lists, each built in one pass over the papers.
+    titles = [p.get("title") or "?" for p in sorted_papers]
+    labels = [t[:38] + "…" if len(t) > 38 else t for t in titles]
+    sizes = _node_sizes(sorted_papers)
+    colors = _cluster_colors(sorted_papers)
+
+    for i, (p, label, size, color) in enumerate(zip(sorted_papers, labels, sizes, colors)):
+        is_important = i in top_pos
         net.add_node(
             p["id"],
-            label=short_label,
-            title=_tooltip(p, connections=connections, is_important=is_important),
-            size=_node_size(p.get("relevance_score")) * (1.4 if is_important else 1.0),
-            color=_IMPORTANT_COLOR if is_important else _cluster_color(p.get("cluster_id")),
+            label=label,
+            title=_tooltip(p, connections=connections[i], is_important=is_important),
+            size=size * (1.4 if is_important else 1.0),
+            color=_IMPORTANT_COLOR if is_important else color,
             borderWidth=4 if is_important else 2,
             font={"size": 13 if is_important else 11, "color": "#F1F5F9",
                   "bold": is_important},
@@ -238,11 +333,10 @@ def build_network(
     net.set_options(_PHYSICS_OPTIONS)
 
     # ── Step 4: Build sorted important_papers list ──────────────────────────────
-    id_to_paper = {p["id"]: p for p in sorted_papers}
     important_papers = []
-    for pid in sorted(top_ids, key=lambda pid: centrality[pid], reverse=True):
-        p = dict(id_to_paper[pid])  # copy so we don't mutate the original
-        p["_connections"] = centrality[pid]
+    for i in ranked:
+        p = dict(sorted_papers[i])  # copy so we don't mutate the original
+        p["_connections"] = connections[i]
         important_papers.append(p)
 
     return net.generate_html(), len(sorted_papers), len(edge_list), important_papers
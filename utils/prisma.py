@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 import plotly.graph_objects as go
 
 
-@dataclass
+@dataclass(slots=True)
 class PRISMAData:
     identified_openalex: int = 0
     identified_semantic_scholar: int = 0
@@ -21,6 +21,38 @@ class PRISMAData:
     human_excluded: int = 0
     included_final: int = 0
 
+    @classmethod
+    def from_papers(cls, papers: list[dict], screened: int) -> "PRISMAData":
+        """Tally sources and decisions over every paper in one pass."""
+        c = dict.fromkeys((
+            "openalex", "semantic_scholar", "snowball", "EXCLUDED", "INCLUDED",
+            "human_reviewed", "human_excluded",
+        ), 0)
+        for p in papers:
+            if p.get("source") in ("openalex", "semantic_scholar"):
+                c[p["source"]] += 1
+            if "snowball" in (p.get("found_via") or ""):
+                c["snowball"] += 1
+            if p.get("final_status") in ("EXCLUDED", "INCLUDED"):
+                c[p["final_status"]] += 1
+            if p.get("human_decision"):
+                c["human_reviewed"] += 1
+                if p["human_decision"] == "EXCLUDE":
+                    c["human_excluded"] += 1
+        return cls(
+            identified_openalex=c["openalex"],
+            identified_semantic_scholar=c["semantic_scholar"],
+            identified_snowballing=c["snowball"],
+            duplicates_removed=0,  # tracked at insertion time
+            screened_title_abstract=screened,
+            excluded_title_abstract=c["EXCLUDED"],
+            assessed_full_text=c["INCLUDED"] + c["human_reviewed"],
+            excluded_full_text=c["human_excluded"],
+            human_reviewed=c["human_reviewed"],
+            human_excluded=c["human_excluded"],
+            included_final=c["INCLUDED"],
+        )
+
     @property
     def total_identified(self) -> int:
         return self.identified_openalex + self.identified_semantic_scholar + self.identified_snowballing
@@ -30,48 +62,51 @@ class PRISMAData:
         return self.total_identified - self.duplicates_removed
 
 
-def build_prisma_figure(data: PRISMAData) -> go.Figure:
-    """Return a Plotly figure showing the PRISMA 2020 flow diagram."""
+_BOX_W, _BOX_H = 0.22, 0.08
+_BOX_COLOR = "#1E3A5F"
+_EXCLUDED_COLOR = "#7F1D1D"
+_INCLUDED_COLOR = "#14532D"
 
-    def box(x, y, text, color="#1E3A5F", width=0.22, height=0.08):
-        return dict(x=x, y=y, text=text, color=color, width=width, height=height)
 
+def build_prisma_figure(data: PRISMAData) -> go.Figure:
+    """Return a Plotly figure showing the PRISMA 2020 flow diagram."""
+    # (x centre, y centre, text, fill colour); every box is _BOX_W x _BOX_H.
     boxes = [
-        box(0.5, 0.95, f"Records identified<br>OpenAlex: {data.identified_openalex}<br>"
-                        f"Semantic Scholar: {data.identified_semantic_scholar}<br>"
-                        f"Snowballing: {data.identified_snowballing}<br>"
-                        f"<b>Total: {data.total_identified}</b>"),
-        box(0.5, 0.80, f"Records after deduplication<br><b>n = {data.after_dedup}</b><br>"
-                        f"({data.duplicates_removed} duplicates removed)"),
-        box(0.5, 0.65, f"Records screened<br>(title & abstract)<br><b>n = {data.screened_title_abstract}</b>"),
-        box(0.85, 0.65, f"Records excluded<br><b>n = {data.excluded_title_abstract}</b>", color="#7F1D1D"),
-        box(0.5, 0.50, f"Full-text articles assessed<br>for eligibility<br><b>n = {data.assessed_full_text}</b>"),
-        box(0.85, 0.50, f"Full-text excluded<br><b>n = {data.excluded_full_text}</b>", color="#7F1D1D"),
-        box(0.5, 0.35, f"Human-in-the-loop review<br><b>n = {data.human_reviewed}</b><br>"
-                        f"({data.human_excluded} excluded)") if data.human_reviewed else None,
-        box(0.5, 0.18, f"Studies included<br>in final review<br><b>n = {data.included_final}</b>",
-            color="#14532D"),
+        (0.5, 0.95, f"Records identified<br>OpenAlex: {data.identified_openalex}<br>"
+                    f"Semantic Scholar: {data.identified_semantic_scholar}<br>"
+                    f"Snowballing: {data.identified_snowballing}<br>"
+                    f"<b>Total: {data.total_identified}</b>", _BOX_COLOR),
+        (0.5, 0.80, f"Records after deduplication<br><b>n = {data.after_dedup}</b><br>"
+                    f"({data.duplicates_removed} duplicates removed)", _BOX_COLOR),
+        (0.5, 0.65, f"Records screened<br>(title & abstract)<br><b>n = {data.screened_title_abstract}</b>",
+         _BOX_COLOR),
+        (0.85, 0.65, f"Records excluded<br><b>n = {data.excluded_title_abstract}</b>", _EXCLUDED_COLOR),
+        (0.5, 0.50, f"Full-text articles assessed<br>for eligibility<br><b>n = {data.assessed_full_text}</b>",
+         _BOX_COLOR),
+        (0.85, 0.50, f"Full-text excluded<br><b>n = {data.excluded_full_text}</b>", _EXCLUDED_COLOR),
     ]
-    boxes = [b for b in boxes if b is not None]
-
-    shapes = []
-    annotations = []
-
-    for b in boxes:
-        x0 = b["x"] - b["width"] / 2
-        x1 = b["x"] + b["width"] / 2
-        y0 = b["y"] - b["height"] / 2
-        y1 = b["y"] + b["height"] / 2
-        shapes.append(dict(
-            type="rect", x0=x0, x1=x1, y0=y0, y1=y1,
-            fillcolor=b["color"], line=dict(color="white", width=1),
+    if data.human_reviewed:
+        boxes.append((0.5, 0.35, f"Human-in-the-loop review<br><b>n = {data.human_reviewed}</b><br>"
+                                 f"({data.human_excluded} excluded)", _BOX_COLOR))
+    boxes.append((0.5, 0.18, f"Studies included<br>in final review<br><b>n = {data.included_final}</b>",
+                  _INCLUDED_COLOR))
+
+    shapes = [
+        dict(
+            type="rect", x0=x - _BOX_W / 2, x1=x + _BOX_W / 2, y0=y - _BOX_H / 2, y1=y + _BOX_H / 2,
+            fillcolor=color, line=dict(color="white", width=1),
             xref="paper", yref="paper",
-        ))
-        annotations.append(dict(
-            x=b["x"], y=b["y"], text=b["text"],
+        )
+        for x, y, _, color in boxes
+    ]
+    annotations = [
+        dict(
+            x=x, y=y, text=text,
             showarrow=False, font=dict(color="white", size=11),
             align="center", xref="paper", yref="paper",
-        ))
+        )
+        for x, y, text, _ in boxes
+    ]
 
     # Vertical arrows between main boxes
     arrow_pairs = [(0.95, 0.80), (0.80, 0.65), (0.65, 0.50)]
@@ -1,4 +1,7 @@
 """All LLM prompt templates for the literature review pipeline."""
+import re
+import string
+from typing import Callable
 
 # ── Query Formulation ──────────────────────────────────────────────────────────
 
@@ -152,3 +155,34 @@ Return JSON:
   "methodological_observations": "<paragraph>",
   "seminal_papers_notes": "<paragraph about the most central/influential papers>"
 }}"""
+
+
+# ── Template helpers ───────────────────────────────────────────────────────────
+
+_SLOT_RE = re.compile("\x00(\\d+)\x00")
+
+
+def bind(template: str, **fixed) -> Callable[..., str]:
+    """
+    Format `template` once with the fields that are constant across calls and
+    return a function that fills the remaining fields by concatenation, so
+    per-call rendering (e.g. once per screening batch) skips re-parsing the
+    whole template. `bind(T, a=1)(b=2) == T.format(a=1, b=2)`.
+    """
+    free = sorted({
+        name for _, name, _, _ in string.Formatter().parse(template)
+        if name and name not in fixed
+    })
+    formatted = template.format(**fixed, **{n: f"\x00{i}\x00" for i, n in enumerate(free)})
+    parts = _SLOT_RE.split(formatted)
+    literals = parts[0::2]
+    slots = [free[int(i)] for i in parts[1::2]]
+
+    def render(**values) -> str:
+        out = [literals[0]]
+        for name, literal in zip(slots, literals[1:]):
+            out.append(str(values[name]))
+            out.append(literal)
+        return "".join(out)
+
+    return render
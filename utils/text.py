@@ -0,0 +1,32 @@
+"""Text normalisation shared by paper ingestion and the exporters."""
+from __future__ import annotations
+
+import hashlib
+import re
+
+_WS_RE = re.compile(r"\s+")
+_NON_ALNUM_RE = re.compile(r"[^a-zA-Z0-9]")
+
+
+def clean(text: str | None) -> str:
+    """Collapse runs of whitespace to single spaces and strip."""
+    if not text:
+        return ""
+    return _WS_RE.sub(" ", str(text)).strip()
+
+
+def bibtex_key(paper_id: str, authors: list[str], year: int | None, title: str) -> str:
+    """First author's surname + year + first two title words, alphanumeric, ≤30 chars."""
+    key_parts = []
+    if authors:
+        last = authors[0].split()[-1] if authors[0].split() else "Unknown"
+        key_parts.append(last)
+    if year:
+        key_parts.append(str(year))
+    key_parts.extend(title.split()[:2])
+    return _NON_ALNUM_RE.sub("", "".join(key_parts))[:30] or paper_id[:12]
+
+
+def title_id(title: str) -> str:
+    """Stable 32-hex-char paper id for records with neither DOI nor source id."""
+    return hashlib.blake2b(title.encode(), digest_size=16).hexdigest()